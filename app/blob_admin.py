@@ -0,0 +1,53 @@
+"""Blob store maintenance: `python -m app.blob_admin {migrate,push,gc}`.
+
+`migrate` moves blobs from the flat `blobs/<sha>/` layout to `blobs/ab/cd/<sha>/`;
+`push` uploads local blobs to the configured shared backend (S3, network mount).
+`gc` deletes originals and renders no longer referenced by the database; it is safe to
+run while the API is serving (see `--grace-seconds`) and reports only with `--dry-run`.
+"""
+
+import argparse
+import json
+import logging
+from dataclasses import asdict
+
+from app.config import load_config
+from app.features.blobs.gc import DEFAULT_GRACE_SECONDS, collect_garbage
+from app.features.blobs.layout import migrate_to_sharded, push_to_remote
+from app.infra.db import DbConfig, connect, migrate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="move flat blob directories into the sharded layout")
+    commands.add_parser("push", help="upload local blobs missing from the shared backend")
+    gc = commands.add_parser("gc", help="mark-and-sweep unreferenced blobs and renders")
+    gc.add_argument("--grace-seconds", type=float, default=DEFAULT_GRACE_SECONDS)
+    gc.add_argument("--dry-run", action="store_true", help="report what would be deleted")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    cfg = load_config()
+    conn = connect(DbConfig(path=cfg.db_path))
+    migrate(conn)
+    if args.command == "migrate":
+        print(json.dumps(migrate_to_sharded(conn, cfg.blobs_dir)))
+    elif args.command == "push":
+        if cfg.blob_remote is None:
+            parser.error("no shared blob backend configured (BLOB_BACKEND)")
+        print(json.dumps(push_to_remote(cfg.blobs_dir, cfg.blob_remote)))
+    else:
+        report = collect_garbage(
+            conn,
+            cfg.blobs_dir,
+            grace_seconds=args.grace_seconds,
+            dry_run=args.dry_run,
+            remote=cfg.blob_remote,
+        )
+        print(json.dumps(asdict(report)))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Backfill CLI: `python -m app.bulk_ingest PATH [--manifest FILE]`.
+
+PATH is a directory of PDFs or a zip/tar archive. Rendering/OCR run on the job
+workers (`python -m app.worker`); re-running with the same manifest resumes.
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from app.config import load_config
+from app.domain.enums import JobType
+from app.features.ingest.archive import iter_pdf_sources
+from app.features.ingest.bulk import DEFAULT_BATCH_SIZE, BulkIngestService, BulkManifest
+from app.infra.db import DbConfig, connect, migrate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--manifest", type=Path, help="JSONL progress file (default: PATH.manifest.jsonl)"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--render-only", action="store_true", help="queue rendering only, not the OCR pipeline"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    cfg = load_config()
+    conn = connect(DbConfig(path=cfg.db_path))
+    migrate(conn)
+    default_manifest = args.path.with_name(args.path.name + ".manifest.jsonl")
+    manifest = BulkManifest(args.manifest or default_manifest)
+    service = BulkIngestService(
+        conn=conn,
+        blobs_dir=cfg.blobs_dir,
+        batch_size=args.batch_size,
+        job_type=JobType.ingest_render if args.render_only else JobType.pipeline_document_version,
+        remote=cfg.blob_remote,
+    )
+    summary = service.ingest(iter_pdf_sources(args.path), manifest=manifest)
+    summary.pop("entries")
+    print(json.dumps(summary))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,32 @@
+import os
 from dataclasses import dataclass
 from pathlib import Path
 
+from app.domain.enums import BlobBackendKind
+from app.domain.render_policy import DEFAULT_RENDER_POLICY, RenderPolicy
+from app.infra.blob_backends import BlobBackend, BlobBackendConfig, open_blob_backend
+
 
 @dataclass(frozen=True)
 class AppConfig:
     data_dir: Path
     admin_secret: str
+    # Worker processes used to rasterize PDF pages at ingest (1 = serial, in-process).
+    render_workers: int = 1
+    # Rasterize only pages whose native text layer needs OCR; others render on first view.
+    lazy_render: bool = False
+    # DPI/colour/codec for page images: high-DPI greyscale PNG for OCR, lighter for display.
+    render_policy: RenderPolicy = DEFAULT_RENDER_POLICY
+    # Tesseract processes per API or worker process, shared by all concurrent OCR calls
+    # and jobs there (see SharedPool); leave a core for the API.
+    ocr_workers: int = 1
+    # Concurrent job workers per worker process, and how long a claimed job stays leased
+    # without a heartbeat before another worker may take it over.
+    job_concurrency: int = 1
+    job_lease_seconds: int = 60
+    # Shared storage (S3/MinIO or a network mount) for originals and renders. None keeps
+    # them under data_dir only; with a backend, data_dir/blobs is a per-node cache.
+    blob_backend: BlobBackendConfig | None = None
 
     @property
     def db_path(self) -> Path:
@@ -15,7 +36,35 @@ class AppConfig:
     def blobs_dir(self) -> Path:
         return self.data_dir
 
+    @property
+    def blob_remote(self) -> BlobBackend | None:
+        return open_blob_backend(self.blob_backend) if self.blob_backend else None
+
 
 def load_config() -> AppConfig:
     # PoC: hard-coded default; override via env later.
-    return AppConfig(data_dir=Path("data"), admin_secret="dev-secret")
+    return AppConfig(
+        data_dir=Path("data"),
+        admin_secret="dev-secret",
+        # Leave one core for the API/event loop.
+        render_workers=max(1, (os.cpu_count() or 1) - 1),
+        lazy_render=True,
+        ocr_workers=max(1, (os.cpu_count() or 1) - 1),
+        job_concurrency=2,
+        blob_backend=_blob_backend_from_env(),
+    )
+
+
+def _blob_backend_from_env() -> BlobBackendConfig | None:
+    """`BLOB_BACKEND=s3 BLOB_LOCATION=<bucket>` (or `fs` + a mounted directory)."""
+
+    kind = os.environ.get("BLOB_BACKEND")
+    if not kind:
+        return None
+    return BlobBackendConfig(
+        kind=BlobBackendKind(kind),
+        location=os.environ["BLOB_LOCATION"],
+        prefix=os.environ.get("BLOB_PREFIX", ""),
+        endpoint_url=os.environ.get("BLOB_ENDPOINT_URL"),
+        region=os.environ.get("BLOB_REGION"),
+    )
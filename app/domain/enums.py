@@ -8,6 +8,14 @@ class JobStatus(str, Enum):
     failed = "failed"
 
 
+class JobType(str, Enum):
+    ingest_render = "ingest.render"
+    ocr_document_version = "ocr.document_version"
+    # Render, OCR and segmentation overlapped per page (see features/pipeline).
+    pipeline_document_version = "pipeline.document_version"
+    analysis_run = "analysis.run"
+
+
 class RunStatus(str, Enum):
     queued = "queued"
     running = "running"
@@ -17,6 +25,14 @@ class RunStatus(str, Enum):
     blocked = "blocked"
 
 
+class QualityLevel(str, Enum):
+    # See plans/poc-plan.md §4: native digital / digital but messy / needs OCR / unreadable.
+    q1 = "Q1"
+    q2 = "Q2"
+    q3 = "Q3"
+    q4 = "Q4"
+
+
 class ErrorStage(str, Enum):
     ingest = "ingest"
     parse = "parse"
@@ -26,6 +42,11 @@ class ErrorStage(str, Enum):
     explain = "explain"
 
 
+class RunErrorCode(str, Enum):
+    # The version's pages are not all persisted (render/OCR still running, or failed).
+    pages_incomplete = "pages_incomplete"
+
+
 class OutputType(str, Enum):
     extractor_json = "extractor_json"
     explainer_summary = "explainer_summary"
@@ -37,3 +58,31 @@ class OutputType(str, Enum):
     mechanism_validation_v1 = "mechanism_validation_v1"
     impacts_v1 = "impacts_v1"
     change_list_v1 = "change_list_v1"
+
+
+class ImageFormat(str, Enum):
+    # Value doubles as the file extension of rendered page images.
+    png = "png"
+    jpeg = "jpg"
+
+
+class OcrSkip(str, Enum):
+    already_done = "already_done"
+    native_text = "native_text"  # Q1/Q2 page with no text-less image regions
+    missing_image = "missing_image"
+
+
+class BulkEntryStatus(str, Enum):
+    ingested = "ingested"
+    duplicate = "duplicate"  # same sha256 already ingested (earlier run or same archive)
+    failed = "failed"
+
+
+class UploadStatus(str, Enum):
+    open = "open"
+    finalized = "finalized"
+
+
+class BlobBackendKind(str, Enum):
+    fs = "fs"  # shared directory (NFS/EFS mount)
+    s3 = "s3"  # S3-compatible object store (AWS, MinIO)
@@ -0,0 +1,133 @@
+"""Layout helpers for region-targeted OCR on mixed digital/scanned pages.
+
+A page with a usable text layer can still carry scanned stamps, tables or annex
+snippets as images. Only those image regions with no native text on them are OCR'd,
+and their text is spliced into the native text in reading order.
+"""
+
+import json
+from dataclasses import dataclass
+
+Rect = tuple[float, float, float, float]  # x0, y0, x1, y1 in PDF points
+
+# Ignore bullets, logos and rules: too small to carry text worth OCR'ing.
+_MIN_REGION_AREA_RATIO = 0.01
+_MIN_REGION_SIDE_PT = 24.0
+# Rows closer than this (points) read left-to-right as one line.
+_LINE_TOLERANCE_PT = 3.0
+
+
+@dataclass(frozen=True)
+class OcrRegion:
+    bbox: Rect
+    # Where the region's OCR text goes in the page's native text (reading order).
+    text_offset: int
+    image_path: str
+
+
+def find_ocr_regions(
+    page_rect: Rect, image_rects: list[Rect], text_rects: list[Rect]
+) -> list[Rect]:
+    """Image areas with no native text on them, overlaps merged, in reading order."""
+
+    page_area = _area(page_rect)
+    clipped = [_intersect(r, page_rect) for r in image_rects]
+    candidates = [
+        r
+        for r in clipped
+        if r is not None
+        and min(r[2] - r[0], r[3] - r[1]) >= _MIN_REGION_SIDE_PT
+        and page_area
+        and _area(r) / page_area >= _MIN_REGION_AREA_RATIO
+    ]
+    regions = [
+        r for r in _merge_overlapping(candidates) if not any(_center_in(t, r) for t in text_rects)
+    ]
+    return sorted(regions, key=reading_key)
+
+
+def layout_text(blocks: list[tuple[Rect, str]], regions: list[Rect]) -> tuple[str, list[int]]:
+    """Join native text blocks in reading order; return the text and each region's offset."""
+
+    items = sorted(
+        [(reading_key(r), 0, i) for i, (r, _) in enumerate(blocks)]
+        + [(reading_key(r), 1, i) for i, r in enumerate(regions)]
+    )
+    text, offsets = "", [0] * len(regions)
+    for _, kind, i in items:
+        if kind == 1:
+            offsets[i] = len(text)
+        else:
+            block = blocks[i][1]
+            text += block if block.endswith("\n") else block + "\n"
+    return text, offsets
+
+
+def merge_region_text(text: str, regions: list[OcrRegion], region_texts: list[str]) -> str:
+    """Splice OCR'd region texts into the native page text at their offsets."""
+
+    parts: list[str] = []
+    prev = 0
+    pairs = sorted(zip(regions, region_texts, strict=True), key=lambda x: x[0].text_offset)
+    for region, ocr in pairs:
+        parts.append(text[prev : region.text_offset])
+        if ocr.strip():
+            parts.append(ocr.strip() + "\n")
+        prev = region.text_offset
+    parts.append(text[prev:])
+    return "".join(parts)
+
+
+def reading_key(r: Rect) -> tuple[float, float]:
+    return (round(r[1] / _LINE_TOLERANCE_PT), r[0])
+
+
+def regions_to_json(regions: list[OcrRegion]) -> str | None:
+    if not regions:
+        return None
+    return json.dumps(
+        [
+            {"bbox": list(r.bbox), "text_offset": r.text_offset, "image_path": r.image_path}
+            for r in regions
+        ]
+    )
+
+
+def regions_from_json(raw: str | None) -> list[OcrRegion]:
+    if not raw:
+        return []
+    return [
+        OcrRegion(
+            bbox=tuple(d["bbox"]),
+            text_offset=int(d["text_offset"]),
+            image_path=str(d["image_path"]),
+        )
+        for d in json.loads(raw)
+    ]
+
+
+def _merge_overlapping(rects: list[Rect]) -> list[Rect]:
+    merged: list[Rect] = []
+    for r in rects:
+        while True:
+            hit = next((m for m in merged if _intersect(m, r) is not None), None)
+            if hit is None:
+                break
+            merged.remove(hit)
+            r = (min(r[0], hit[0]), min(r[1], hit[1]), max(r[2], hit[2]), max(r[3], hit[3]))
+        merged.append(r)
+    return merged
+
+
+def _intersect(a: Rect, b: Rect) -> Rect | None:
+    r = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    return r if r[0] < r[2] and r[1] < r[3] else None
+
+
+def _center_in(inner: Rect, outer: Rect) -> bool:
+    cx, cy = (inner[0] + inner[2]) / 2, (inner[1] + inner[3]) / 2
+    return outer[0] <= cx <= outer[2] and outer[1] <= cy <= outer[3]
+
+
+def _area(r: Rect) -> float:
+    return max(0.0, r[2] - r[0]) * max(0.0, r[3] - r[1])
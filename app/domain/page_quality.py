@@ -0,0 +1,76 @@
+"""Cheap per-page quality triage (Q1-Q4) from native text-layer and layout signals.
+
+Runs at ingest without OCR. Q4 is only assigned after OCR (low engine confidence),
+since text-layer signals alone cannot tell a poor scan from a good one.
+"""
+
+from dataclasses import dataclass
+
+from app.domain.enums import QualityLevel
+
+# Below this many glyphs the native text layer is treated as absent.
+_MIN_GLYPHS = 40
+# Glyph count at which a text-only page counts as fully covered by its text layer.
+_DENSE_GLYPHS = 200
+_MIN_VALID_RATIO = 0.85  # below: broken encoding / garbage glyphs -> OCR
+_CLEAN_VALID_RATIO = 0.97  # below: usable but messy (Q2)
+# Romanian prose runs ~3-6% diacritics; near zero on a long page means they were lost.
+_MIN_DIACRITIC_RATIO = 0.005
+_MIN_GLYPHS_FOR_DIACRITICS = 300
+_SCANNED_IMAGE_RATIO = 0.6  # page mostly covered by images
+_MIXED_IMAGE_RATIO = 0.15  # sizeable image regions next to native text
+_Q4_MAX_OCR_CONFIDENCE = 40.0
+
+_PUNCTUATION = set(".,;:!?()[]{}\"'„”«»-–—/\\%§&*+=<>°")
+_RO_DIACRITICS = set("ăâîșşțţĂÂÎȘŞȚŢ")
+
+
+@dataclass(frozen=True)
+class PageSignals:
+    glyph_count: int
+    valid_glyph_ratio: float
+    diacritic_ratio: float
+    image_area_ratio: float
+
+
+def page_signals(text: str | None, image_area_ratio: float = 0.0) -> PageSignals:
+    glyphs = [c for c in (text or "") if not c.isspace()]
+    letters = [c for c in glyphs if c.isalpha()]
+    valid = sum(1 for c in glyphs if c.isalnum() or c in _PUNCTUATION)
+    return PageSignals(
+        glyph_count=len(glyphs),
+        valid_glyph_ratio=valid / len(glyphs) if glyphs else 0.0,
+        diacritic_ratio=sum(1 for c in letters if c in _RO_DIACRITICS) / len(letters)
+        if letters
+        else 0.0,
+        image_area_ratio=image_area_ratio,
+    )
+
+
+def classify_page(s: PageSignals) -> QualityLevel:
+    if s.glyph_count < _MIN_GLYPHS or s.valid_glyph_ratio < _MIN_VALID_RATIO:
+        return QualityLevel.q3
+    if s.image_area_ratio >= _SCANNED_IMAGE_RATIO and s.glyph_count < _DENSE_GLYPHS:
+        return QualityLevel.q3
+    messy = s.valid_glyph_ratio < _CLEAN_VALID_RATIO or s.image_area_ratio >= _MIXED_IMAGE_RATIO
+    lost_diacritics = (
+        s.glyph_count >= _MIN_GLYPHS_FOR_DIACRITICS and s.diacritic_ratio < _MIN_DIACRITIC_RATIO
+    )
+    return QualityLevel.q2 if messy or lost_diacritics else QualityLevel.q1
+
+
+def needs_ocr(level: QualityLevel | str | None, text: str | None = None) -> bool:
+    """Q3/Q4 pages need OCR. Pages ingested before triage existed are scored from text."""
+
+    if level is None:
+        level = classify_page(page_signals(text))
+    return QualityLevel(level) in (QualityLevel.q3, QualityLevel.q4)
+
+
+def after_ocr(level: QualityLevel, ocr_confidence: float | None) -> QualityLevel:
+    """Demote an OCR'd page to Q4 when the engine itself is unsure of the result."""
+
+    if ocr_confidence is None or ocr_confidence < _Q4_MAX_OCR_CONFIDENCE:
+        return QualityLevel.q4
+    return level
+
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+
+from app.domain.enums import ImageFormat
+
+
+@dataclass(frozen=True)
+class RenderSpec:
+    dpi: int
+    grayscale: bool
+    bilevel: bool
+    image_format: ImageFormat
+
+
+@dataclass(frozen=True)
+class RenderPolicy:
+    """How page images are rasterized, depending on whether they are headed to OCR.
+
+    OCR images get a high DPI (small print in scanned annexes) and always stay lossless
+    PNG, since JPEG artefacts and pre-thresholding both hurt Tesseract. Display-only
+    pages get a lower DPI and may use JPEG or 1-bit PNG to save storage/encode time.
+    """
+
+    ocr_dpi: int = 300
+    display_dpi: int = 110
+    grayscale: bool = True
+    # 1-bit PNG for display pages (ignored for JPEG); good for plain text pages.
+    display_bilevel: bool = False
+    display_format: ImageFormat = ImageFormat.png
+    # On pages with a usable text layer, rasterize image regions that carry no native
+    # text (stamps, scanned tables) for OCR instead of leaving them unread.
+    region_ocr: bool = True
+
+    def spec_for(self, for_ocr: bool) -> RenderSpec:
+        if for_ocr:
+            return RenderSpec(self.ocr_dpi, self.grayscale, False, ImageFormat.png)
+        bilevel = self.display_bilevel and self.display_format is ImageFormat.png
+        return RenderSpec(self.display_dpi, self.grayscale, bilevel, self.display_format)
+
+
+# Shared default for signatures (a frozen dataclass, so one instance is safe to reuse).
+DEFAULT_RENDER_POLICY = RenderPolicy()
@@ -55,7 +55,7 @@ def extract_change_list_v1(*, chunks: list[ChunkRow]) -> list[ChangeItem]:
             continue
 
         excerpt = _extract_new_wording_excerpt(text)
-        evidence = [SpanRef(page_number=ch.page_start, quote=text[:700])]
+        evidence = [SpanRef(page_number=ch.page_start, quote=text[:700], bbox_json=ch.bbox_json)]
 
         conf = min(0.95, 0.55 + 0.25 * target_conf + (0.15 if excerpt else 0.0))
 
@@ -0,0 +1,44 @@
+from app.features.analysis.segmentation_v1 import Segment
+from app.infra.ocr import OcrWord
+from app.infra.ocr_words import bbox_to_json, quote_bbox
+from app.infra.repo_chunks import ChunkRepo, ChunkRow, NewChunk
+
+
+def persist_segments(
+    chunk_repo: ChunkRepo,
+    document_version_id: int,
+    segs: list[Segment],
+    words_by_page: dict[int, list[OcrWord]],
+    article_ids: dict[str, int],
+) -> list[ChunkRow]:
+    """Insert segments as chunks in one batch; ALIN parents resolve within the batch or
+    through `article_ids` (articles persisted by earlier batches; updated).
+
+    OCR word boxes (when the page was OCR'd) locate each chunk on its first page.
+    """
+
+    batch_articles: dict[str, int] = {}
+    new: list[NewChunk] = []
+    for i, s in enumerate(segs):
+        key = s.parent_key
+        new.append(
+            NewChunk(
+                chunk_type=s.chunk_type,
+                label=s.label,
+                page_start=s.page_start,
+                page_end=s.page_end,
+                text=s.text,
+                bbox_json=bbox_to_json(quote_bbox(words_by_page.get(s.page_start, []), s.text)),
+                parent_index=batch_articles.get(key) if key is not None else None,
+                parent_chunk_id=(
+                    article_ids.get(key) if key is not None and key not in batch_articles else None
+                ),
+            )
+        )
+        if s.chunk_type == "ARTICLE" and s.label:
+            batch_articles[f"ARTICLE::{s.label}"] = i
+
+    rows = chunk_repo.create_many(document_version_id, new)
+    for key, i in batch_articles.items():
+        article_ids[key] = rows[i].id
+    return rows
@@ -35,7 +35,7 @@ def extract_mechanisms_v1(
         excerpt = excerpt[:500]
         if not excerpt:
             return []
-        return [SpanRef(page_number=ch.page_start, quote=excerpt)]
+        return [SpanRef(page_number=ch.page_start, quote=excerpt, bbox_json=ch.bbox_json)]
 
     for ch in chunks:
         if ch.chunk_type not in {"ARTICLE", "ALIN", "FULL_TEXT"}:
@@ -80,3 +80,12 @@ def extract_mechanisms_v1(
 
 def mechanisms_to_json(mechs: list[Mechanism]) -> str:
     return json.dumps([asdict(m) for m in mechs], ensure_ascii=False)
+
+
+def mechanisms_from_json(raw: str) -> list[Mechanism]:
+    """Inverse of `mechanisms_to_json` (cached stage outputs feed downstream stages)."""
+
+    return [
+        Mechanism(**{**m, "evidence": [SpanRef(**e) for e in m["evidence"]]})
+        for m in json.loads(raw)
+    ]
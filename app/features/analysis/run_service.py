@@ -0,0 +1,199 @@
+# EXCEPTION: >150 LOC because memoization, single-flight and execution share one run lifecycle.
+import json
+import logging
+
+from fastapi import HTTPException
+
+from app.domain.enums import ErrorStage, JobStatus, JobType, RunErrorCode, RunStatus
+from app.features.analysis.stage_dag import run_dag
+from app.features.analysis.stages_v1 import (
+    PIPELINE_VERSION,
+    STAGES_V1,
+    AnalysisContext,
+    analysis_input_fingerprint,
+)
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_errors import ErrorRepo
+from app.infra.repo_evidence import EvidenceRepo, NewEvidence
+from app.infra.repo_jobs import JobRepo
+from app.infra.repo_pages import Page, PageRepo
+from app.infra.repo_runs import AnalysisRun, NewOutput, OutputRepo, RunRepo
+from app.infra.repo_stage_artifacts import StageArtifactRepo
+
+log = logging.getLogger(__name__)
+
+
+class AnalysisRunService:
+    """Queue an analysis run for a bill's latest document version; execute it in a job."""
+
+    def __init__(self, *, conn) -> None:
+        self._conn = conn
+
+    def queue_run(self, *, bill_id: int, force: bool = False) -> dict[str, object]:
+        """Queue a run, or return the latest succeeded run for the same input.
+
+        A run is reused when the version's current page fingerprint and the pipeline
+        version both match; `force` always queues a fresh run. 409 until every page of
+        the version is persisted (rendering/OCR may still be in progress).
+        """
+
+        row = self._conn.execute(
+            """
+            SELECT dv.id AS document_version_id
+            FROM document_versions dv
+            JOIN documents d ON d.id = dv.document_id
+            WHERE d.bill_id = ?
+            ORDER BY dv.id DESC
+            LIMIT 1
+            """,
+            (bill_id,),
+        ).fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="bill_or_document_not_found")
+
+        document_version_id = int(row["document_version_id"])
+        pages = PageRepo(self._conn).list_for_version(document_version_id=document_version_id)
+        if not pages:
+            raise HTTPException(status_code=409, detail="no_pages_for_document_version")
+        missing = self._missing_pages(document_version_id, pages)
+        if missing is not None:
+            raise HTTPException(status_code=409, detail=f"pages_incomplete:{missing}")
+        fingerprint = analysis_input_fingerprint(document_version_id, pages)
+        if not force:
+            run_repo = RunRepo(self._conn)
+            done = run_repo.find_latest(fingerprint, PIPELINE_VERSION, RunStatus.succeeded)
+            if done is not None:
+                return _run_response(done, document_version_id, reused=True, coalesced=False)
+
+        run, created = self._single_flight(bill_id, document_version_id, fingerprint)
+        return _run_response(run, document_version_id, reused=False, coalesced=not created)
+
+    def _single_flight(
+        self, bill_id: int, document_version_id: int, fingerprint: str
+    ) -> tuple[AnalysisRun, bool]:
+        """Create and enqueue a run, or attach to the one already in flight for the version.
+
+        Returns (run, created). A queued/running run whose job has permanently failed
+        (e.g. its worker died on the last attempt) is marked failed and replaced.
+        """
+
+        run_repo = RunRepo(self._conn)
+        jobs = JobRepo(self._conn)
+        while True:
+            run = run_repo.create_in_flight(
+                bill_id, document_version_id, fingerprint, PIPELINE_VERSION, JobType.analysis_run
+            )
+            if run is not None:
+                return run, True
+            current = run_repo.find_in_flight(document_version_id)
+            if current is None:
+                continue  # it finished between the two statements
+            if current.job_id is not None and jobs.get(current.job_id).status is JobStatus.failed:
+                run_repo.mark_finished(current.id, RunStatus.failed, quality_summary_json=None)
+                continue
+            return current, False
+
+    def execute(self, *, run_id: int, document_version_id: int) -> dict[str, object]:
+        """Job handler body: run the stage DAG for one queued run and persist its outputs.
+
+        A retried attempt first drops what an earlier attempt persisted for the run. On
+        error the run is marked failed (a retry marks it running again, unless another
+        run for the version was queued meanwhile) and the error propagates so the job is
+        retried with backoff.
+        """
+
+        run_repo = RunRepo(self._conn)
+        if not run_repo.mark_running(run_id):
+            # This run failed earlier and a newer run for the version is in flight.
+            log.warning("analysis run %s superseded by an in-flight run", run_id)
+            return {"analysis_run_id": run_id, "status": RunStatus.failed.value}
+        OutputRepo(self._conn).delete_for_run(run_id)
+        EvidenceRepo(self._conn).delete_for_run(run_id)
+        try:
+            return self._analyze(run_id, document_version_id)
+        except Exception:
+            run_repo.mark_finished(run_id, status=RunStatus.failed, quality_summary_json=None)
+            raise
+
+    def _analyze(self, run_id: int, document_version_id: int) -> dict[str, object]:
+        run_repo = RunRepo(self._conn)
+        pages = PageRepo(self._conn).list_for_version(document_version_id=document_version_id)
+        missing = self._missing_pages(document_version_id, pages)
+        if missing is not None:
+            # Nothing to retry until the document is (re)ingested.
+            log.warning("analysis run %s: version %s has %s", run_id, document_version_id, missing)
+            ErrorRepo(self._conn).create(
+                run_id,
+                ErrorStage.ingest,
+                RunErrorCode.pages_incomplete.value,
+                f"persisted/expected pages: {missing}",
+                json.dumps({"document_version_id": document_version_id}),
+            )
+            run_repo.mark_finished(run_id, status=RunStatus.failed, quality_summary_json=None)
+            return {"analysis_run_id": run_id, "status": RunStatus.failed.value}
+
+        # Pages may have changed (e.g. OCR finished) between queueing and execution.
+        fingerprint = analysis_input_fingerprint(document_version_id, pages)
+        run_repo.set_input_fingerprint(run_id, fingerprint)
+
+        ctx = AnalysisContext(self._conn, document_version_id, pages)
+        result = run_dag(STAGES_V1, ctx, fingerprint, StageArtifactRepo(self._conn))
+        contents = result.contents
+
+        findings = json.loads(contents["findings"])["findings"]
+        EvidenceRepo(self._conn).create_many(
+            run_id,
+            document_version_id,
+            [
+                NewEvidence(
+                    claim_id=f"finding:{i}:{f['kind']}:{f['label']}",
+                    page_number=e["page_number"],
+                    excerpt_text=e["quote"],
+                    article_label=f["label"],
+                )
+                for i, f in enumerate(findings)
+                for e in f["evidence"]
+            ],
+        )
+        # Sustainability scoring is intentionally disabled for now (trust posture).
+        OutputRepo(self._conn).create_many(
+            run_id,
+            [NewOutput(s.output_type, contents[s.name]) for s in STAGES_V1 if s.output_type],
+        )
+        run_repo.mark_finished(
+            run_id, status=RunStatus.succeeded, quality_summary_json=contents["quality"]
+        )
+        log.info(
+            "analysis run %s: executed=%s reused=%s", run_id, result.executed, result.reused
+        )
+        return {
+            "analysis_run_id": run_id,
+            "status": RunStatus.succeeded.value,
+            "chunk_count": json.loads(contents["segmentation"])["chunk_count"],
+            "finding_count": len(findings),
+            "stages_executed": result.executed,
+            "stages_reused": result.reused,
+        }
+
+    def _missing_pages(self, document_version_id: int, pages: list[Page]) -> str | None:
+        """`persisted/expected` when not every page of the version is persisted yet."""
+
+        expected = DocumentVersionRepo(self._conn).get(document_version_id).page_count
+        if expected is not None and expected == len(pages) > 0:
+            return None
+        return f"{len(pages)}/{expected if expected is not None else '?'}"
+
+
+def _run_response(
+    run: AnalysisRun, document_version_id: int, *, reused: bool, coalesced: bool
+) -> dict[str, object]:
+    return {
+        "analysis_run_id": run.id,
+        "bill_id": run.bill_id,
+        "document_version_id": document_version_id,
+        "status": run.status.value,
+        "job_id": None if reused else run.job_id,
+        "reused": reused,
+        # Attached to a run another request had already queued for this version.
+        "coalesced": coalesced,
+    }
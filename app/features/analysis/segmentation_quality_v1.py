@@ -2,6 +2,7 @@ import json
 import re
 from dataclasses import dataclass, asdict
 
+from app.domain.enums import QualityLevel
 from app.infra.repo_chunks import ChunkRow
 
 
@@ -14,6 +15,9 @@ class SegmentationQualityV1:
     article_label_duplicates: list[str]
     article_label_non_monotonic: bool
     page_coverage_ratio: float
+    # Ingest/OCR triage (Q1-Q4): worst page level and pages OCR could not read reliably.
+    document_quality_level: str | None
+    unreadable_pages: list[int]
     warnings: list[str]
 
 
@@ -21,6 +25,7 @@ def compute_segmentation_quality_v1(
     *,
     chunks: list[ChunkRow],
     page_numbers_present: list[int],
+    page_quality_levels: dict[int, str | None] | None = None,
 ) -> SegmentationQualityV1:
     articles = [c for c in chunks if c.chunk_type == "ARTICLE"]
     alins = [c for c in chunks if c.chunk_type == "ALIN"]
@@ -52,6 +57,9 @@ def compute_segmentation_quality_v1(
     present = set(page_numbers_present)
     coverage_ratio = (len(covered & present) / len(present)) if present else 0.0
 
+    levels = {p: q for p, q in (page_quality_levels or {}).items() if q}
+    unreadable = sorted(p for p, q in levels.items() if q == QualityLevel.q4.value)
+
     warnings: list[str] = []
     if not articles and not full:
         warnings.append("no_structure_detected")
@@ -63,6 +71,8 @@ def compute_segmentation_quality_v1(
         warnings.append("non_monotonic_article_numbers")
     if coverage_ratio < 0.8:
         warnings.append("low_page_coverage")
+    if unreadable:
+        warnings.append("unreadable_pages")
 
     return SegmentationQualityV1(
         article_count=len(articles),
@@ -72,6 +82,8 @@ def compute_segmentation_quality_v1(
         article_label_duplicates=dups,
         article_label_non_monotonic=non_monotonic,
         page_coverage_ratio=coverage_ratio,
+        document_quality_level=max(levels.values()) if levels else None,
+        unreadable_pages=unreadable,
         warnings=warnings,
     )
 
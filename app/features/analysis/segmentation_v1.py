@@ -36,9 +36,50 @@ def segment_pages_to_structure(pages: list[tuple[int, str]]) -> list[Segment]:
     # Build a single stream with page markers so we can map segments back to page ranges.
     stream_lines: list[tuple[int, str]] = []
     for page_no, page_text in pages:
-        for line in page_text.splitlines():
-            stream_lines.append((page_no, line.rstrip("\n")))
+        stream_lines.extend(_page_lines(page_no, page_text))
+    return _segment_lines(stream_lines)
 
+
+class StreamingSegmenter:
+    """Incremental variant for pages arriving in order (pipelined ingest).
+
+    An article is complete once the next `Art.` heading has been seen, so `add_page`
+    returns the segments of every article before the last heading so far; `finish`
+    flushes the rest. The concatenated output equals `segment_pages_to_structure`.
+    """
+
+    def __init__(self) -> None:
+        self._lines: list[tuple[int, str]] = []
+        # Buffer index of the first `Art.` heading, if any. Only a new page's lines are
+        # scanned, so a long heading-less bill stays linear in its line count.
+        self._first_heading: int | None = None
+
+    def add_page(self, page_no: int, page_text: str) -> list[Segment]:
+        new_from = len(self._lines)
+        self._lines.extend(_page_lines(page_no, page_text))
+        last: int | None = None
+        for i in range(new_from, len(self._lines)):
+            if _ART_RE.match(self._lines[i][1]):
+                if self._first_heading is None:
+                    self._first_heading = i
+                last = i
+        if last is None or last == self._first_heading:
+            return []
+        done, self._lines = self._lines[:last], self._lines[last:]
+        self._first_heading = 0
+        return _segment_lines(done)
+
+    def finish(self) -> list[Segment]:
+        done, self._lines = self._lines, []
+        self._first_heading = None
+        return _segment_lines(done)
+
+
+def _page_lines(page_no: int, page_text: str) -> list[tuple[int, str]]:
+    return [(page_no, line.rstrip("\n")) for line in page_text.splitlines()]
+
+
+def _segment_lines(stream_lines: list[tuple[int, str]]) -> list[Segment]:
     # Find article starts.
     art_starts: list[tuple[int, int, str]] = []  # (line_idx, page_no, art_label)
     for i, (page_no, line) in enumerate(stream_lines):
@@ -0,0 +1,236 @@
+# EXCEPTION: >150 LOC because the whole analysis DAG is declared in one reviewable place.
+"""The analysis pipeline as a stage DAG (see `stage_dag.py`).
+
+segmentation -> structure_tree, references, mechanisms, change_list, quality
+mechanisms   -> mechanism_validation, explainer
+findings (v0 extractor) reads page text only.
+"""
+
+import hashlib
+import json
+
+from app.domain.enums import OutputType
+from app.features.analysis.change_list_v1 import change_list_to_json, extract_change_list_v1
+from app.features.analysis.chunk_store import persist_segments
+from app.features.analysis.explainer_v1 import explain_v1
+from app.features.analysis.mechanism_validators_v1 import validate_mechanisms_v1
+from app.features.analysis.mechanisms_v1 import (
+    extract_mechanisms_v1,
+    mechanisms_from_json,
+    mechanisms_to_json,
+)
+from app.features.analysis.references_v1 import extract_reference_edges_v1, reference_edges_to_json
+from app.features.analysis.segmentation_quality_v1 import (
+    compute_segmentation_quality_v1,
+    quality_to_json,
+)
+from app.features.analysis.segmentation_v1 import Segment, segment_pages_to_structure
+from app.features.analysis.service import chunk_by_article, extract_findings
+from app.features.analysis.stage_dag import Stage, dag_version
+from app.features.analysis.structure_tree_v1 import (
+    build_structure_nodes_v1,
+    structure_nodes_to_json,
+)
+from app.infra.repo_chunks import ChunkRepo, ChunkRow
+from app.infra.repo_ocr_words import PageWordsRepo
+from app.infra.repo_pages import Page
+
+
+class AnalysisContext:
+    """What stages read: the version's pages and (lazily) its persisted chunks."""
+
+    def __init__(self, conn, document_version_id: int, pages: list[Page]) -> None:
+        self.conn = conn
+        self.document_version_id = document_version_id
+        self.pages = pages
+        self.page_texts = page_texts(pages)
+        self._chunks: list[ChunkRow] | None = None
+
+    def chunks(self) -> list[ChunkRow]:
+        if self._chunks is None:
+            self._chunks = ChunkRepo(self.conn).list_for_version(self.document_version_id)
+        return self._chunks
+
+    def set_chunks(self, rows: list[ChunkRow]) -> None:
+        self._chunks = rows
+
+
+def page_texts(pages: list[Page]) -> list[tuple[int, str]]:
+    texts: list[tuple[int, str]] = []
+    for p in pages:
+        text = (p.ocr_text or p.text or "").strip()
+        if text:
+            texts.append((p.page_number, text))
+    return texts
+
+
+def analysis_input_fingerprint(document_version_id: int, pages: list[Page]) -> str:
+    """Root input hash: per-page text hashes and quality levels of one version.
+
+    The version id is included because persisted artifacts embed it and chunk ids.
+    """
+
+    h = hashlib.sha256(f"document_version:{document_version_id}".encode())
+    for n, text in page_texts(pages):
+        h.update(f"\n{n}:".encode())
+        h.update(hashlib.sha256(text.encode()).digest())
+    for p in pages:
+        h.update(f"\nq{p.page_number}:{p.quality_level}".encode())
+    return f"sha256:{h.hexdigest()}"
+
+
+def _segmentation(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    # Structural chunks (ARTICLE/ALIN) are persisted for traceability; the stage's
+    # content is a digest of their rows, so downstream keys change whenever they do.
+    dv_id = ctx.document_version_id
+    chunk_repo = ChunkRepo(ctx.conn)
+    segs = segment_pages_to_structure(ctx.page_texts)
+    rows = chunk_repo.list_for_version(dv_id)
+    if _segment_keys(segs) != _row_keys(rows):
+        # Not segmented yet, or by other code/text: replace what the pipeline stored.
+        chunk_repo.delete_for_version(document_version_id=dv_id)
+        words_by_page = PageWordsRepo(ctx.conn).list_for_version(dv_id)
+        rows = persist_segments(chunk_repo, dv_id, segs, words_by_page, article_ids={})
+    ctx.set_chunks(rows)
+    return json.dumps({"chunk_count": len(rows), "chunks_sha256": _chunks_digest(rows)})
+
+
+_SegmentKey = tuple[str, str | None, int, int, str, str | None]
+
+
+def _segment_keys(segs: list[Segment]) -> list[_SegmentKey]:
+    return [(s.chunk_type, s.label, s.page_start, s.page_end, s.text, s.parent_key) for s in segs]
+
+
+def _row_keys(rows: list[ChunkRow]) -> list[_SegmentKey]:
+    """Chunk rows as `_segment_keys` would describe the segments they were stored from."""
+
+    labels = {r.id: f"{r.chunk_type}::{r.label}" for r in rows}
+    return [
+        (
+            r.chunk_type,
+            r.label,
+            r.page_start,
+            r.page_end,
+            r.text,
+            labels.get(r.parent_chunk_id) if r.parent_chunk_id is not None else None,
+        )
+        for r in rows
+    ]
+
+
+def _chunks_digest(rows: list[ChunkRow]) -> str:
+    """Hash of what stages read from chunk rows.
+
+    Content (type, label, pages, text) plus ids: downstream outputs cite `chunk:{id}`.
+    """
+
+    h = hashlib.sha256()
+    for r in rows:
+        fields = (r.id, r.parent_chunk_id, r.chunk_type, r.label, r.page_start, r.page_end)
+        h.update(json.dumps(fields).encode())
+        h.update(hashlib.sha256(r.text.encode()).digest())
+    return h.hexdigest()
+
+
+def _chunks_unchanged(ctx: AnalysisContext, content: str) -> bool:
+    # Another job (e.g. the ingest pipeline) may have re-segmented this version since.
+    cached: str = json.loads(content)["chunks_sha256"]
+    return cached == _chunks_digest(ctx.chunks())
+
+
+def _structure_tree(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    nodes = build_structure_nodes_v1(
+        document_version_id=ctx.document_version_id, chunks=ctx.chunks()
+    )
+    return structure_nodes_to_json(nodes)
+
+
+def _references(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    # Best-effort extraction from chunk text.
+    edges = extract_reference_edges_v1(
+        document_version_id=ctx.document_version_id, chunks=ctx.chunks()
+    )
+    return reference_edges_to_json(edges)
+
+
+def _mechanisms(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    # Span-grounded, conservative triggers.
+    mechs = extract_mechanisms_v1(
+        document_version_id=ctx.document_version_id, chunks=ctx.chunks()
+    )
+    return mechanisms_to_json(mechs)
+
+
+def _change_list(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    # Deterministic list of amendments with evidence.
+    return change_list_to_json(extract_change_list_v1(chunks=ctx.chunks()))
+
+
+def _mechanism_validation(_: AnalysisContext, up: dict[str, str]) -> str:
+    issues = validate_mechanisms_v1(mechanisms_from_json(up["mechanisms"]))
+    return json.dumps([issue.__dict__ for issue in issues], ensure_ascii=False)
+
+
+def _findings(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    # v0 extractor is kept only as a temporary fallback for "findings".
+    # Citizen summary must be generated strictly from v1 mechanisms.
+    chunks = chunk_by_article("\n\n".join(t for _, t in ctx.page_texts))
+    findings = extract_findings(pages=ctx.page_texts, chunks=chunks)
+    return json.dumps(
+        {
+            "chunks": [c.label for c in chunks],
+            "findings": [
+                {
+                    "kind": f.kind,
+                    "label": f.label,
+                    "evidence": [
+                        {"page_number": e.page_number, "quote": e.quote} for e in f.evidence
+                    ],
+                }
+                for f in findings
+            ],
+        },
+        ensure_ascii=False,
+    )
+
+
+def _explainer(_: AnalysisContext, up: dict[str, str]) -> str:
+    summary = explain_v1(mechanisms=mechanisms_from_json(up["mechanisms"]))
+    return json.dumps(
+        {"bullets": summary.bullets, "limitations": summary.limitations}, ensure_ascii=False
+    )
+
+
+def _quality(ctx: AnalysisContext, _: dict[str, str]) -> str:
+    # Segmentation quality summary (v1): stored on the run for observability.
+    q = compute_segmentation_quality_v1(
+        chunks=ctx.chunks(),
+        page_numbers_present=[p.page_number for p in ctx.pages],
+        page_quality_levels={p.page_number: p.quality_level for p in ctx.pages},
+    )
+    return quality_to_json(q)
+
+
+# Declaration order is execution order (and run output order); deps must come first.
+# Impacts/scoring are intentionally absent for now (trust posture): mechanisms + evidence
+# only until actor/action/object extraction is stronger and evidence-backed.
+STAGES_V1: tuple[Stage, ...] = (
+    Stage("segmentation", "v2", (), _segmentation, still_valid=_chunks_unchanged),
+    Stage("structure_tree", "v1", ("segmentation",), _structure_tree, OutputType.structure_tree_v1),
+    Stage("references", "v1", ("segmentation",), _references, OutputType.reference_graph_v1),
+    Stage("mechanisms", "v1", ("segmentation",), _mechanisms, OutputType.mechanisms_v1),
+    Stage("change_list", "v1", ("segmentation",), _change_list, OutputType.change_list_v1),
+    Stage(
+        "mechanism_validation",
+        "v1",
+        ("mechanisms",),
+        _mechanism_validation,
+        OutputType.mechanism_validation_v1,
+    ),
+    Stage("findings", "v0", (), _findings, OutputType.extractor_json),
+    Stage("explainer", "v1", ("mechanisms",), _explainer, OutputType.explainer_summary),
+    Stage("quality", "v1", ("segmentation",), _quality),
+)
+
+PIPELINE_VERSION = dag_version(STAGES_V1)
@@ -17,7 +17,7 @@ def build_structure_nodes_v1(
 
     Pareto v1:
     - Root node + ARTICLE + ALIN
-    - Evidence is best-effort: page range + excerpt; no offsets/bbox.
+    - Evidence is best-effort: page range + excerpt, plus the chunk bbox on OCR'd pages.
     """
 
     nodes: list[StructureNode] = []
@@ -44,7 +44,11 @@ def build_structure_nodes_v1(
             parent_id = f"chunk:{ch.parent_chunk_id}"
 
         excerpt = (ch.text or "").strip()[:400]
-        spans = [SpanRef(page_number=ch.page_start, quote=excerpt)] if excerpt else []
+        spans = (
+            [SpanRef(page_number=ch.page_start, quote=excerpt, bbox_json=ch.bbox_json)]
+            if excerpt
+            else []
+        )
 
         nodes.append(
             StructureNode(
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Request, Response
+
+from app.features.blobs.service import BlobsService
+
+router = APIRouter(prefix="/blobs", tags=["blobs"])
+
+
+@router.api_route("/{sha256}", methods=["GET", "HEAD"])
+def probe_blob(request: Request, response: Response, sha256: str) -> dict[str, object]:
+    """200 if the bytes are stored (attach them via POST /bills/attach), else 404."""
+
+    cfg = request.app.state.cfg
+    conn = request.app.state.db
+    service = BlobsService(conn=conn, blobs_dir=cfg.blobs_dir, remote=cfg.blob_remote)
+    body = service.describe(sha256=sha256)
+    response.headers["X-Blob-Size"] = str(body["size_bytes"])
+    return body
@@ -0,0 +1,111 @@
+import itertools
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.infra.blob_backends import BlobBackend, BlobObject
+from app.infra.repo_blob_refs import BlobRefRepo
+from app.infra.storage import BlobStore, is_sha256
+
+# Files younger than this are never collected: an upload or render may have written
+# them without having committed the row that references them yet.
+DEFAULT_GRACE_SECONDS = 6 * 3600
+
+
+@dataclass(frozen=True)
+class GcReport:
+    blobs_removed: int
+    page_files_removed: int
+    scratch_files_removed: int
+    bytes_freed: int
+    dry_run: bool
+
+
+def collect_garbage(
+    conn,
+    blobs_dir: Path,
+    grace_seconds: float = DEFAULT_GRACE_SECONDS,
+    dry_run: bool = False,
+    remote: BlobBackend | None = None,
+) -> GcReport:
+    """Mark-and-sweep over stored blobs; safe to run while the API and workers are live.
+
+    Mark: blob hashes referenced by `document_versions` and, per live blob, the page and
+    region images referenced by `pages`. Sweep: unreferenced blobs, orphaned renders
+    inside live blobs, and abandoned upload scratch files, all past the grace period.
+    A blob is re-checked right before deletion in case it was registered since the
+    mark, and its original re-stat'ed (locally and on the backend): re-uploading
+    existing bytes refreshes their mtime for the same reason. With a
+    `remote` backend, its listing is swept and local copies are dropped alongside.
+    """
+
+    store = BlobStore(Path(blobs_dir), remote=remote)
+    refs = BlobRefRepo(conn)
+    cutoff = time.time() - grace_seconds
+    live = refs.version_ref_counts()
+    blobs = page_files = scratch = freed = 0
+
+    for sha, objects in _group_by_blob(store.iter_objects("blobs/")):
+        if sha not in live:
+            if max(o.mtime for o in objects) >= cutoff or refs.ref_count(sha):
+                continue
+            if _touched_since(store, objects, cutoff):
+                continue
+            blobs += 1
+            freed += sum(o.size for o in objects)
+            if not dry_run:
+                for o in objects:
+                    store.delete_key(o.key)
+                store.drop_local_blob_dir(sha)
+            continue
+        referenced = {store.key_for(Path(p)) for p in refs.page_file_paths(sha)}
+        for o in objects:
+            if "/pages/" not in o.key or o.key in referenced or o.mtime >= cutoff:
+                continue
+            page_files += 1
+            freed += o.size
+            if not dry_run:
+                store.delete_key(o.key)
+
+    open_uploads = refs.open_upload_ids()
+    for upload_id, part in store.iter_scratch_files():
+        st = part.stat()
+        if upload_id in open_uploads or st.st_mtime >= cutoff:
+            continue
+        scratch += 1
+        freed += st.st_size
+        if not dry_run:
+            part.unlink(missing_ok=True)
+
+    return GcReport(
+        blobs_removed=blobs,
+        page_files_removed=page_files,
+        scratch_files_removed=scratch,
+        bytes_freed=freed,
+        dry_run=dry_run,
+    )
+
+
+def _touched_since(store: BlobStore, objects: list[BlobObject], cutoff: float) -> bool:
+    """Re-stat the originals (local and remote): a re-upload may have refreshed them
+    after the listing was taken and before its row is committed."""
+
+    for o in objects:
+        if "/pages/" not in o.key:
+            mtime = store.key_mtime(o.key)
+            if mtime is not None and mtime >= cutoff:
+                return True
+    return False
+
+
+def _group_by_blob(objects: Iterator[BlobObject]) -> Iterator[tuple[str, list[BlobObject]]]:
+    """Objects under `blobs/ab/cd/<sha>/`, grouped per blob (listings are key-ordered)."""
+
+    def sha_of(o: BlobObject) -> str | None:
+        parts = o.key.split("/")
+        return parts[3] if len(parts) > 4 and is_sha256(parts[3]) else None
+
+    for sha, group in itertools.groupby(objects, key=sha_of):
+        if sha is not None:
+            yield sha, list(group)
@@ -0,0 +1,63 @@
+import os
+import shutil
+from pathlib import Path
+
+from app.infra.blob_backends import BlobBackend, FsBackend
+from app.infra.repo_blob_refs import BlobRefRepo
+from app.infra.storage import BlobStore
+
+
+def migrate_to_sharded(conn, blobs_dir: Path) -> dict[str, int]:
+    """Move `blobs/<sha>/` to `blobs/ab/cd/<sha>/` and repoint the rows that name it.
+
+    Each blob is moved, then its rows rewritten in one transaction, so readers see the old
+    path for at most that window (missing page images re-render on demand). Idempotent:
+    re-running after a crash finishes moves and fixes rows left on legacy paths.
+    """
+
+    store = BlobStore(Path(blobs_dir))
+    refs = BlobRefRepo(conn)
+    moved = repointed = 0
+    for sha, legacy in list(store.iter_legacy_blob_dirs()):
+        target = store.blob_dir(sha)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            _merge_into(legacy, target)
+        else:
+            os.replace(legacy, target)
+        moved += 1
+        repointed += refs.rewrite_blob_paths(sha, _prefix(legacy), _prefix(target))
+
+    for sha in refs.version_ref_counts():
+        repointed += refs.rewrite_blob_paths(
+            sha, _prefix(store.legacy_blob_dir(sha)), _prefix(store.blob_dir(sha))
+        )
+    return {"blobs_moved": moved, "versions_repointed": repointed}
+
+
+def push_to_remote(blobs_dir: Path, remote: BlobBackend) -> dict[str, int]:
+    """Upload local blobs the shared backend lacks (run once when enabling a backend)."""
+
+    store = BlobStore(Path(blobs_dir), remote=remote)
+    pushed = 0
+    for obj in FsBackend(Path(blobs_dir)).iter_objects("blobs/"):
+        if obj.key.endswith(".part") or remote.stat(obj.key) is not None:
+            continue
+        store.publish([Path(blobs_dir) / obj.key])
+        pushed += 1
+    return {"objects_pushed": pushed}
+
+
+def _merge_into(src: Path, dst: Path) -> None:
+    """Both layouts hold the blob (e.g. re-uploaded mid-migration): keep `dst`'s files."""
+
+    for f in sorted(p for p in src.rglob("*") if p.is_file()):
+        target = dst / f.relative_to(src)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(f, target)
+    shutil.rmtree(src, ignore_errors=True)
+
+
+def _prefix(blob_dir: Path) -> str:
+    return str(blob_dir) + os.sep
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from app.infra.blob_backends import BlobBackend
+from app.infra.repo_blob_refs import BlobRefRepo
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.storage import BlobStore, is_sha256
+
+_PDF_EXT = ".pdf"
+
+
+class BlobsService:
+    """Existence probe over `BlobStore`, so clients can skip re-uploading known bytes."""
+
+    def __init__(self, *, conn, blobs_dir: str, remote: BlobBackend | None = None) -> None:
+        self._conn = conn
+        self._store = BlobStore(Path(blobs_dir), remote=remote)
+
+    def describe(self, *, sha256: str) -> dict[str, object]:
+        sha = sha256.lower()
+        if not is_sha256(sha):
+            raise HTTPException(status_code=400, detail="invalid_sha256")
+        size = self._store.original_size(sha, _PDF_EXT)
+        if size is None:
+            raise HTTPException(status_code=404, detail="blob_not_found")
+        rendered = DocumentVersionRepo(self._conn).find_rendered_by_hash(sha)
+        return {
+            "sha256": sha,
+            "size_bytes": size,
+            # Document versions pointing at these bytes; 0 means eligible for GC.
+            "ref_count": BlobRefRepo(self._conn).ref_count(sha),
+            # Attaching rendered bytes reuses their pages instead of queueing a render.
+            "rendered": rendered is not None,
+        }
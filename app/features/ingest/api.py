@@ -1,12 +1,47 @@
-from fastapi import APIRouter, Request, UploadFile
+from fastapi import APIRouter, Request, Response, UploadFile
+from starlette.concurrency import run_in_threadpool
 
+from app.features.ingest.bulk import BulkIngestService
 from app.features.ingest.service import IngestService
 
 router = APIRouter(prefix="/bills", tags=["bills"])
 
 
 @router.post("/upload")
-async def upload_bill(request: Request, title: str, file: UploadFile) -> dict[str, object]:
+async def upload_bill(
+    request: Request, response: Response, title: str, file: UploadFile, pipeline: bool = False
+) -> dict[str, object]:
     cfg = request.app.state.cfg
     conn = request.app.state.db
-    return await IngestService(conn=conn, blobs_dir=cfg.blobs_dir).upload_bill(title=title, file=file)
+    # pipeline=true: OCR and segmentation start on each page as soon as it is rendered.
+    service = IngestService(conn=conn, blobs_dir=cfg.blobs_dir, remote=cfg.blob_remote)
+    body = await service.upload_bill(title=title, file=file, pipeline=pipeline)
+    if body["job_id"] is not None:
+        # Rendering was queued: poll GET /jobs/{job_id} for progress.
+        response.status_code = 202
+    return body
+
+
+@router.post("/attach")
+def attach_bill(
+    request: Request, response: Response, title: str, sha256: str, pipeline: bool = False
+) -> dict[str, object]:
+    """Like /upload, but for bytes already stored (see GET /blobs/{sha256}); no body."""
+
+    cfg = request.app.state.cfg
+    conn = request.app.state.db
+    service = IngestService(conn=conn, blobs_dir=cfg.blobs_dir, remote=cfg.blob_remote)
+    body = service.attach_blob(title=title, sha256=sha256, pipeline=pipeline)
+    if body["job_id"] is not None:
+        response.status_code = 202
+    return body
+
+
+@router.post("/bulk", status_code=202)
+async def bulk_upload(request: Request, file: UploadFile) -> dict[str, object]:
+    """zip/tar of PDFs: one bill per new PDF, deduped by sha256; rendering/OCR are queued."""
+
+    cfg = request.app.state.cfg
+    conn = request.app.state.db
+    service = BulkIngestService(conn=conn, blobs_dir=cfg.blobs_dir, remote=cfg.blob_remote)
+    return await run_in_threadpool(service.ingest_archive, file.file, file.filename or "")
@@ -0,0 +1,74 @@
+"""Enumerate PDFs in a directory tree or a zip/tar archive as openable byte streams."""
+
+import tarfile
+import zipfile
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, BinaryIO, cast
+
+
+@dataclass(frozen=True)
+class PdfSource:
+    name: str  # path relative to the directory / member name in the archive
+    open: Callable[[], BinaryIO]
+
+
+def iter_pdf_sources(path: Path) -> Iterator[PdfSource]:
+    """Directory (recursive), `.zip` or `.tar[.gz|.bz2|.xz]`; non-PDF entries are ignored."""
+
+    if path.is_dir():
+        for p in sorted(path.rglob("*")):
+            if p.is_file() and _is_pdf(p.name):
+                yield PdfSource(name=str(p.relative_to(path)), open=_file_opener(p))
+        return
+    with path.open("rb") as f:
+        yield from iter_archive_sources(f, path.name)
+
+
+def iter_archive_sources(fileobj: BinaryIO, filename: str) -> Iterator[PdfSource]:
+    """Members of an open archive; each stream is only valid while iterating."""
+
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                if not info.is_dir() and _is_pdf(info.filename):
+                    yield PdfSource(name=info.filename, open=_zip_member_opener(zf, info))
+        return
+    fileobj.seek(0)
+    try:
+        tf = tarfile.open(fileobj=fileobj, mode="r:*")
+    except tarfile.TarError:
+        raise ValueError(f"unsupported_archive:{filename}") from None
+    with tf:
+        for member in tf:
+            if member.isfile() and _is_pdf(member.name):
+                stream = tf.extractfile(member)
+                if stream is not None:
+                    yield PdfSource(name=member.name, open=_stream_opener(stream))
+
+
+def _file_opener(path: Path) -> Callable[[], BinaryIO]:
+    def open_file() -> BinaryIO:
+        return path.open("rb")
+
+    return open_file
+
+
+def _zip_member_opener(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> Callable[[], BinaryIO]:
+    def open_member() -> BinaryIO:
+        return cast(BinaryIO, zf.open(info))
+
+    return open_member
+
+
+def _stream_opener(stream: IO[bytes]) -> Callable[[], BinaryIO]:
+    def open_stream() -> BinaryIO:
+        return cast(BinaryIO, stream)
+
+    return open_stream
+
+
+def _is_pdf(name: str) -> bool:
+    return name.lower().endswith(".pdf")
@@ -0,0 +1,177 @@
+import json
+import logging
+import tarfile
+import zipfile
+import zlib
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException
+
+from app.domain.enums import BulkEntryStatus, JobType
+from app.features.ingest.archive import PdfSource, iter_archive_sources
+from app.infra.blob_backends import BlobBackend
+from app.infra.repo_bulk_ingest import BulkIngestRepo, BulkItem
+from app.infra.storage import BlobStore
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+# What reading one corrupt or truncated source (or archive member) raises; recorded as a
+# failed entry instead of aborting the backfill.
+_SOURCE_ERRORS = (OSError, ValueError, EOFError, zipfile.BadZipFile, zlib.error, tarfile.TarError)
+# Manifest statuses a re-run skips; `failed` entries are retried.
+_DONE_STATUSES = {BulkEntryStatus.ingested, BulkEntryStatus.duplicate}
+
+
+@dataclass(frozen=True)
+class BulkEntry:
+    """One manifest line: what happened to one source file."""
+
+    name: str
+    status: BulkEntryStatus
+    sha256: str | None = None
+    document_version_id: int | None = None
+    job_id: int | None = None
+    error: str | None = None
+
+
+class BulkManifest:
+    """Append-only JSONL record of processed sources.
+
+    Re-runs skip names whose latest entry is ingested/duplicate; failed ones are retried.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.done: set[str] = set()
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        row = json.loads(line)
+                        self._record(row["name"], row["status"])
+
+    def append(self, entries: list[BulkEntry]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("a", encoding="utf-8") as f:
+            for e in entries:
+                f.write(json.dumps(asdict(e), ensure_ascii=False) + "\n")
+        for e in entries:
+            self._record(e.name, e.status)
+
+    def _record(self, name: str, status: str) -> None:
+        if BulkEntryStatus(status) in _DONE_STATUSES:
+            self.done.add(name)
+        else:
+            self.done.discard(name)
+
+
+class BulkIngestService:
+    """Backfill path: store many PDFs, dedupe by sha256, register them batch by batch.
+
+    Rendering/OCR are queued as jobs (the pipeline job by default) for the worker pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        conn,
+        blobs_dir: Path,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        job_type: JobType = JobType.pipeline_document_version,
+        remote: BlobBackend | None = None,
+    ) -> None:
+        self._conn = conn
+        self._store = BlobStore(Path(blobs_dir), remote=remote)
+        self._batch_size = max(1, batch_size)
+        self._job_type = job_type
+
+    def ingest(
+        self, sources: Iterable[PdfSource], manifest: BulkManifest | None = None
+    ) -> dict[str, object]:
+        counts = {status.value: 0 for status in BulkEntryStatus}
+        entries: list[BulkEntry] = []
+        pending: list[BulkEntry] = []
+        skipped = 0
+
+        def flush() -> None:
+            done = self._register(pending)
+            if manifest is not None:
+                manifest.append(done)
+            for e in done:
+                counts[e.status.value] += 1
+            entries.extend(done)
+            pending.clear()
+            log.info("bulk ingest batch done size=%s totals=%s", len(done), counts)
+
+        # Bytes are stored as sources are iterated (archive member streams are only
+        # valid meanwhile); DB registration is what gets batched.
+        for src in sources:
+            if manifest is not None and src.name in manifest.done:
+                skipped += 1
+                continue
+            pending.append(self._store_source(src))
+            if len(pending) >= self._batch_size:
+                flush()
+        if pending:
+            flush()
+        return {**counts, "skipped": skipped, "entries": [asdict(e) for e in entries]}
+
+    def ingest_archive(self, fileobj: BinaryIO, filename: str) -> dict[str, object]:
+        """Uploaded zip/tar; no manifest is kept for uploads.
+
+        Re-posting the same archive is the way to resume: stored members come back as
+        duplicates (sha256 dedup) and previously failed ones are stored again.
+        """
+
+        try:
+            return self.ingest(iter_archive_sources(fileobj, filename))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail="unsupported_archive") from e
+
+    def _store_source(self, src: PdfSource) -> BulkEntry:
+        try:
+            with src.open() as stream:
+                ref = self._store.put_stream(stream, ".pdf")
+        except _SOURCE_ERRORS as e:
+            log.warning("bulk ingest source failed name=%s error=%r", src.name, e)
+            return BulkEntry(src.name, BulkEntryStatus.failed, error=f"{type(e).__name__}: {e}")
+        return BulkEntry(src.name, BulkEntryStatus.ingested, sha256=ref.sha256)
+
+    def _register(self, entries: list[BulkEntry]) -> list[BulkEntry]:
+        repo = BulkIngestRepo(self._conn)
+        shas = [e.sha256 for e in entries if e.sha256 is not None]
+        known = repo.existing_versions(sorted(set(shas)))
+        new_items: dict[str, BulkItem] = {}
+        for e in entries:
+            if e.sha256 is None or e.sha256 in known or e.sha256 in new_items:
+                continue
+            new_items[e.sha256] = BulkItem(
+                title=Path(e.name).stem,
+                source_url=None,
+                sha256=e.sha256,
+                file_path=str(self._store.ref(e.sha256, ".pdf").original_path),
+                mime_type="application/pdf",
+            )
+        registered = {
+            r.sha256: r
+            for r in repo.register_batch(list(new_items.values()), "bulk", self._job_type)
+        }
+
+        out: list[BulkEntry] = []
+        for e in entries:
+            if e.sha256 is None:
+                out.append(e)
+            elif e.sha256 in registered and new_items.pop(e.sha256, None) is not None:
+                reg = registered[e.sha256]
+                out.append(
+                    replace(e, document_version_id=reg.document_version_id, job_id=reg.job_id)
+                )
+            else:
+                # Same bytes ingested by an earlier run, batch or entry of this batch.
+                dv_id = known.get(e.sha256) or registered[e.sha256].document_version_id
+                out.append(replace(e, status=BulkEntryStatus.duplicate, document_version_id=dv_id))
+        return out
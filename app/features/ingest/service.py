@@ -1,62 +1,166 @@
 from pathlib import Path
 
 from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
 
-from app.infra.pdf_render import render_pdf_to_pages
+from app.domain.enums import JobType
+from app.domain.page_layout import regions_to_json
+from app.domain.render_policy import DEFAULT_RENDER_POLICY, RenderPolicy
+from app.infra.blob_backends import BlobBackend
+from app.infra.pdf_render import iter_rendered_pages, pdf_page_count
 from app.infra.repo_bills import BillRepo
-from app.infra.repo_documents import DocumentRepo, DocumentVersionRepo
+from app.infra.repo_documents import DocumentRepo, DocumentVersion, DocumentVersionRepo
+from app.infra.repo_jobs import JobRepo
 from app.infra.repo_pages import PageRepo
-from app.infra.storage import BlobStore
+from app.infra.storage import BlobRef, BlobStore, is_sha256
 
 
 class IngestService:
-    def __init__(self, *, conn, blobs_dir: str) -> None:
+    def __init__(
+        self,
+        *,
+        conn,
+        blobs_dir: str,
+        render_workers: int = 1,
+        lazy_render: bool = False,
+        render_policy: RenderPolicy = DEFAULT_RENDER_POLICY,
+        remote: BlobBackend | None = None,
+    ) -> None:
         self._conn = conn
-        self._blobs_dir = blobs_dir
+        self._render_workers = render_workers
+        self._lazy_render = lazy_render
+        self._render_policy = render_policy
+        self._store = BlobStore(Path(blobs_dir), remote=remote)
 
-    async def upload_bill(self, *, title: str, file: UploadFile) -> dict[str, object]:
-        data = await file.read()
-        if not data:
-            raise HTTPException(status_code=400, detail="empty_file")
-
-        bill = BillRepo(self._conn).create(source="manual", title=title)
-        doc = DocumentRepo(self._conn).create(bill_id=bill.id, doc_type="proiect", source_url=None)
+    async def upload_bill(
+        self, *, title: str, file: UploadFile, pipeline: bool = False
+    ) -> dict[str, object]:
+        """Store the PDF and queue rendering, or the full render->OCR->segment pipeline."""
 
         ext = ".pdf" if (file.filename or "").lower().endswith(".pdf") else ""
-        blob = BlobStore(Path(self._blobs_dir)).put_bytes(data, ext=ext)
-
         if ext != ".pdf":
             raise HTTPException(status_code=400, detail="only_pdf_supported")
 
-        rendered = render_pdf_to_pages(blob.original_path, blob.pages_dir)
+        # Stream the spooled upload to disk in chunks (off the event loop) instead of
+        # `await file.read()`, so memory per upload does not grow with file size.
+        try:
+            blob = await run_in_threadpool(self._store.put_stream, file.file, ext)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="empty_file") from None
+        mime_type = file.content_type or "application/pdf"
+        return self.register_blob(title=title, blob=blob, mime_type=mime_type, pipeline=pipeline)
 
-        ver = DocumentVersionRepo(self._conn).create(
-            document_id=doc.id,
-            version_hash=blob.sha256,
-            mime_type=file.content_type or "application/pdf",
-            file_path=str(blob.original_path),
-            page_count=len(rendered),
-            quality_level=None,
-            ocr_applied=False,
-            notes=None,
+    def attach_blob(self, *, title: str, sha256: str, pipeline: bool = False) -> dict[str, object]:
+        """Register a bill for bytes already in the store (probe with GET /blobs/{sha256})."""
+
+        sha = sha256.lower()
+        if not is_sha256(sha):
+            raise HTTPException(status_code=400, detail="invalid_sha256")
+        blob = self._store.find(sha, ".pdf")
+        if blob is None:
+            raise HTTPException(status_code=404, detail="blob_not_found")
+        return self.register_blob(
+            title=title, blob=blob, mime_type="application/pdf", pipeline=pipeline
         )
 
-        pages = PageRepo(self._conn)
-        for p in rendered:
-            pages.upsert(
-                document_version_id=ver.id,
-                page_number=p.page_number,
-                text=p.text,
-                ocr_text=None,
+    def register_blob(
+        self, *, title: str, blob: BlobRef, mime_type: str, pipeline: bool = False
+    ) -> dict[str, object]:
+        """Create bill/document/version for stored bytes; reuse or queue their rendering."""
+
+        bill = BillRepo(self._conn).create(source="manual", title=title)
+        doc = DocumentRepo(self._conn).create(bill_id=bill.id, doc_type="proiect", source_url=None)
+
+        versions = DocumentVersionRepo(self._conn)
+        # The pipeline job does its own dedup (it still has OCR/segmentation to run).
+        known = None if pipeline else versions.find_rendered_by_hash(blob.sha256)
+        job_id: int | None = None
+        if known is not None:
+            ver = self._reuse_version(document_id=doc.id, known=known, mime_type=mime_type)
+        else:
+            # Rendering is CPU-heavy and proportional to page count: hand it to the worker.
+            ver = versions.create(
+                document_id=doc.id,
+                version_hash=blob.sha256,
+                mime_type=mime_type,
+                file_path=str(blob.original_path),
+                page_count=None,
                 quality_level=None,
-                has_handwriting=False,
-                image_path=str(p.image_path),
+                ocr_applied=False,
+                notes=None,
             )
+            job_type = JobType.pipeline_document_version if pipeline else JobType.ingest_render
+            job_id = JobRepo(self._conn).enqueue(job_type, {"document_version_id": ver.id})
 
         return {
             "bill_id": bill.id,
             "document_id": doc.id,
             "document_version_id": ver.id,
             "sha256": blob.sha256,
-            "page_count": len(rendered),
+            "page_count": ver.page_count,
+            "deduplicated": known is not None,
+            "job_id": job_id,
         }
+
+    def render_version(self, *, document_version_id: int) -> int:
+        """Render pages for a queued version (job handler); safe to re-run on retry."""
+
+        versions = DocumentVersionRepo(self._conn)
+        ver = versions.get(document_version_id)
+        pages = PageRepo(self._conn)
+
+        # Identical bytes may have finished rendering since this job was enqueued.
+        known = versions.find_rendered_by_hash(ver.version_hash)
+        if known is not None and known.id != ver.id and known.page_count is not None:
+            pages.copy_for_version(source_version_id=known.id, target_version_id=ver.id)
+            versions.set_page_count(ver.id, known.page_count)
+            versions.refresh_quality_level(ver.id)
+            return known.page_count
+
+        pdf_path = Path(ver.file_path)
+        if not self._store.materialize(pdf_path):
+            raise FileNotFoundError(f"original_missing:{ver.version_hash}")
+        blob = self._store.ref(ver.version_hash, pdf_path.suffix)
+        # Page count first, so progress (persisted pages / page_count) is observable.
+        page_count = pdf_page_count(pdf_path)
+        versions.set_page_count(ver.id, page_count)
+
+        for p in iter_rendered_pages(
+            pdf_path,
+            blob.pages_dir,
+            policy=self._render_policy,
+            workers=self._render_workers,
+            lazy=self._lazy_render,
+        ):
+            # Published before the row exists, so other nodes never miss a referenced file.
+            self._store.publish(p.files())
+            pages.upsert(
+                document_version_id=ver.id,
+                page_number=p.page_number,
+                text=p.text,
+                ocr_text=None,
+                quality_level=p.quality_level.value,
+                has_handwriting=False,
+                image_path=str(p.image_path) if p.image_path else None,
+                ocr_regions_json=regions_to_json(p.ocr_regions),
+            )
+        versions.refresh_quality_level(ver.id)
+        return page_count
+
+    def _reuse_version(
+        self, *, document_id: int, known: DocumentVersion, mime_type: str
+    ) -> DocumentVersion:
+        # Same bytes were already rendered (and possibly OCR'd): copy the page rows instead
+        # of re-rasterizing. Page images are shared, since they live under the blob's sha.
+        ver = DocumentVersionRepo(self._conn).create(
+            document_id=document_id,
+            version_hash=known.version_hash,
+            mime_type=mime_type,
+            file_path=known.file_path,
+            page_count=known.page_count,
+            quality_level=known.quality_level,
+            ocr_applied=known.ocr_applied,
+            notes=f"pages_reused_from_version:{known.id}",
+        )
+        PageRepo(self._conn).copy_for_version(source_version_id=known.id, target_version_id=ver.id)
+        return ver
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+
+from app.features.jobs.service import JobsService
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+def get_job(request: Request, job_id: int) -> dict[str, object]:
+    conn = request.app.state.db
+    return JobsService(conn=conn).get_job(job_id=job_id)
@@ -0,0 +1,76 @@
+import sqlite3
+from collections.abc import Callable
+from typing import Any
+
+from app.config import AppConfig
+from app.domain.enums import JobType
+from app.features.analysis.run_service import AnalysisRunService
+from app.features.ingest.service import IngestService
+from app.features.ocr.service import OcrService
+from app.features.pipeline.service import PipelineService
+from app.infra.process_pool import SharedPool
+from app.infra.repo_jobs import JobRepo
+
+# (connection, config, payload, the process's shared OCR pool or None for inline runs)
+JobHandler = Callable[[sqlite3.Connection, AppConfig, dict[str, Any], SharedPool | None], None]
+
+
+def _ingest_render(
+    conn: sqlite3.Connection, cfg: AppConfig, payload: dict[str, Any], _: SharedPool | None
+) -> None:
+    IngestService(
+        conn=conn,
+        blobs_dir=str(cfg.blobs_dir),
+        render_workers=cfg.render_workers,
+        lazy_render=cfg.lazy_render,
+        render_policy=cfg.render_policy,
+        remote=cfg.blob_remote,
+    ).render_version(document_version_id=int(payload["document_version_id"]))
+
+
+def _ocr_document_version(
+    conn: sqlite3.Connection, cfg: AppConfig, payload: dict[str, Any], ocr_pool: SharedPool | None
+) -> None:
+    result = OcrService(
+        conn=conn, pool=ocr_pool, blobs_dir=cfg.blobs_dir, remote=cfg.blob_remote
+    ).ocr_document_version(document_version_id=int(payload["document_version_id"]))
+    if result["pages_ocr_failed"]:
+        # Finished pages are kept; the retry only redoes the failed ones.
+        raise RuntimeError(f"ocr_failed_pages:{result['pages_ocr_failed']}")
+
+
+def _pipeline_document_version(
+    conn: sqlite3.Connection, cfg: AppConfig, payload: dict[str, Any], ocr_pool: SharedPool | None
+) -> None:
+    result = PipelineService(
+        conn=conn,
+        blobs_dir=cfg.blobs_dir,
+        render_workers=cfg.render_workers,
+        lazy_render=cfg.lazy_render,
+        render_policy=cfg.render_policy,
+        ocr_pool=ocr_pool,
+        remote=cfg.blob_remote,
+    ).run(document_version_id=int(payload["document_version_id"]))
+    if result["pages_ocr_failed"]:
+        # Re-running the pipeline would render everything again: an OCR job redoes only
+        # the pages still without OCR text (with its own retries and backoff).
+        JobRepo(conn).enqueue(
+            JobType.ocr_document_version, {"document_version_id": result["document_version_id"]}
+        )
+
+
+def _analysis_run(
+    conn: sqlite3.Connection, cfg: AppConfig, payload: dict[str, Any], _: SharedPool | None
+) -> None:
+    AnalysisRunService(conn=conn).execute(
+        run_id=int(payload["analysis_run_id"]),
+        document_version_id=int(payload["document_version_id"]),
+    )
+
+
+HANDLERS: dict[JobType, JobHandler] = {
+    JobType.ingest_render: _ingest_render,
+    JobType.ocr_document_version: _ocr_document_version,
+    JobType.pipeline_document_version: _pipeline_document_version,
+    JobType.analysis_run: _analysis_run,
+}
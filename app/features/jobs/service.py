@@ -0,0 +1,66 @@
+from fastapi import HTTPException
+
+from app.domain.enums import JobType
+from app.infra.repo_chunks import ChunkRepo
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_jobs import Job, JobRepo
+from app.infra.repo_pages import PageRepo
+from app.infra.repo_runs import RunRepo
+
+
+class JobsService:
+    def __init__(self, *, conn) -> None:
+        self._conn = conn
+
+    def get_job(self, *, job_id: int) -> dict[str, object]:
+        try:
+            job = JobRepo(self._conn).get(job_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="job_not_found") from None
+
+        return {
+            "id": job.id,
+            "type": job.type.value,
+            "status": job.status.value,
+            "attempts": job.attempts,
+            "scheduled_at": job.scheduled_at,
+            "locked_at": job.locked_at,
+            "last_error": job.last_error,
+            "progress": self._progress(job),
+        }
+
+    def _progress(self, job: Job) -> dict[str, object] | None:
+        if job.type == JobType.analysis_run:
+            run_id = int(job.payload["analysis_run_id"])
+            try:
+                run = RunRepo(self._conn).get(run_id)
+            except KeyError:
+                return None
+            return {"analysis_run_id": run_id, "run_status": run.status.value}
+        if "document_version_id" not in job.payload:
+            return None
+        version_id = int(job.payload["document_version_id"])
+        pages = PageRepo(self._conn)
+        if job.type == JobType.ocr_document_version:
+            return {
+                "document_version_id": version_id,
+                "pages_with_ocr": pages.count_ocr_for_version(version_id),
+                "page_count": pages.count_for_version(version_id),
+            }
+        if job.type not in (JobType.ingest_render, JobType.pipeline_document_version):
+            return None
+        try:
+            ver = DocumentVersionRepo(self._conn).get(version_id)
+        except KeyError:
+            return None
+        progress: dict[str, object] = {
+            "document_version_id": version_id,
+            "pages_done": pages.count_for_version(version_id),
+            # None until the worker has opened the PDF.
+            "page_count": ver.page_count,
+        }
+        if job.type == JobType.pipeline_document_version:
+            # Chunks are persisted per finished article, while later pages still render.
+            progress["pages_with_ocr"] = pages.count_ocr_for_version(version_id)
+            progress["chunks_ready"] = ChunkRepo(self._conn).count_for_version(version_id)
+        return progress
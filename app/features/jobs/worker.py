@@ -0,0 +1,164 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from app.config import AppConfig
+from app.features.jobs.handlers import HANDLERS
+from app.infra.db import DbConfig, connect
+from app.infra.process_pool import SharedPool
+from app.infra.repo_jobs import Job, JobRepo, utc_in_iso
+
+log = logging.getLogger(__name__)
+
+_BACKOFF_BASE_SECONDS = 5.0
+_BACKOFF_MAX_SECONDS = 600.0
+_IDLE_POLL_SECONDS = 1.0
+# SQLite VM instructions between lease checks while a handler runs; small enough that a
+# single-row write (~20 instructions) is checked.
+_LEASE_CHECK_INSTRUCTIONS = 16
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential retry delay after the `attempts`-th failed attempt (1-based)."""
+
+    delay: float = _BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1)
+    return min(_BACKOFF_MAX_SECONDS, delay)
+
+
+def run_once(
+    conn: sqlite3.Connection,
+    cfg: AppConfig,
+    worker_id: str = "inline",
+    ocr_pool: SharedPool | None = None,
+) -> bool:
+    """Claim and execute the next due job, if any. Returns False when nothing was due.
+
+    Without `ocr_pool` (inline use), OCR runs serially in this thread.
+    """
+
+    repo = JobRepo(conn)
+    job = repo.claim(worker_id, lease_seconds=cfg.job_lease_seconds)
+    if job is None:
+        return False
+
+    handler = HANDLERS.get(job.type)
+    if handler is None:
+        repo.mark_failed(job.id, worker_id, error=f"no_handler:{job.type.value}", retry_at=None)
+        return True
+
+    with _Heartbeat(cfg, job, worker_id) as beat:
+        # Once the lease is lost, every statement on `conn` is aborted ("interrupted"), so
+        # the handler stops at its next database access instead of racing the new owner.
+        conn.set_progress_handler(beat.lost.is_set, _LEASE_CHECK_INSTRUCTIONS)
+        try:
+            handler(conn, cfg, job.payload, ocr_pool)
+        except Exception as e:
+            error: Exception | None = e
+        else:
+            error = None
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    if beat.lost.is_set():
+        conn.rollback()
+        log.warning("abandoned job_id=%s worker_id=%s: lease lost", job.id, worker_id)
+        return True
+    if error is None:
+        recorded = repo.mark_succeeded(job.id, worker_id)
+    else:
+        log.error(
+            "job failed job_id=%s type=%s attempt=%s/%s payload=%s",
+            job.id, job.type.value, job.attempts, job.max_attempts, job.payload,
+            exc_info=error,
+        )
+        retry_at = utc_in_iso(backoff_seconds(job.attempts))
+        error_text = f"{type(error).__name__}: {error}"
+        recorded = repo.mark_failed(job.id, worker_id, error=error_text, retry_at=retry_at)
+    if not recorded:
+        log.warning("outcome of job_id=%s dropped: lease lost by %s", job.id, worker_id)
+    return True
+
+
+class JobRuntime:
+    """N worker threads per process, each with its own SQLite connection.
+
+    Threads (not processes) are enough here: handlers spend their time in PyMuPDF,
+    Tesseract subprocesses or process pools, all of which release the GIL. All threads
+    share one OCR pool, so `ocr_workers` bounds OCR processes whatever `job_concurrency`.
+    """
+
+    def __init__(self, cfg: AppConfig) -> None:
+        self._cfg = cfg
+        self._stop = threading.Event()
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._ocr_pool = SharedPool(cfg.ocr_workers)
+
+    def run(self) -> None:
+        threads = [
+            threading.Thread(
+                target=self._loop, args=(f"{self._prefix}:{i}",), name=f"job-worker-{i}"
+            )
+            for i in range(max(1, self._cfg.job_concurrency))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self._ocr_pool.shutdown()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self, worker_id: str) -> None:
+        conn = connect(DbConfig(path=self._cfg.db_path))
+        repo = JobRepo(conn)
+        next_sweep = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_sweep:
+                if requeued := repo.requeue_expired():
+                    log.warning("requeued %s job(s) with expired leases", requeued)
+                next_sweep = time.monotonic() + self._cfg.job_lease_seconds
+            try:
+                busy = run_once(conn, self._cfg, worker_id, self._ocr_pool)
+            except sqlite3.OperationalError:
+                # e.g. "database is locked" past the busy timeout: back off and retry.
+                log.exception("job claim failed worker_id=%s", worker_id)
+                busy = False
+            if not busy:
+                self._stop.wait(_IDLE_POLL_SECONDS)
+        conn.close()
+
+
+class _Heartbeat:
+    """Extend a job's lease from a side thread while its handler runs; `lost` is set
+    when the lease could not be extended (it expired and the job was requeued)."""
+
+    def __init__(self, cfg: AppConfig, job: Job, worker_id: str) -> None:
+        self._cfg = cfg
+        self._job = job
+        self._worker_id = worker_id
+        self._done = threading.Event()
+        self.lost = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._done.set()
+        self._thread.join()
+
+    def _beat(self) -> None:
+        lease = self._cfg.job_lease_seconds
+        conn = connect(DbConfig(path=self._cfg.db_path))
+        repo = JobRepo(conn)
+        while not self._done.wait(lease / 3):
+            if not repo.heartbeat(self._job.id, self._worker_id, lease):
+                log.warning("lost lease job_id=%s worker_id=%s", self._job.id, self._worker_id)
+                self.lost.set()
+                break
+        conn.close()
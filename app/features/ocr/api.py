@@ -1,11 +1,30 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
 
+from app.domain.enums import JobType
 from app.features.ocr.service import OcrService
+from app.infra.repo_jobs import JobRepo
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
 @router.post("/{document_version_id}/ocr")
-def ocr_document_version(request: Request, document_version_id: int) -> dict[str, object]:
+def ocr_document_version(
+    request: Request, response: Response, document_version_id: int, background: bool = False
+) -> dict[str, object]:
+    cfg = request.app.state.cfg
     conn = request.app.state.db
-    return OcrService(conn=conn).ocr_document_version(document_version_id=document_version_id)
+    if background:
+        # Large scans: let a worker fan pages out; poll GET /jobs/{job_id} for progress.
+        job_id = JobRepo(conn).enqueue(
+            JobType.ocr_document_version, {"document_version_id": document_version_id}
+        )
+        response.status_code = 202
+        return {"document_version_id": document_version_id, "job_id": job_id}
+    # One OCR pool per API process, shared by concurrent requests (see create_app).
+    service = OcrService(
+        conn=conn,
+        pool=request.app.state.ocr_pool,
+        blobs_dir=cfg.blobs_dir,
+        remote=cfg.blob_remote,
+    )
+    return service.ocr_document_version(document_version_id=document_version_id)
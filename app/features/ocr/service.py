@@ -1,50 +1,176 @@
+# EXCEPTION: >150 LOC because cache service, fan-out and failure accounting share one OCR pass.
+import logging
+from collections.abc import Callable, Iterator
+from concurrent.futures import as_completed
 from pathlib import Path
 
 from fastapi import HTTPException
 
-from app.infra.ocr import ocr_image
+from app.domain.enums import OcrSkip
+from app.features.ocr.tasks import OcrRecorder, OcrTask, plan_page
+from app.infra.blob_backends import BlobBackend
+from app.infra.ocr import (
+    OcrError,
+    OcrResult,
+    ocr_image_adaptive,
+    probe_ocr_languages,
+    select_ocr_lang,
+)
+from app.infra.process_pool import SharedPool
+from app.infra.repo_documents import DocumentVersionRepo
 from app.infra.repo_pages import PageRepo
+from app.infra.storage import BlobStore
+
+log = logging.getLogger(__name__)
+
+# Called after each persisted page with (pages_done, pages_total).
+ProgressFn = Callable[[int, int], None]
 
 
 class OcrService:
-    def __init__(self, *, conn) -> None:
+    def __init__(
+        self,
+        *,
+        conn,
+        pool: SharedPool | None = None,
+        blobs_dir: Path | None = None,
+        remote: BlobBackend | None = None,
+    ) -> None:
         self._conn = conn
+        # Without a shared pool, images are recognized serially in the calling thread.
+        self._pool = pool
+        # With a shared backend, page images missing on this node are fetched on demand.
+        self._available = (
+            BlobStore(blobs_dir, remote=remote).materialize
+            if blobs_dir is not None
+            else Path.is_file
+        )
 
-    def ocr_document_version(self, *, document_version_id: int) -> dict[str, object]:
-        pages_repo = PageRepo(self._conn)
-        pages = pages_repo.list_for_version(document_version_id)
+    def ocr_document_version(
+        self, *, document_version_id: int, on_progress: ProgressFn | None = None
+    ) -> dict[str, object]:
+        pages = PageRepo(self._conn).list_for_version(document_version_id)
         if not pages:
             raise HTTPException(status_code=404, detail="document_version_not_found")
 
-        updated = 0
-        skipped_missing_image = 0
-
+        tasks: list[OcrTask] = []
+        skipped = {reason: 0 for reason in OcrSkip}
+        region_pages = 0
         for p in pages:
-            if p.ocr_text and p.ocr_text.strip():
-                continue
-            if not p.image_path:
-                skipped_missing_image += 1
+            page_tasks, skip = plan_page(p, self._available)
+            if skip is not None:
+                skipped[skip] += 1
                 continue
+            tasks.extend(page_tasks)
+            region_pages += 1 if page_tasks[0].region is not None else 0
 
-            img_path = Path(p.image_path)
-            if not img_path.exists():
-                skipped_missing_image += 1
-                continue
+        updated, cache_hits = 0, 0
+        failed: list[int] = []
+        if tasks:
+            try:
+                updated, cache_hits, failed = self._ocr_tasks(
+                    document_version_id, tasks, select_ocr_lang(), on_progress
+                )
+            except OcrError as e:
+                raise HTTPException(status_code=503, detail=f"ocr_unavailable:{e}") from e
 
-            res = ocr_image(path=img_path)
-            pages_repo.upsert(
-                document_version_id=document_version_id,
-                page_number=p.page_number,
-                text=p.text,
-                ocr_text=res.text,
-                quality_level=p.quality_level,
-                has_handwriting=p.has_handwriting,
-                image_path=p.image_path,
-            )
-            updated += 1
+        if updated:
+            versions = DocumentVersionRepo(self._conn)
+            versions.mark_ocr_applied(document_version_id)
+            versions.refresh_quality_level(document_version_id)
 
         return {
             "document_version_id": document_version_id,
+            "ocr_lang": probe_ocr_languages().selected,
             "pages_ocr_updated": updated,
-            "pages_skipped_missing_image": skipped_missing_image,
+            "pages_region_ocr": region_pages,
+            "pages_ocr_cache_hits": cache_hits,
+            # Pages whose OCR raised; they keep no `ocr_text`, so a re-run retries them.
+            "pages_ocr_failed": failed,
+            "pages_skipped_missing_image": skipped[OcrSkip.missing_image],
+            "pages_skipped_native_text": skipped[OcrSkip.native_text],
         }
+
+    def _ocr_tasks(
+        self,
+        document_version_id: int,
+        tasks: list[OcrTask],
+        lang: str,
+        on_progress: ProgressFn | None,
+    ) -> tuple[int, int, list[int]]:
+        """Serve cache hits, OCR the rest; returns (pages_updated, image_cache_hits,
+        failed_page_numbers).
+
+        Each page is persisted as soon as all of its images are recognized, so a crash
+        or retry only redoes pages that had not finished (they still lack `ocr_text`).
+        An image that fails is logged and its page reported; the other pages still land.
+        An unavailable engine (`OcrError`) aborts the whole call.
+        """
+
+        recorder = OcrRecorder(self._conn, lang)
+        recorder.expect(tasks)
+        pages_total = len({t.page.id for t in tasks})
+        updated = 0
+        failed: set[int] = set()
+
+        def record(task: OcrTask, res: OcrResult, fresh: bool) -> None:
+            nonlocal updated
+            if not recorder.record(task, res, fresh=fresh):
+                return
+            updated += 1
+            log.info(
+                "ocr page done document_version_id=%s page=%s progress=%s/%s",
+                document_version_id, task.page.page_number, updated, pages_total,
+            )
+            if on_progress is not None:
+                on_progress(updated, pages_total)
+
+        misses: list[OcrTask] = []
+        for t in tasks:
+            cached = recorder.cached(t)
+            if cached is None:
+                misses.append(t)
+            else:
+                record(t, cached, fresh=False)
+        for task, res in self._recognize(misses, lang):
+            if isinstance(res, OcrError):
+                raise res
+            if isinstance(res, Exception):
+                log.error(
+                    "ocr failed document_version_id=%s page=%s image=%s",
+                    document_version_id, task.page.page_number, task.image_path,
+                    exc_info=res,
+                )
+                failed.add(task.page.page_number)
+                continue
+            if task.page.page_number not in failed:
+                record(task, res, fresh=True)
+        return updated, len(tasks) - len(misses), sorted(failed)
+
+    def _recognize(
+        self, tasks: list[OcrTask], lang: str
+    ) -> Iterator[tuple[OcrTask, OcrResult | Exception]]:
+        """OCR images serially or on the shared pool; yields in completion order.
+
+        Poor first passes get a preprocessed retry inside the same worker, so only
+        low-confidence images pay for preprocessing. Failures are yielded, not raised.
+        """
+
+        if self._pool is None:
+            for t in tasks:
+                try:
+                    yield t, ocr_image_adaptive(t.image_path, lang)
+                except Exception as e:
+                    yield t, e
+            return
+
+        executor = self._pool.executor()
+        futures = {executor.submit(ocr_image_adaptive, t.image_path, lang): t for t in tasks}
+        try:
+            for fut in as_completed(futures):
+                err = fut.exception()
+                yield futures[fut], err if isinstance(err, Exception) else fut.result()
+        finally:
+            # The pool is shared: drop only this call's queued work.
+            for fut in futures:
+                fut.cancel()
@@ -0,0 +1,104 @@
+"""Per-page OCR planning and persistence, shared by the OCR service and the pipeline."""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.domain.enums import OcrSkip, QualityLevel
+from app.domain.page_layout import OcrRegion, merge_region_text, regions_from_json
+from app.domain.page_quality import after_ocr, needs_ocr
+from app.infra.ocr import OCR_SETTINGS_KEY, OcrResult, tesseract_version
+from app.infra.repo_ocr_cache import OcrCacheKey, OcrCacheRepo
+from app.infra.repo_ocr_words import PageWordsRepo
+from app.infra.repo_pages import Page, PageRepo
+from app.infra.storage import sha256_file
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OcrTask:
+    """One image to recognize: a whole page, or one text-less region of a digital page."""
+
+    page: Page
+    image_path: Path
+    region: OcrRegion | None = None
+
+
+def plan_page(
+    page: Page, available: Callable[[Path], bool] = Path.is_file
+) -> tuple[list[OcrTask], OcrSkip | None]:
+    """Images to OCR for `page`, or why it needs none.
+
+    `available` checks (and may fetch, see `BlobStore.materialize`) a local image.
+    """
+
+    if page.ocr_text and page.ocr_text.strip():
+        return [], OcrSkip.already_done
+    # Selective OCR: Q1/Q2 pages keep their native text layer, and only their
+    # text-less image regions (stamps, scanned tables) are OCR'd, if any.
+    if not needs_ocr(page.quality_level, page.text):
+        regions = regions_from_json(page.ocr_regions_json)
+        if regions and all(available(Path(r.image_path)) for r in regions):
+            return [OcrTask(page, Path(r.image_path), r) for r in regions], None
+        return [], OcrSkip.native_text
+    if not page.image_path or not available(Path(page.image_path)):
+        return [], OcrSkip.missing_image
+    return [OcrTask(page, Path(page.image_path))], None
+
+
+class OcrRecorder:
+    """Serves the OCR cache and persists results, one page as soon as all its images are in."""
+
+    def __init__(self, conn, lang: str) -> None:
+        self._lang = lang
+        self._pages = PageRepo(conn)
+        self._words = PageWordsRepo(conn)
+        self._cache = OcrCacheRepo(conn)
+        self._keys: dict[OcrTask, OcrCacheKey] = {}
+        self._siblings: dict[int, list[OcrTask]] = {}
+        self._region_texts: dict[OcrTask, str] = {}
+
+    def expect(self, tasks: list[OcrTask]) -> None:
+        for t in tasks:
+            self._siblings.setdefault(t.page.id, []).append(t)
+
+    def cached(self, task: OcrTask) -> OcrResult | None:
+        return self._cache.get(self._key(task))
+
+    def record(self, task: OcrTask, res: OcrResult, *, fresh: bool) -> bool:
+        """Store one image's result; True once its page's OCR text has been persisted."""
+
+        if fresh:
+            self._cache.put(self._key(task), res)
+        page = task.page
+        if task.region is None:
+            self._words.put_with_text(page.id, res.words, res.text, _level_after_ocr(page, res))
+            return True
+        # Region words are in region-image pixels, so only the merged text is kept.
+        self._region_texts[task] = res.text
+        siblings = self._siblings[page.id]
+        if any(s not in self._region_texts for s in siblings):
+            return False
+        merged = merge_region_text(
+            page.text or "",
+            [s.region for s in siblings if s.region is not None],
+            [self._region_texts[s] for s in siblings],
+        )
+        self._pages.set_ocr_text(page.id, merged, page.quality_level)
+        return True
+
+    def _key(self, task: OcrTask) -> OcrCacheKey:
+        if task not in self._keys:
+            self._keys[task] = OcrCacheKey(
+                image_sha256=sha256_file(task.image_path),
+                lang=self._lang,
+                engine_version=tesseract_version(),
+                settings_key=OCR_SETTINGS_KEY,
+            )
+        return self._keys[task]
+
+
+def _level_after_ocr(page: Page, res: OcrResult) -> str:
+    return after_ocr(QualityLevel(page.quality_level or QualityLevel.q3), res.confidence).value
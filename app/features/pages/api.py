@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse
+
+from app.features.pages.service import PagesService
+
+router = APIRouter(prefix="/documents", tags=["pages"])
+
+
+@router.get("/{document_version_id}/pages/{page_number}/image")
+def get_page_image(request: Request, document_version_id: int, page_number: int) -> FileResponse:
+    cfg = request.app.state.cfg
+    conn = request.app.state.db
+    path = PagesService(
+        conn=conn,
+        blobs_dir=cfg.blobs_dir,
+        render_policy=cfg.render_policy,
+        remote=cfg.blob_remote,
+    ).page_image_path(document_version_id=document_version_id, page_number=page_number)
+    # Media type follows the extension (PNG or JPEG, per the render policy).
+    return FileResponse(path)
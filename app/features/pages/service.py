@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from app.domain.render_policy import DEFAULT_RENDER_POLICY, RenderPolicy
+from app.infra.blob_backends import BlobBackend
+from app.infra.pdf_render import render_page_image
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_pages import PageRepo
+from app.infra.storage import BlobStore
+
+
+class PagesService:
+    def __init__(
+        self,
+        *,
+        conn,
+        blobs_dir: Path,
+        render_policy: RenderPolicy = DEFAULT_RENDER_POLICY,
+        remote: BlobBackend | None = None,
+    ) -> None:
+        self._conn = conn
+        self._render_policy = render_policy
+        self._store = BlobStore(Path(blobs_dir), remote=remote)
+
+    def page_image_path(self, *, document_version_id: int, page_number: int) -> Path:
+        """Return the page image, rasterizing it on first request (lazy ingest)."""
+
+        pages = PageRepo(self._conn)
+        try:
+            page = pages.get(document_version_id, page_number)
+            ver = DocumentVersionRepo(self._conn).get(document_version_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="page_not_found") from None
+
+        # Read-through: a render published by another node is fetched once, then served.
+        if page.image_path and self._store.materialize(Path(page.image_path)):
+            return Path(page.image_path)
+
+        pdf_path = Path(ver.file_path)
+        if not self._store.materialize(pdf_path):
+            raise HTTPException(status_code=409, detail="original_missing")
+
+        blob = self._store.ref(ver.version_hash, pdf_path.suffix)
+        img_path = render_page_image(pdf_path, blob.pages_dir, page_number, self._render_policy)
+        self._store.publish([img_path])
+        pages.set_image_path(page.id, str(img_path))
+        return img_path
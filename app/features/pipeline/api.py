@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Request
+
+from app.infra.repo_chunks import ChunkRepo
+
+router = APIRouter(prefix="/documents", tags=["pipeline"])
+
+
+@router.get("/{document_version_id}/chunks")
+def list_chunks(request: Request, document_version_id: int) -> dict[str, object]:
+    """Chunks persisted so far; grows article by article while a pipeline job runs."""
+
+    conn = request.app.state.db
+    chunks = ChunkRepo(conn).list_for_version(document_version_id=document_version_id)
+    return {
+        "document_version_id": document_version_id,
+        "chunks": [
+            {
+                "id": c.id,
+                "chunk_type": c.chunk_type,
+                "label": c.label,
+                "parent_chunk_id": c.parent_chunk_id,
+                "page_start": c.page_start,
+                "page_end": c.page_end,
+                "text": c.text,
+                "bbox_json": c.bbox_json,
+            }
+            for c in chunks
+        ],
+    }
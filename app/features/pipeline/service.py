@@ -0,0 +1,262 @@
+# EXCEPTION: >150 LOC because the render/OCR/segment stages share one event loop.
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+
+from app.domain.page_layout import regions_to_json
+from app.domain.render_policy import DEFAULT_RENDER_POLICY, RenderPolicy
+from app.features.analysis.chunk_store import persist_segments
+from app.features.analysis.segmentation_v1 import Segment, StreamingSegmenter
+from app.features.ocr.tasks import OcrRecorder, OcrTask, plan_page
+from app.infra.blob_backends import BlobBackend
+from app.infra.ocr import OcrError, OcrResult, OcrWord, ocr_image_adaptive, probe_ocr_languages
+from app.infra.pdf_render import RenderedPage, iter_rendered_pages, pdf_page_count
+from app.infra.process_pool import SharedPool
+from app.infra.repo_chunks import ChunkRepo
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_ocr_words import PageWordsRepo
+from app.infra.repo_pages import Page, PageRepo
+from app.infra.storage import BlobStore
+
+log = logging.getLogger(__name__)
+
+
+class PipelineService:
+    """Render -> OCR -> segmentation for one document version, with the stages overlapped.
+
+    A producer thread rasterizes pages; each persisted page that needs OCR goes straight
+    to the OCR pool; pages whose final text is known feed, in page order, a streaming
+    segmenter that persists each article as soon as the next one starts. All SQLite
+    writes stay on the calling thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        conn,
+        blobs_dir: Path,
+        render_workers: int = 1,
+        lazy_render: bool = False,
+        render_policy: RenderPolicy = DEFAULT_RENDER_POLICY,
+        ocr_pool: SharedPool | None = None,
+        remote: BlobBackend | None = None,
+    ) -> None:
+        self._conn = conn
+        self._store = BlobStore(Path(blobs_dir), remote=remote)
+        self._render_workers = render_workers
+        self._lazy_render = lazy_render
+        self._render_policy = render_policy
+        self._ocr_pool = ocr_pool
+
+    def run(self, *, document_version_id: int) -> dict[str, object]:
+        versions = DocumentVersionRepo(self._conn)
+        ver = versions.get(document_version_id)
+        pages = PageRepo(self._conn)
+        ChunkRepo(self._conn).delete_for_version(document_version_id=ver.id)
+        # Without the process's shared pool (inline runs), OCR gets a private 1-worker pool.
+        ocr_pool = self._ocr_pool or SharedPool(1)
+        stream = _Stream(self._conn, ver.id, ocr_pool, self._store)
+
+        known = versions.find_rendered_by_hash(ver.version_hash)
+        try:
+            if known is not None and known.id != ver.id and known.page_count is not None:
+                # Identical bytes already rendered: only OCR/segmentation remain.
+                pages.copy_for_version(source_version_id=known.id, target_version_id=ver.id)
+                versions.set_page_count(ver.id, known.page_count)
+                for page in pages.list_for_version(ver.id):
+                    stream.on_page(page)
+                stream.drain(rendering=False)
+            else:
+                pdf_path = Path(ver.file_path)
+                if not self._store.materialize(pdf_path):
+                    raise FileNotFoundError(f"original_missing:{ver.version_hash}")
+                versions.set_page_count(ver.id, pdf_page_count(pdf_path))
+                self._render_into(stream, pdf_path, ver.version_hash)
+            chunk_count = stream.finish()
+        finally:
+            stream.close()
+            if ocr_pool is not self._ocr_pool:
+                ocr_pool.shutdown()
+
+        if stream.pages_ocr:
+            versions.mark_ocr_applied(ver.id)
+        versions.refresh_quality_level(ver.id)
+        return {
+            "document_version_id": ver.id,
+            "page_count": versions.get(ver.id).page_count,
+            "pages_ocr_updated": stream.pages_ocr,
+            "pages_ocr_failed": sorted(stream.pages_ocr_failed),
+            "chunk_count": chunk_count,
+        }
+
+    def _render_into(self, stream: "_Stream", pdf_path: Path, version_hash: str) -> None:
+        blob = self._store.ref(version_hash, pdf_path.suffix)
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for p in iter_rendered_pages(
+                    pdf_path,
+                    blob.pages_dir,
+                    policy=self._render_policy,
+                    workers=self._render_workers,
+                    lazy=self._lazy_render,
+                ):
+                    if stop.is_set():
+                        return
+                    stream.rendered(p)
+            except Exception as e:
+                stream.render_finished(e)
+            else:
+                stream.render_finished(None)
+
+        producer = threading.Thread(target=produce, name="pipeline-render", daemon=True)
+        producer.start()
+        try:
+            stream.drain(rendering=True)
+        finally:
+            stop.set()
+            producer.join()
+
+
+class _Stream:
+    """Per-run state: OCR in flight, pages ready for segmentation, segmenter position.
+
+    Other threads only enqueue callbacks on `events`; `drain` runs them here.
+    """
+
+    def __init__(
+        self, conn, document_version_id: int, ocr_pool: SharedPool, store: BlobStore
+    ) -> None:
+        self.events: queue.Queue[Callable[[], None]] = queue.Queue()
+        self.pages_ocr = 0
+        self.pages_ocr_failed: list[int] = []
+        self._conn = conn
+        self._dv_id = document_version_id
+        self._ocr_pool = ocr_pool
+        self._store = store
+        self._lang = probe_ocr_languages().selected
+        self._recorder = OcrRecorder(conn, self._lang) if self._lang else None
+        self._futures: list[Future[OcrResult]] = []
+        self._rendering = False
+        self._in_flight = 0
+        self._ready: dict[int, Page] = {}
+        self._next_page = 1
+        self._segmenter = StreamingSegmenter()
+        self._words: dict[int, list[OcrWord]] = {}
+        self._article_ids: dict[str, int] = {}
+        self._chunk_count = 0
+
+    def drain(self, *, rendering: bool) -> None:
+        """Run callbacks until rendering has finished and no OCR is in flight."""
+
+        self._rendering = rendering
+        while self._rendering or self._in_flight:
+            self.events.get()()
+            self._flush_ready()
+
+    def rendered(self, p: RenderedPage) -> None:
+        self.events.put(lambda: self.on_page(self._persist_rendered(p)))
+
+    def render_finished(self, error: Exception | None) -> None:
+        def finished() -> None:
+            if error is not None:
+                raise error
+            self._rendering = False
+
+        self.events.put(finished)
+
+    def on_page(self, page: Page) -> None:
+        tasks, _ = plan_page(page, self._store.materialize)
+        if not tasks or self._recorder is None or self._lang is None:
+            if tasks:
+                log.warning("ocr unavailable, keeping native text page=%s", page.page_number)
+            self._ready[page.page_number] = page
+            self._flush_ready()
+            return
+        self._recorder.expect(tasks)
+        for t in tasks:
+            cached = self._recorder.cached(t)
+            if cached is not None:
+                self._record(self._recorder, t, cached, fresh=False)
+            else:
+                self._submit(self._recorder, t, self._lang)
+        self._flush_ready()
+
+    def finish(self) -> int:
+        self._persist(self._segmenter.finish())
+        return self._chunk_count
+
+    def close(self) -> None:
+        # The pool is shared with other jobs: drop only this run's queued OCR.
+        for fut in self._futures:
+            fut.cancel()
+
+    def _persist_rendered(self, p: RenderedPage) -> Page:
+        self._store.publish(p.files())
+        pages = PageRepo(self._conn)
+        pages.upsert(
+            document_version_id=self._dv_id,
+            page_number=p.page_number,
+            text=p.text,
+            ocr_text=None,
+            quality_level=p.quality_level.value,
+            has_handwriting=False,
+            image_path=str(p.image_path) if p.image_path else None,
+            ocr_regions_json=regions_to_json(p.ocr_regions),
+        )
+        return pages.get(self._dv_id, p.page_number)
+
+    def _submit(self, recorder: OcrRecorder, task: OcrTask, lang: str) -> None:
+        fut = self._ocr_pool.executor().submit(ocr_image_adaptive, task.image_path, lang)
+        self._futures.append(fut)
+        self._in_flight += 1
+
+        def recognized() -> None:
+            self._in_flight -= 1
+            err = fut.exception()
+            if isinstance(err, OcrError):
+                raise err  # no engine: every page would fail
+            if err is not None:
+                self._ocr_failed(task, err)
+            elif task.page.page_number not in self.pages_ocr_failed:
+                self._record(recorder, task, fut.result(), fresh=True)
+
+        fut.add_done_callback(lambda _: self.events.put(recognized))
+
+    def _record(self, recorder: OcrRecorder, task: OcrTask, res: OcrResult, *, fresh: bool) -> None:
+        if recorder.record(task, res, fresh=fresh):
+            self.pages_ocr += 1
+            n = task.page.page_number
+            self._ready[n] = PageRepo(self._conn).get(self._dv_id, n)
+
+    def _ocr_failed(self, task: OcrTask, err: BaseException) -> None:
+        # The page is segmented from its native text; a later OCR job can fill it in.
+        n = task.page.page_number
+        log.error(
+            "ocr failed document_version_id=%s page=%s image=%s",
+            self._dv_id, n, task.image_path, exc_info=err,
+        )
+        if n not in self.pages_ocr_failed:
+            self.pages_ocr_failed.append(n)
+            self._ready[n] = PageRepo(self._conn).get(self._dv_id, n)
+
+    def _flush_ready(self) -> None:
+        # Segmentation consumes pages strictly in order; later pages wait for earlier OCR.
+        while self._next_page in self._ready:
+            page = self._ready.pop(self._next_page)
+            text = (page.ocr_text or page.text or "").strip()
+            self._words[page.page_number] = PageWordsRepo(self._conn).get(page.id) or []
+            if text:
+                self._persist(self._segmenter.add_page(page.page_number, text))
+            self._next_page += 1
+
+    def _persist(self, segs: list[Segment]) -> None:
+        if segs:
+            rows = persist_segments(
+                ChunkRepo(self._conn), self._dv_id, segs, self._words, self._article_ids
+            )
+            self._chunk_count += len(rows)
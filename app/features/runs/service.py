@@ -1,5 +1,6 @@
 from fastapi import HTTPException
 
+from app.infra.repo_errors import ErrorRepo
 from app.infra.repo_runs import OutputRepo, RunRepo
 
 
@@ -31,6 +32,10 @@ class RunsService:
             "started_at": run.started_at,
             "finished_at": run.finished_at,
             "quality_summary_json": run.quality_summary_json,
+            "errors": [
+                {"stage": e.stage.value, "error_code": e.error_code, "message": e.message}
+                for e in ErrorRepo(self._conn).list_for_run(run.id)
+            ],
         }
 
     async def list_outputs(self, *, run_id: int) -> dict[str, object]:
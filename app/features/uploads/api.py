@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Request, Response
+
+from app.features.uploads.service import UploadsService
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+def _service(request: Request) -> UploadsService:
+    cfg = request.app.state.cfg
+    conn = request.app.state.db
+    return UploadsService(
+        conn=conn,
+        blobs_dir=cfg.blobs_dir,
+        remote=cfg.blob_remote,
+        hashes=request.app.state.upload_hashes,
+    )
+
+
+@router.post("", status_code=201)
+def create_upload(request: Request, title: str, filename: str, size: int) -> dict[str, object]:
+    return _service(request).create_session(title=title, filename=filename, size=size)
+
+
+@router.get("/{upload_id}")
+def get_upload(request: Request, upload_id: str) -> dict[str, object]:
+    return _service(request).get_session(upload_id=upload_id)
+
+
+@router.put("/{upload_id}")
+async def put_upload_range(request: Request, upload_id: str) -> dict[str, object]:
+    """Raw body with `Content-Range: bytes start-end/total`, streamed to disk."""
+
+    return await _service(request).put_range(
+        upload_id=upload_id,
+        content_range=request.headers.get("content-range"),
+        body=request.stream(),
+    )
+
+
+@router.post("/{upload_id}/finalize")
+async def finalize_upload(
+    request: Request, response: Response, upload_id: str, pipeline: bool = False
+) -> dict[str, object]:
+    body = await _service(request).finalize(
+        upload_id=upload_id, pipeline=pipeline
+    )
+    if body["job_id"] is not None:
+        response.status_code = 202
+    return body
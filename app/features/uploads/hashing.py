@@ -0,0 +1,58 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+_READ_CHUNK = 1024 * 1024
+
+
+class UploadHashes:
+    """Running sha256 per upload session, advanced by each committed PUT.
+
+    Owned by the app (like the OCR pool), not module state. hashlib cannot persist its
+    state, so an entry lives in memory and is only trusted at the offset it was saved
+    for: after a restart, or when another process took the previous range, the next
+    PUT (or finalize) rebuilds it from the part file's committed prefix once.
+    """
+
+    def __init__(self, max_sessions: int = 1024) -> None:
+        self._max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._hashers: OrderedDict[str, tuple[int, Any]] = OrderedDict()
+
+    def resume(self, upload_id: str, part: Path, offset: int) -> Any:
+        """A hasher over the first `offset` bytes of the session, for the next PUT."""
+
+        with self._lock:
+            saved = self._hashers.get(upload_id)
+        if saved is not None and saved[0] == offset:
+            return saved[1].copy()
+        return _hash_prefix(part, offset)
+
+    def save(self, upload_id: str, offset: int, hasher: Any) -> None:
+        """Record progress once the PUT that fed `hasher` has committed `offset`."""
+
+        with self._lock:
+            self._hashers[upload_id] = (offset, hasher)
+            self._hashers.move_to_end(upload_id)
+            while len(self._hashers) > self._max_sessions:
+                self._hashers.popitem(last=False)
+
+    def digest(self, upload_id: str, part: Path, size: int) -> str:
+        return str(self.resume(upload_id, part, size).hexdigest())
+
+    def forget(self, upload_id: str) -> None:
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+
+
+def _hash_prefix(part: Path, size: int) -> Any:
+    hasher = hashlib.sha256()
+    if size:
+        with part.open("rb") as f:
+            remaining = size
+            while remaining and (chunk := f.read(min(remaining, _READ_CHUNK))):
+                hasher.update(chunk)
+                remaining -= len(chunk)
+    return hasher
@@ -0,0 +1,193 @@
+# EXCEPTION: >150 LOC because the upload session protocol (create/put/finalize) is one unit.
+import re
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.domain.enums import JobType, UploadStatus
+from app.features.uploads.hashing import UploadHashes
+from app.infra.blob_backends import BlobBackend
+from app.infra.repo_bulk_ingest import BulkItem
+from app.infra.repo_documents import DocumentRepo, DocumentVersionRepo
+from app.infra.repo_upload_sessions import UploadSession, UploadSessionRepo
+from app.infra.storage import BlobRef, BlobStore
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+_PDF_EXT = ".pdf"
+# A PUT's claim on its session lapses after this long, so a crashed request cannot
+# wedge the upload; the client then resumes from the last committed offset.
+_PUT_LEASE_SECONDS = 15 * 60
+
+
+class UploadsService:
+    """Resumable uploads: create a session, PUT byte ranges in order, then finalize."""
+
+    def __init__(
+        self,
+        *,
+        conn,
+        blobs_dir: Path,
+        remote: BlobBackend | None = None,
+        hashes: UploadHashes | None = None,
+    ) -> None:
+        self._conn = conn
+        # The app's running hashes; without them finalize hashes the part file once.
+        self._hashes = hashes or UploadHashes()
+        # Part files are node-local: a session's PUTs must reach the node holding them
+        # (or data_dir must be shared); finalize publishes the result to `remote`.
+        self._store = BlobStore(Path(blobs_dir), remote=remote)
+
+    def create_session(self, *, title: str, filename: str, size: int) -> dict[str, object]:
+        if not filename.lower().endswith(_PDF_EXT):
+            raise HTTPException(status_code=400, detail="only_pdf_supported")
+        if size <= 0:
+            raise HTTPException(status_code=400, detail="empty_file")
+        return _session_json(UploadSessionRepo(self._conn).create(title, filename, size))
+
+    def get_session(self, *, upload_id: str) -> dict[str, object]:
+        return _session_json(self._session(upload_id))
+
+    async def put_range(
+        self, *, upload_id: str, content_range: str | None, body: AsyncIterator[bytes]
+    ) -> dict[str, object]:
+        """Append `Content-Range: bytes start-end/total`; `start` must be the current offset."""
+
+        session = self._open_session(upload_id)
+        m = _CONTENT_RANGE_RE.match(content_range or "")
+        if m is None:
+            raise HTTPException(status_code=400, detail="invalid_content_range")
+        start, end, total = (int(g) for g in m.groups())
+        if total != session.total_size or not start <= end < total:
+            raise HTTPException(status_code=400, detail="invalid_content_range")
+        if start != session.received_size:
+            # The client resumes from the offset in the error (or GET /uploads/{id}).
+            raise HTTPException(status_code=409, detail=f"offset_mismatch:{session.received_size}")
+
+        repo = UploadSessionRepo(self._conn)
+        claim = uuid.uuid4().hex
+        if not repo.claim_put(upload_id, start, claim, _PUT_LEASE_SECONDS):
+            raise HTTPException(status_code=409, detail="upload_busy")
+        try:
+            part = self._store.upload_part_path(upload_id)
+            size = part.stat().st_size if part.exists() else 0
+            if size < start:
+                # The part file lives on another node or was lost: restart the upload.
+                raise HTTPException(status_code=409, detail=f"upload_bytes_missing:{size}")
+            hasher = await run_in_threadpool(self._hashes.resume, upload_id, part, start)
+            written = 0
+            with part.open("r+b" if part.exists() else "wb") as f:
+                # Bytes past `start` are left over from an aborted PUT; the claim makes
+                # this request the only writer, so they can be dropped.
+                f.truncate(start)
+                f.seek(start)
+                async for chunk in body:
+                    written += len(chunk)
+                    if start + written > end + 1:
+                        break
+                    await run_in_threadpool(f.write, chunk)
+                    hasher.update(chunk)
+                if written != end - start + 1:
+                    f.truncate(start)
+                    raise HTTPException(status_code=400, detail="range_length_mismatch")
+            if not repo.advance(upload_id, claim, end + 1):
+                raise HTTPException(status_code=409, detail="offset_conflict")
+            self._hashes.save(upload_id, end + 1, hasher)
+        finally:
+            repo.release_put(upload_id, claim)
+        return self.get_session(upload_id=upload_id)
+
+    async def finalize(self, *, upload_id: str, pipeline: bool = False) -> dict[str, object]:
+        """Move the bytes into the blob store and register them, once per session.
+
+        Rendering (and its dedup against already rendered bytes) is left to the queued
+        job. A retried finalize returns the registration it made the first time.
+        """
+
+        session = self._session(upload_id)
+        if session.status == UploadStatus.finalized:
+            return self._finalized_json(session)
+        if session.received_size != session.total_size:
+            raise HTTPException(
+                status_code=409,
+                detail=f"upload_incomplete:{session.received_size}/{session.total_size}",
+            )
+        repo = UploadSessionRepo(self._conn)
+        claim = uuid.uuid4().hex
+        if not repo.claim_put(upload_id, session.total_size, claim, _PUT_LEASE_SECONDS):
+            raise HTTPException(status_code=409, detail="upload_busy")
+        try:
+            blob = await self._adopt_part(session)
+            job_type = JobType.pipeline_document_version if pipeline else JobType.ingest_render
+            item = BulkItem(
+                title=session.title,
+                source_url=None,
+                sha256=blob.sha256,
+                file_path=str(blob.original_path),
+                mime_type="application/pdf",
+            )
+            done = repo.finalize(upload_id, claim, item, job_type)
+            if done is None:
+                raise HTTPException(status_code=409, detail="upload_busy")
+        finally:
+            repo.release_put(upload_id, claim)
+        self._hashes.forget(upload_id)
+        return self._finalized_json(done)
+
+    async def _adopt_part(self, session: UploadSession) -> BlobRef:
+        upload_id = session.id
+        part = self._store.upload_part_path(upload_id)
+        if not part.exists():
+            # An earlier attempt adopted the part, then failed to register it.
+            blob = self._store.find(session.sha256, _PDF_EXT) if session.sha256 else None
+            if blob is None:
+                raise HTTPException(status_code=409, detail="upload_bytes_missing")
+            return blob
+        size = part.stat().st_size
+        if size != session.total_size:
+            raise HTTPException(
+                status_code=409, detail=f"upload_bytes_mismatch:{size}/{session.total_size}"
+            )
+        sha = await run_in_threadpool(self._hashes.digest, upload_id, part, size)
+        UploadSessionRepo(self._conn).set_sha256(upload_id, sha)
+        return self._store.adopt_file(part, sha, _PDF_EXT)
+
+    def _finalized_json(self, s: UploadSession) -> dict[str, object]:
+        if s.document_version_id is None:
+            raise HTTPException(status_code=409, detail="upload_finalized")
+        ver = DocumentVersionRepo(self._conn).get(s.document_version_id)
+        doc = DocumentRepo(self._conn).get(ver.document_id)
+        return {
+            "upload_id": s.id,
+            "bill_id": doc.bill_id,
+            "document_id": doc.id,
+            "document_version_id": ver.id,
+            "sha256": ver.version_hash,
+            "page_count": ver.page_count,
+            "job_id": s.job_id,
+        }
+
+    def _session(self, upload_id: str) -> UploadSession:
+        try:
+            return UploadSessionRepo(self._conn).get(upload_id)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail="upload_not_found") from e
+
+    def _open_session(self, upload_id: str) -> UploadSession:
+        session = self._session(upload_id)
+        if session.status != UploadStatus.open:
+            raise HTTPException(status_code=409, detail="upload_finalized")
+        return session
+
+
+def _session_json(s: UploadSession) -> dict[str, object]:
+    return {
+        "upload_id": s.id,
+        "title": s.title,
+        "filename": s.filename,
+        "size": s.total_size,
+        "offset": s.received_size,
+        "status": s.status.value,
+    }
@@ -0,0 +1,42 @@
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def id_block(conn: sqlite3.Connection, table: str, count: int) -> Iterator[int]:
+    """One write transaction in which the caller assigns `count` ids, from the yielded one.
+
+    `BEGIN IMMEDIATE` takes the write lock before the block is reserved, so no other writer
+    can claim those ids; rows can then reference each other (e.g. parent ids) before a
+    single `executemany`. Ids come from `id_sequences`, which only grows: deleting rows
+    never makes their ids reusable, so stored references cannot start pointing at new
+    rows. Commits once (one fsync) on exit, rolls back on error.
+    """
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        # MAX(id) covers rows written before the sequence existed.
+        row = conn.execute(
+            f"""
+            SELECT MAX(
+              COALESCE((SELECT next_id FROM id_sequences WHERE name = ?), 1),
+              (SELECT COALESCE(MAX(id), 0) + 1 FROM {table})
+            )
+            """,
+            (table,),
+        ).fetchone()
+        first_id = int(row[0])
+        conn.execute(
+            """
+            INSERT INTO id_sequences(name, next_id) VALUES(?, ?)
+            ON CONFLICT(name) DO UPDATE SET next_id = excluded.next_id
+            """,
+            (table, first_id + count),
+        )
+        yield first_id
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
@@ -0,0 +1,159 @@
+# EXCEPTION: >150 LOC because the backend protocol and its two implementations belong together.
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol
+
+from app.domain.enums import BlobBackendKind
+
+_COPY_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class BlobBackendConfig:
+    kind: BlobBackendKind
+    location: str  # shared directory (fs) or bucket name (s3)
+    prefix: str = ""
+    endpoint_url: str | None = None  # MinIO / moto server instead of AWS
+    region: str | None = None
+    # Uploads above this size go up as concurrent multipart parts of this size.
+    multipart_chunk_mb: int = 16
+
+
+@dataclass(frozen=True)
+class BlobObject:
+    key: str
+    size: int
+    mtime: float  # seconds since the epoch
+
+
+class BlobBackend(Protocol):
+    """Shared object storage behind `BlobStore`; keys are `/`-separated, root-relative."""
+
+    def stat(self, key: str) -> BlobObject | None: ...
+
+    def iter_objects(self, prefix: str) -> Iterator[BlobObject]: ...
+
+    def upload_file(self, key: str, path: Path) -> None: ...
+
+    def download_file(self, key: str, path: Path) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+@lru_cache(maxsize=None)
+def open_blob_backend(cfg: BlobBackendConfig) -> BlobBackend:
+    """One backend (and HTTP connection pool) per config and process."""
+
+    if cfg.kind is BlobBackendKind.s3:
+        return S3Backend(cfg)
+    return FsBackend(Path(cfg.location))
+
+
+class FsBackend:
+    """A directory every node mounts; also the stand-in for S3 in tests."""
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    def stat(self, key: str) -> BlobObject | None:
+        try:
+            st = (self._root / key).stat()
+        except FileNotFoundError:
+            return None
+        return BlobObject(key=key, size=st.st_size, mtime=st.st_mtime)
+
+    def iter_objects(self, prefix: str) -> Iterator[BlobObject]:
+        base = self._root / prefix
+        if not base.is_dir():
+            return
+        for p in sorted(base.rglob("*")):
+            if p.is_file():
+                st = p.stat()
+                yield BlobObject(p.relative_to(self._root).as_posix(), st.st_size, st.st_mtime)
+
+    def upload_file(self, key: str, path: Path) -> None:
+        with path.open("rb") as src:
+            _write_atomic(self._root / key, src)
+
+    def download_file(self, key: str, path: Path) -> None:
+        with (self._root / key).open("rb") as src:
+            _write_atomic(path, src)
+
+    def delete(self, key: str) -> None:
+        (self._root / key).unlink(missing_ok=True)
+
+
+class S3Backend:
+    """S3-compatible bucket via boto3 (optional dependency: `pip install .[s3]`).
+
+    Transfers stream through boto3's managed transfer, which switches to concurrent
+    multipart uploads/ranged downloads above `multipart_chunk_mb`.
+    """
+
+    def __init__(self, cfg: BlobBackendConfig) -> None:
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+        except ImportError:
+            raise RuntimeError("s3_backend_requires_boto3") from None
+        self._bucket = cfg.location
+        self._prefix = cfg.prefix.strip("/") + "/" if cfg.prefix.strip("/") else ""
+        self._client: Any = boto3.client(
+            "s3", endpoint_url=cfg.endpoint_url, region_name=cfg.region
+        )
+        chunk = cfg.multipart_chunk_mb * 1024 * 1024
+        self._transfer = TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk)
+
+    def stat(self, key: str) -> BlobObject | None:
+        try:
+            head = self._client.head_object(Bucket=self._bucket, Key=self._prefix + key)
+        except self._client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return BlobObject(key, int(head["ContentLength"]), head["LastModified"].timestamp())
+
+    def iter_objects(self, prefix: str) -> Iterator[BlobObject]:
+        pages = self._client.get_paginator("list_objects_v2").paginate(
+            Bucket=self._bucket, Prefix=self._prefix + prefix
+        )
+        for page in pages:
+            for obj in page.get("Contents", []):
+                key = str(obj["Key"])[len(self._prefix) :]
+                yield BlobObject(key, int(obj["Size"]), obj["LastModified"].timestamp())
+
+    def upload_file(self, key: str, path: Path) -> None:
+        self._client.upload_file(
+            str(path), self._bucket, self._prefix + key, Config=self._transfer
+        )
+
+    def download_file(self, key: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        os.close(fd)
+        try:
+            self._client.download_file(
+                self._bucket, self._prefix + key, tmp_name, Config=self._transfer
+            )
+            os.replace(tmp_name, path)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        self._client.delete_object(Bucket=self._bucket, Key=self._prefix + key)
+
+
+def _write_atomic(path: Path, src: BinaryIO) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(src, out, _COPY_CHUNK)
+        os.replace(tmp_name, path)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
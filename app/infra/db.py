@@ -1,3 +1,4 @@
+# EXCEPTION: >150 LOC because the whole SQLite schema is kept in one reviewable place.
 import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
@@ -12,8 +13,11 @@ def connect(cfg: DbConfig) -> sqlite3.Connection:
     cfg.path.parent.mkdir(parents=True, exist_ok=True)
     # Pareto: allow FastAPI threadpool usage with a single shared connection for PoC.
     # Not for prod; later switch to per-request connections or a pool + Postgres.
-    conn = sqlite3.connect(cfg.path, check_same_thread=False)
+    # The API and the job worker are separate processes on the same file: wait on locks
+    # instead of failing fast, and use WAL so readers are not blocked by the writer.
+    conn = sqlite3.connect(cfg.path, check_same_thread=False, timeout=30.0)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
     conn.execute("PRAGMA foreign_keys = ON")
     # Ensure the pragma is actually applied (SQLite can ignore it until a transaction boundary).
     conn.commit()
@@ -67,6 +71,8 @@ def migrate(conn: sqlite3.Connection) -> None:
           quality_level TEXT,
           has_handwriting INTEGER NOT NULL,
           image_path TEXT,
+          -- JSON list of image regions without native text, OCR'd separately (see page_layout).
+          ocr_regions_json TEXT,
           FOREIGN KEY (document_version_id) REFERENCES document_versions(id),
           UNIQUE(document_version_id, page_number)
         );
@@ -97,6 +103,8 @@ def migrate(conn: sqlite3.Connection) -> None:
           started_at TEXT,
           finished_at TEXT,
           quality_summary_json TEXT,
+          document_version_id INTEGER,
+          job_id INTEGER,
           FOREIGN KEY (bill_id) REFERENCES bills(id)
         );
 
@@ -128,6 +136,13 @@ def migrate(conn: sqlite3.Connection) -> None:
           FOREIGN KEY (chunk_id) REFERENCES chunks(id)
         );
 
+        -- Next id per table for `batch_writes.id_block`; only grows, so ids of deleted
+        -- rows (e.g. chunks cited by earlier runs) are never handed out again.
+        CREATE TABLE IF NOT EXISTS id_sequences (
+          name TEXT PRIMARY KEY,
+          next_id INTEGER NOT NULL
+        );
+
         CREATE TABLE IF NOT EXISTS errors (
           id INTEGER PRIMARY KEY,
           analysis_run_id INTEGER NOT NULL,
@@ -147,7 +162,69 @@ def migrate(conn: sqlite3.Connection) -> None:
           attempts INTEGER NOT NULL,
           scheduled_at TEXT NOT NULL,
           locked_at TEXT,
-          last_error TEXT
+          last_error TEXT,
+          locked_by TEXT,
+          lease_expires_at TEXT,
+          max_attempts INTEGER NOT NULL DEFAULT 5
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, scheduled_at, id);
+        -- Dedup by content hash (upload, bulk ingest) without scanning all versions.
+        CREATE INDEX IF NOT EXISTS idx_document_versions_hash ON document_versions(version_hash);
+        -- Run memoization: latest run for the same input and pipeline version.
+        CREATE INDEX IF NOT EXISTS idx_analysis_runs_input
+          ON analysis_runs(input_fingerprint, pipeline_version, status, id);
+
+        -- OCR results by pixels + engine settings; shared across pages, versions and bills.
+        CREATE TABLE IF NOT EXISTS ocr_cache (
+          image_sha256 TEXT NOT NULL,
+          lang TEXT NOT NULL,
+          engine_version TEXT NOT NULL,
+          settings_key TEXT NOT NULL,
+          text TEXT NOT NULL,
+          confidence REAL,
+          words_json TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY (image_sha256, lang, engine_version, settings_key)
+        );
+
+        -- Analysis stage outputs, keyed by a hash of everything the stage read: page text
+        -- fingerprint, stage version and the upstream stages' output hashes.
+        CREATE TABLE IF NOT EXISTS stage_artifacts (
+          stage TEXT NOT NULL,
+          input_hash TEXT NOT NULL,
+          stage_version TEXT NOT NULL,
+          content_json TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY (stage, input_hash)
+        );
+
+        -- OCR word boxes per page, packed: words_text is space-joined, boxes is int32
+        -- little-endian [left, top, width, height] per word, confidences is int8 per word.
+        CREATE TABLE IF NOT EXISTS page_ocr_words (
+          page_id INTEGER PRIMARY KEY,
+          word_count INTEGER NOT NULL,
+          words_text TEXT NOT NULL,
+          boxes BLOB NOT NULL,
+          confidences BLOB NOT NULL,
+          FOREIGN KEY (page_id) REFERENCES pages(id)
+        );
+
+        -- Resumable uploads: bytes live in <blob root>/uploads/<id>.part until finalize.
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+          id TEXT PRIMARY KEY,
+          title TEXT NOT NULL,
+          filename TEXT NOT NULL,
+          total_size INTEGER NOT NULL,
+          received_size INTEGER NOT NULL,
+          status TEXT NOT NULL,
+          sha256 TEXT,
+          put_claim TEXT,
+          put_claim_expires_at TEXT,
+          -- Set with status=finalized, in the transaction that registered the version.
+          document_version_id INTEGER,
+          job_id INTEGER,
+          created_at TEXT NOT NULL,
+          updated_at TEXT NOT NULL
         );
 
         -- SME knowledge ingestion (PoC)
@@ -232,4 +309,33 @@ def migrate(conn: sqlite3.Connection) -> None:
         );
         """
     )
+    _add_missing_columns(conn)
+    # Single-flight: at most one queued/running analysis run per document version, enforced
+    # by SQLite itself so it holds across API and worker processes. Created after the
+    # column backfill because older databases lack `document_version_id`.
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_runs_in_flight
+          ON analysis_runs(document_version_id) WHERE status IN ('queued', 'running')
+        """
+    )
     conn.commit()
+
+
+# Columns added after a table's first release. `CREATE TABLE IF NOT EXISTS` does not
+# touch existing databases, so these are backfilled with ALTER TABLE.
+_ADDED_COLUMNS: list[tuple[str, str, str]] = [
+    ("jobs", "locked_by", "TEXT"),
+    ("jobs", "lease_expires_at", "TEXT"),
+    ("jobs", "max_attempts", "INTEGER NOT NULL DEFAULT 5"),
+    ("pages", "ocr_regions_json", "TEXT"),
+    ("analysis_runs", "document_version_id", "INTEGER"),
+    ("analysis_runs", "job_id", "INTEGER"),
+]
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    for table, column, ddl in _ADDED_COLUMNS:
+        existing = {str(r["name"]) for r in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
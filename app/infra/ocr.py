@@ -1,36 +1,131 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
 import pytesseract
 from PIL import Image
 
+from app.infra.ocr_preprocess import PREPROCESS_VERSION, preprocess_for_ocr
+
+# Pages whose first (raw) pass averages below this confidence get one preprocessed retry.
+RETRY_BELOW_CONFIDENCE = 60.0
+# Bump when anything that changes OCR output for the same pixels changes (preprocessing,
+# retry threshold, tesseract config flags). Part of the OCR cache key.
+OCR_SETTINGS_KEY = f"raw+retry<{RETRY_BELOW_CONFIDENCE:g}:{PREPROCESS_VERSION}"
+# Traineddata packs to combine, in priority order, when installed.
+_PREFERRED_LANGS = ("ron", "eng")
+
+
+@dataclass(frozen=True)
+class OcrWord:
+    text: str
+    left: int
+    top: int
+    width: int
+    height: int
+    confidence: float  # -1 when tesseract reports none
+
 
 @dataclass(frozen=True)
 class OcrResult:
     text: str
     confidence: float | None
+    # `text` is exactly `" ".join(w.text for w in words)`, so offsets map back to boxes.
+    words: list[OcrWord] = field(default_factory=list)
+
+
+class OcrError(RuntimeError):
+    """OCR engine failure. Plain-args exception so it survives process-pool pickling
+    (pytesseract's TesseractNotFoundError does not)."""
+
+
+@dataclass(frozen=True)
+class OcrLanguages:
+    installed: tuple[str, ...]
+    selected: str | None  # tesseract `-l` value, e.g. "ron+eng"; None if OCR is unavailable
+
+
+@lru_cache(maxsize=1)
+def probe_ocr_languages() -> OcrLanguages:
+    """List installed traineddata once per process and pick the best combination."""
+
+    try:
+        installed = tuple(sorted(pytesseract.get_languages(config="")))
+    except pytesseract.TesseractNotFoundError:
+        return OcrLanguages(installed=(), selected=None)
+    chosen = [lang for lang in _PREFERRED_LANGS if lang in installed]
+    return OcrLanguages(installed=installed, selected="+".join(chosen) if chosen else None)
+
+
+def select_ocr_lang() -> str:
+    selected = probe_ocr_languages().selected
+    if selected is None:
+        raise OcrError("no_ocr_language_available")
+    return selected
+
+
+@lru_cache(maxsize=1)
+def tesseract_version() -> str:
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except pytesseract.TesseractNotFoundError:
+        raise OcrError("tesseract_not_installed") from None
+
 
+def ocr_image(path: Path, lang: str) -> OcrResult:
+    """OCR one image with an explicit `lang` (see `select_ocr_lang`); no retry fallback."""
 
-def ocr_image(path: Path, lang: str = "ron") -> OcrResult:
-    img = Image.open(path)
+    with Image.open(path) as img:
+        return _ocr_pil(img, lang)
+
+
+def ocr_image_adaptive(path: Path, lang: str) -> OcrResult:
+    """Raw pass first; only below `RETRY_BELOW_CONFIDENCE`, one preprocessed retry.
+
+    The better of the two (by average confidence) wins. Retry word boxes are mapped
+    back to the original image's pixels (the small deskew rotation is ignored).
+    """
+
+    with Image.open(path) as img:
+        first = _ocr_pil(img, lang)
+        if first.confidence is not None and first.confidence >= RETRY_BELOW_CONFIDENCE:
+            return first
+        cleaned, scale = preprocess_for_ocr(img)
+    second = _ocr_pil(cleaned, lang, scale=scale)
+    if second.confidence is not None and (
+        first.confidence is None or second.confidence > first.confidence
+    ):
+        return second
+    return first
+
+
+def _ocr_pil(img: Image.Image, lang: str, scale: float = 1.0) -> OcrResult:
     try:
         data = pytesseract.image_to_data(img, lang=lang, output_type=pytesseract.Output.DICT)
-    except pytesseract.TesseractError:
-        # Pareto: fall back to English if Romanian traineddata isn't installed locally.
-        data = pytesseract.image_to_data(img, lang="eng", output_type=pytesseract.Output.DICT)
-    texts: list[str] = []
+    except pytesseract.TesseractNotFoundError:
+        raise OcrError("tesseract_not_installed") from None
+    words: list[OcrWord] = []
     confs: list[float] = []
 
-    for t, c in zip(data.get("text", []), data.get("conf", [])):
+    for i, t in enumerate(data.get("text", [])):
         if not t or not str(t).strip():
             continue
-        texts.append(str(t))
         try:
-            cf = float(c)
-            if cf >= 0:
-                confs.append(cf)
-        except Exception:
-            continue
+            cf = float(data["conf"][i])
+        except (KeyError, IndexError, TypeError, ValueError):
+            cf = -1.0
+        if cf >= 0:
+            confs.append(cf)
+        words.append(
+            OcrWord(
+                text=str(t).strip(),
+                left=round(int(data["left"][i]) / scale),
+                top=round(int(data["top"][i]) / scale),
+                width=round(int(data["width"][i]) / scale),
+                height=round(int(data["height"][i]) / scale),
+                confidence=cf,
+            )
+        )
 
     avg = (sum(confs) / len(confs)) if confs else None
-    return OcrResult(text=" ".join(texts).strip(), confidence=avg)
+    return OcrResult(text=" ".join(w.text for w in words), confidence=avg, words=words)
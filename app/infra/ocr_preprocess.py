@@ -0,0 +1,83 @@
+"""Pillow-only clean-up for poor scans before a second OCR pass (no numpy dependency).
+
+Order matters: deskew on the grey image, denoise, upscale small images, then
+binarize last so interpolation does not smear the threshold edges.
+"""
+
+from PIL import Image, ImageFilter, ImageOps
+
+# Bump when any step below changes; it is part of the OCR cache settings key.
+PREPROCESS_VERSION = "pre-v1"
+
+_MAX_SKEW_DEGREES = 5.0
+_SKEW_STEP_DEGREES = 0.5
+_SKEW_PROBE_WIDTH = 600  # deskew is estimated on a downscaled copy
+# Images whose long side is below this are upscaled 2x (small regions, low-DPI scans).
+_UPSCALE_BELOW_PX = 1600
+
+
+def preprocess_for_ocr(img: Image.Image) -> tuple[Image.Image, float]:
+    """-> (cleaned 1-bit-like greyscale image, scale factor applied to coordinates)."""
+
+    gray = ImageOps.autocontrast(img.convert("L"))
+    angle = estimate_skew(gray)
+    if angle:
+        gray = gray.rotate(angle, resample=Image.Resampling.BICUBIC, fillcolor=255)
+    gray = gray.filter(ImageFilter.MedianFilter(3))
+
+    scale = 2.0 if max(gray.size) < _UPSCALE_BELOW_PX else 1.0
+    if scale != 1.0:
+        gray = gray.resize(
+            (int(gray.width * scale), int(gray.height * scale)), Image.Resampling.LANCZOS
+        )
+
+    threshold = otsu_threshold(gray)
+    return gray.point(lambda v: 255 if v > threshold else 0), scale
+
+
+def estimate_skew(gray: Image.Image) -> float:
+    """Rotation (degrees) that best aligns text rows: max variance of row darkness."""
+
+    ratio = min(1.0, _SKEW_PROBE_WIDTH / max(1, gray.width))
+    probe = ImageOps.invert(
+        gray.resize((max(1, int(gray.width * ratio)), max(1, int(gray.height * ratio))))
+    )
+    steps = int(_MAX_SKEW_DEGREES / _SKEW_STEP_DEGREES)
+    best_angle, best_score = 0.0, _row_variance(probe)
+    for i in range(-steps, steps + 1):
+        angle = i * _SKEW_STEP_DEGREES
+        if angle == 0:
+            continue
+        score = _row_variance(probe.rotate(angle, resample=Image.Resampling.BILINEAR))
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def otsu_threshold(gray: Image.Image) -> int:
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0.0
+    best_t, best_var = 127, -1.0
+    for t, h in enumerate(hist):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += t * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        var = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if var > best_var:
+            best_t, best_var = t, var
+    return best_t
+
+
+def _row_variance(img: Image.Image) -> float:
+    # Squashing to one column averages each row (box filter) without numpy.
+    rows = list(img.resize((1, img.height), Image.Resampling.BOX).tobytes())
+    mean = sum(rows) / len(rows)
+    return sum((r - mean) ** 2 for r in rows) / len(rows)
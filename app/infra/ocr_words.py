@@ -0,0 +1,80 @@
+"""Compact, array-backed encoding of OCR word boxes (one BLOB per page, not a row per word)."""
+
+import json
+import re
+import sys
+from array import array
+
+from app.infra.ocr import OcrWord
+
+BBox = tuple[int, int, int, int]  # x0, y0, x1, y1 in page-image pixels
+
+_FIELDS_PER_BOX = 4
+_WS_RE = re.compile(r"\s+")
+# Quotes are located by this long a prefix; the box then extends over the rest of the
+# quote, clipped at the end of the page (chunk text may run onto the next page).
+_ANCHOR_CHARS = 120
+
+
+def pack_words(words: list[OcrWord]) -> tuple[str, bytes, bytes]:
+    """-> (space-joined words, int32 boxes [left, top, width, height]*, int8 confidences)."""
+
+    boxes = array("i")
+    confs = array("b")
+    for w in words:
+        boxes.extend((w.left, w.top, w.width, w.height))
+        confs.append(max(-1, min(100, round(w.confidence))))
+    if sys.byteorder == "big":  # store little-endian regardless of host
+        boxes.byteswap()
+    return " ".join(w.text for w in words), boxes.tobytes(), confs.tobytes()
+
+
+def unpack_words(text: str, boxes_blob: bytes, confs_blob: bytes) -> list[OcrWord]:
+    boxes = array("i", boxes_blob)
+    if sys.byteorder == "big":
+        boxes.byteswap()
+    confs = array("b", confs_blob)
+    tokens = text.split(" ") if text else []
+    return [
+        OcrWord(
+            text=t,
+            left=boxes[i * _FIELDS_PER_BOX],
+            top=boxes[i * _FIELDS_PER_BOX + 1],
+            width=boxes[i * _FIELDS_PER_BOX + 2],
+            height=boxes[i * _FIELDS_PER_BOX + 3],
+            confidence=float(confs[i]),
+        )
+        for i, t in enumerate(tokens)
+    ]
+
+
+def quote_bbox(words: list[OcrWord], quote: str) -> BBox | None:
+    """Union box of the words covering the first occurrence of `quote` (whitespace-insensitive)."""
+
+    needle = _WS_RE.sub(" ", quote).strip()
+    joined = " ".join(w.text for w in words)
+    start = joined.find(needle[:_ANCHOR_CHARS]) if needle else -1
+    if start < 0:
+        return None
+    end = start + len(needle)
+
+    hit: list[OcrWord] = []
+    offset = 0
+    for w in words:
+        if offset < end and offset + len(w.text) > start:
+            hit.append(w)
+        offset += len(w.text) + 1
+    if not hit:
+        return None
+    return (
+        min(w.left for w in hit),
+        min(w.top for w in hit),
+        max(w.left + w.width for w in hit),
+        max(w.top + w.height for w in hit),
+    )
+
+
+def bbox_to_json(bbox: BBox | None) -> str | None:
+    if bbox is None:
+        return None
+    return json.dumps({"bbox": list(bbox), "coords": "page_image_px"})
@@ -1,29 +1,208 @@
-from dataclasses import dataclass
+# EXCEPTION: >150 LOC because triage, fan-out and image encoding share one render path.
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import fitz  # PyMuPDF
+from PIL import Image
+
+from app.domain.enums import ImageFormat, QualityLevel
+from app.domain.page_layout import OcrRegion, find_ocr_regions, layout_text
+from app.domain.page_quality import classify_page, needs_ocr, page_signals
+from app.domain.render_policy import DEFAULT_RENDER_POLICY, RenderPolicy, RenderSpec
+from app.infra.process_pool import spawn_pool
+
+# Below this many pages per worker, process start-up costs more than it saves.
+_MIN_PAGES_PER_WORKER = 4
+# Several small batches per worker keep results flowing back in page order
+# instead of waiting for one large contiguous range to finish.
+_BATCHES_PER_WORKER = 4
+# Grey level above which a pixel becomes white in 1-bit display images.
+_BILEVEL_THRESHOLD = 160
+_JPEG_QUALITY = 80
 
 
 @dataclass(frozen=True)
 class RenderedPage:
     page_number: int
-    image_path: Path
+    # None when rasterization was deferred (lazy mode, page has a usable text layer).
+    image_path: Path | None
     text: str
+    quality_level: QualityLevel
+    # Image regions without native text, rasterized for region-targeted OCR.
+    ocr_regions: list[OcrRegion] = field(default_factory=list)
+
+    def files(self) -> list[Path]:
+        """Images written for this page (page image and region crops)."""
+
+        files = [Path(r.image_path) for r in self.ocr_regions]
+        return [self.image_path, *files] if self.image_path else files
+
+
+def pdf_page_count(pdf_path: Path) -> int:
+    with fitz.open(pdf_path) as doc:
+        return int(doc.page_count)
+
+
+def render_pdf_to_pages(
+    pdf_path: Path,
+    out_dir: Path,
+    policy: RenderPolicy = DEFAULT_RENDER_POLICY,
+    workers: int = 1,
+    lazy: bool = False,
+) -> list[RenderedPage]:
+    return list(iter_rendered_pages(pdf_path, out_dir, policy=policy, workers=workers, lazy=lazy))
 
 
-def render_pdf_to_pages(pdf_path: Path, out_dir: Path, dpi: int = 150) -> list[RenderedPage]:
+def iter_rendered_pages(
+    pdf_path: Path,
+    out_dir: Path,
+    policy: RenderPolicy = DEFAULT_RENDER_POLICY,
+    workers: int = 1,
+    lazy: bool = False,
+) -> Iterator[RenderedPage]:
+    """Yield rendered pages in page order, optionally fanning out to worker processes.
+
+    Each worker opens its own `fitz` document (documents are not picklable/shareable).
+    Every page is triaged (Q1-Q3) from its text layer and image coverage. With `lazy`,
+    only pages that need OCR are rasterized; the rest render on first request via
+    `render_page_image`. `policy` picks DPI/colour/codec per page (OCR vs display).
+    """
+
     out_dir.mkdir(parents=True, exist_ok=True)
-    doc = fitz.open(pdf_path)
-    pages: list[RenderedPage] = []
-    zoom = dpi / 72.0
-    mat = fitz.Matrix(zoom, zoom)
-
-    for i in range(doc.page_count):
-        page = doc.load_page(i)
-        text = page.get_text("text") or ""
-        pix = page.get_pixmap(matrix=mat)
-        img_path = out_dir / f"{i+1}.png"
-        pix.save(str(img_path))
-        pages.append(RenderedPage(page_number=i + 1, image_path=img_path, text=text))
-
-    return pages
+    page_count = pdf_page_count(pdf_path)
+
+    workers = min(workers, page_count // _MIN_PAGES_PER_WORKER)
+    if workers <= 1:
+        yield from _render_range(pdf_path, out_dir, policy, lazy, 0, page_count)
+        return
+
+    pool = spawn_pool(workers)
+    try:
+        futures = [
+            pool.submit(_render_range_list, pdf_path, out_dir, policy, lazy, start, end)
+            for start, end in split_page_ranges(page_count, workers * _BATCHES_PER_WORKER)
+        ]
+        for fut in futures:
+            yield from fut.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def split_page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    """Split [0, page_count) into at most `parts` contiguous, near-equal ranges."""
+
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def render_page_image(
+    pdf_path: Path,
+    out_dir: Path,
+    page_number: int,
+    policy: RenderPolicy = DEFAULT_RENDER_POLICY,
+    for_ocr: bool = False,
+) -> Path:
+    """Rasterize a single page (1-based) unless its image already exists."""
+
+    spec = policy.spec_for(for_ocr)
+    img_path = out_dir / f"{page_number}.{spec.image_format.value}"
+    if img_path.exists():
+        return img_path
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with fitz.open(pdf_path) as doc:
+        _save_pixmap(doc.load_page(page_number - 1), img_path, spec)
+    return img_path
+
+
+def _render_range_list(
+    pdf_path: Path, out_dir: Path, policy: RenderPolicy, lazy: bool, start: int, end: int
+) -> list[RenderedPage]:
+    return list(_render_range(pdf_path, out_dir, policy, lazy, start, end))
+
+
+def _render_range(
+    pdf_path: Path, out_dir: Path, policy: RenderPolicy, lazy: bool, start: int, end: int
+) -> Iterator[RenderedPage]:
+    with fitz.open(pdf_path) as doc:
+        for i in range(start, end):
+            page = doc.load_page(i)
+            text = page.get_text("text") or ""
+            level = classify_page(page_signals(text, _image_area_ratio(page)))
+            for_ocr = needs_ocr(level)
+            img_path: Path | None = None
+            if not lazy or for_ocr:
+                spec = policy.spec_for(for_ocr)
+                img_path = out_dir / f"{i+1}.{spec.image_format.value}"
+                _save_pixmap(page, img_path, spec)
+            regions: list[OcrRegion] = []
+            if policy.region_ocr and not for_ocr:
+                text, regions = _render_ocr_regions(page, out_dir, i + 1, policy, text)
+            yield RenderedPage(
+                page_number=i + 1,
+                image_path=img_path,
+                text=text,
+                quality_level=level,
+                ocr_regions=regions,
+            )
+
+
+def _render_ocr_regions(
+    page: fitz.Page, out_dir: Path, page_number: int, policy: RenderPolicy, text: str
+) -> tuple[str, list[OcrRegion]]:
+    """Rasterize text-less image regions; the page text is re-laid out around them."""
+
+    blocks = [(tuple(b[:4]), str(b[4])) for b in page.get_text("blocks") if b[6] == 0]
+    images = [tuple(info["bbox"]) for info in page.get_image_info()]
+    rects = find_ocr_regions(tuple(page.rect), images, [r for r, _ in blocks])
+    if not rects:
+        return text, []
+    text, offsets = layout_text(blocks, rects)
+    spec = policy.spec_for(for_ocr=True)
+    regions: list[OcrRegion] = []
+    for k, (rect, offset) in enumerate(zip(rects, offsets, strict=True), start=1):
+        img_path = out_dir / f"{page_number}.r{k}.{spec.image_format.value}"
+        _save_pixmap(page, img_path, spec, clip=fitz.Rect(rect))
+        regions.append(OcrRegion(bbox=rect, text_offset=offset, image_path=str(img_path)))
+    return text, regions
+
+
+def _image_area_ratio(page: fitz.Page) -> float:
+    """Share of the page covered by embedded images (overlaps counted once per image)."""
+
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0.0
+    covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return min(1.0, float(covered / page_area))
+
+
+def _save_pixmap(
+    page: fitz.Page, img_path: Path, spec: RenderSpec, clip: fitz.Rect | None = None
+) -> None:
+    zoom = spec.dpi / 72.0
+    colorspace = fitz.csGRAY if spec.grayscale or spec.bilevel else fitz.csRGB
+    pix = page.get_pixmap(
+        matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False, clip=clip
+    )
+    # Write-then-rename: on-demand renders may race with readers of the same image.
+    tmp_path = img_path.with_name(f".{img_path.stem}.tmp{img_path.suffix}")
+    if spec.bilevel:
+        gray = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        gray.point(lambda v: 255 if v > _BILEVEL_THRESHOLD else 0).convert("1").save(
+            tmp_path, format="PNG", optimize=True
+        )
+    elif spec.image_format is ImageFormat.jpeg:
+        pix.save(str(tmp_path), jpg_quality=_JPEG_QUALITY)
+    else:
+        pix.save(str(tmp_path))
+    os.replace(tmp_path, img_path)
@@ -0,0 +1,39 @@
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn, not fork: the API and worker processes are multi-threaded (threadpool,
+    # heartbeats), and forking a threaded process can deadlock the child.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class SharedPool:
+    """One executor, started on first use, shared by every job or request of a process.
+
+    Owned by the job runtime or the API app (not module state): callers submit to it and
+    leave shutdown to the owner, so concurrent jobs queue for the same `workers` slots
+    instead of each starting a pool of their own.
+    """
+
+    def __init__(
+        self, workers: int, factory: Callable[[int], Executor] = spawn_pool
+    ) -> None:
+        self.workers = max(1, workers)
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory(self.workers)
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,80 @@
+import sqlite3
+
+from app.domain.enums import UploadStatus
+from app.domain.page_layout import regions_from_json
+
+
+class BlobRefRepo:
+    """Which stored files the database still points at (blob GC and layout migration).
+
+    A blob is referenced by every `document_versions` row carrying its hash; page images
+    by `pages.image_path` and by the region images in `pages.ocr_regions_json`.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def version_ref_counts(self) -> dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT version_hash, COUNT(*) AS n FROM document_versions GROUP BY version_hash"
+        ).fetchall()
+        return {str(r["version_hash"]): int(r["n"]) for r in rows}
+
+    def ref_count(self, sha256: str) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS n FROM document_versions WHERE version_hash = ?", (sha256,)
+        ).fetchone()
+        return int(row["n"])
+
+    def page_file_paths(self, sha256: str) -> set[str]:
+        """Page and region image paths recorded for any version of these bytes."""
+
+        rows = self._conn.execute(
+            """
+            SELECT p.image_path, p.ocr_regions_json FROM pages p
+            JOIN document_versions dv ON dv.id = p.document_version_id
+            WHERE dv.version_hash = ?
+            """,
+            (sha256,),
+        ).fetchall()
+        paths: set[str] = set()
+        for r in rows:
+            if r["image_path"]:
+                paths.add(str(r["image_path"]))
+            paths.update(region.image_path for region in regions_from_json(r["ocr_regions_json"]))
+        return paths
+
+    def open_upload_ids(self) -> set[str]:
+        rows = self._conn.execute(
+            "SELECT id FROM upload_sessions WHERE status = ?", (UploadStatus.open.value,)
+        ).fetchall()
+        return {str(r["id"]) for r in rows}
+
+    def rewrite_blob_paths(self, sha256: str, old_prefix: str, new_prefix: str) -> int:
+        """Point one blob's version/page rows at its new directory, in one transaction."""
+
+        with self._conn:
+            cur = self._conn.execute(
+                """
+                UPDATE document_versions SET file_path = ? || substr(file_path, ?)
+                WHERE version_hash = ? AND substr(file_path, 1, ?) = ?
+                """,
+                (new_prefix, len(old_prefix) + 1, sha256, len(old_prefix), old_prefix),
+            )
+            # Region paths sit inside JSON; every one of them starts with the same prefix.
+            self._conn.execute(
+                """
+                UPDATE pages SET
+                  image_path = CASE WHEN substr(image_path, 1, ?) = ?
+                    THEN ? || substr(image_path, ?) ELSE image_path END,
+                  ocr_regions_json = replace(ocr_regions_json, ?, ?)
+                WHERE document_version_id IN (
+                  SELECT id FROM document_versions WHERE version_hash = ?
+                )
+                """,
+                (
+                    len(old_prefix), old_prefix, new_prefix, len(old_prefix) + 1,
+                    old_prefix, new_prefix, sha256,
+                ),
+            )
+        return int(cur.rowcount)
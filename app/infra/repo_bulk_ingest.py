@@ -0,0 +1,113 @@
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.domain.enums import JobStatus, JobType
+from app.infra.repo_jobs import DEFAULT_MAX_ATTEMPTS
+
+
+@dataclass(frozen=True)
+class BulkItem:
+    title: str
+    source_url: str | None
+    sha256: str
+    file_path: str
+    mime_type: str
+
+
+@dataclass(frozen=True)
+class BulkRegistered:
+    sha256: str
+    bill_id: int
+    document_id: int
+    document_version_id: int
+    job_id: int
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BulkIngestRepo:
+    """Bill + document + version + queued job per file, a whole batch per transaction.
+
+    The per-table repos commit after every write; a 10k-file backfill would pay for
+    40k fsyncs that way, so this writes the same rows in one transaction per batch.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def existing_versions(self, shas: list[str]) -> dict[str, int]:
+        """sha256 -> oldest document_version id already holding those bytes."""
+
+        if not shas:
+            return {}
+        marks = ",".join("?" for _ in shas)
+        rows = self._conn.execute(
+            f"""
+            SELECT version_hash, MIN(id) AS id FROM document_versions
+            WHERE version_hash IN ({marks}) GROUP BY version_hash
+            """,
+            shas,
+        ).fetchall()
+        return {str(r["version_hash"]): int(r["id"]) for r in rows}
+
+    def register_batch(
+        self, items: list[BulkItem], source: str, job_type: JobType
+    ) -> list[BulkRegistered]:
+        now = utc_now_iso()
+        with self._conn:  # one commit (or rollback) for the whole batch
+            return [
+                self.insert_registration(it, source, job_type, "bulk_ingest", now) for it in items
+            ]
+
+    def insert_registration(
+        self, it: BulkItem, source: str, job_type: JobType, notes: str | None, now: str
+    ) -> BulkRegistered:
+        """Insert one file's rows without committing: runs in the caller's transaction."""
+
+        bill_id = self._insert_id(
+            """
+            INSERT INTO bills(source, source_bill_id, title, status, introduced_at,
+                              created_at, updated_at)
+            VALUES(?, NULL, ?, NULL, NULL, ?, ?) RETURNING id
+            """,
+            (source, it.title, now, now),
+        )
+        document_id = self._insert_id(
+            """
+            INSERT INTO documents(bill_id, doc_type, source_url, created_at)
+            VALUES(?, 'proiect', ?, ?) RETURNING id
+            """,
+            (bill_id, it.source_url, now),
+        )
+        version_id = self._insert_id(
+            """
+            INSERT INTO document_versions(
+              document_id, version_hash, fetched_at, mime_type, file_path,
+              page_count, quality_level, ocr_applied, notes
+            )
+            VALUES(?, ?, ?, ?, ?, NULL, NULL, 0, ?) RETURNING id
+            """,
+            (document_id, it.sha256, now, it.mime_type, it.file_path, notes),
+        )
+        job_id = self._insert_id(
+            """
+            INSERT INTO jobs(type, payload_json, status, attempts, scheduled_at,
+                             max_attempts)
+            VALUES(?, ?, ?, 0, ?, ?) RETURNING id
+            """,
+            (
+                job_type.value,
+                json.dumps({"document_version_id": version_id}),
+                JobStatus.queued.value,
+                now,
+                DEFAULT_MAX_ATTEMPTS,
+            ),
+        )
+        return BulkRegistered(it.sha256, bill_id, document_id, version_id, job_id)
+
+    def _insert_id(self, sql: str, params: tuple[object, ...]) -> int:
+        return int(self._conn.execute(sql, params).fetchone()["id"])
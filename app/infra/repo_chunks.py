@@ -1,7 +1,11 @@
+# EXCEPTION: >150 LOC because single and batched inserts share the chunk row mapping.
 import sqlite3
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
+from app.infra.batch_writes import id_block
+
 
 @dataclass(frozen=True)
 class ChunkRow:
@@ -19,6 +23,20 @@ class ChunkRow:
     created_at: str
 
 
+@dataclass(frozen=True)
+class NewChunk:
+    """A chunk for `create_many`; its parent is an existing id or an earlier list entry."""
+
+    chunk_type: str
+    label: str | None
+    page_start: int
+    page_end: int
+    text: str
+    bbox_json: str | None = None
+    parent_chunk_id: int | None = None
+    parent_index: int | None = None
+
+
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -41,32 +59,86 @@ class ChunkRepo:
         bbox_json: str | None,
     ) -> ChunkRow:
         now = utc_now_iso()
-        cur = self._conn.execute(
-            """
-            INSERT INTO chunks(
-              document_version_id, chunk_type, label, parent_chunk_id,
-              page_start, page_end, text, char_start, char_end, bbox_json, created_at
+        with id_block(self._conn, "chunks", 1) as chunk_id:
+            self._conn.execute(
+                """
+                INSERT INTO chunks(
+                  id, document_version_id, chunk_type, label, parent_chunk_id,
+                  page_start, page_end, text, char_start, char_end, bbox_json, created_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    chunk_id,
+                    document_version_id,
+                    chunk_type,
+                    label,
+                    parent_chunk_id,
+                    page_start,
+                    page_end,
+                    text,
+                    char_start,
+                    char_end,
+                    bbox_json,
+                    now,
+                ),
             )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                document_version_id,
-                chunk_type,
-                label,
-                parent_chunk_id,
-                page_start,
-                page_end,
-                text,
-                char_start,
-                char_end,
-                bbox_json,
-                now,
-            ),
-        )
-        self._conn.commit()
-        if cur.lastrowid is None:
-            raise RuntimeError("Failed to create chunk: missing lastrowid")
-        return self.get(int(cur.lastrowid))
+        return self.get(chunk_id)
+
+    def create_many(
+        self, document_version_id: int, chunks: Sequence[NewChunk]
+    ) -> list[ChunkRow]:
+        """Insert a whole segmentation in one transaction with one `executemany`.
+
+        Ids are allocated up front, so `parent_index` links resolve in-process and the
+        returned rows need no re-read.
+        """
+
+        if not chunks:
+            return []
+        now = utc_now_iso()
+        with id_block(self._conn, "chunks", len(chunks)) as first_id:
+            rows: list[ChunkRow] = []
+            for i, c in enumerate(chunks):
+                parent_id = c.parent_chunk_id
+                if c.parent_index is not None:
+                    if not 0 <= c.parent_index < i:
+                        raise ValueError(f"parent_index must precede its child: {i}")
+                    parent_id = first_id + c.parent_index
+                rows.append(
+                    ChunkRow(
+                        id=first_id + i,
+                        document_version_id=document_version_id,
+                        chunk_type=c.chunk_type,
+                        label=c.label,
+                        parent_chunk_id=parent_id,
+                        page_start=c.page_start,
+                        page_end=c.page_end,
+                        text=c.text,
+                        char_start=None,
+                        char_end=None,
+                        bbox_json=c.bbox_json,
+                        created_at=now,
+                    )
+                )
+            self._conn.executemany(
+                """
+                INSERT INTO chunks(
+                  id, document_version_id, chunk_type, label, parent_chunk_id,
+                  page_start, page_end, text, char_start, char_end, bbox_json, created_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        r.id, r.document_version_id, r.chunk_type, r.label, r.parent_chunk_id,
+                        r.page_start, r.page_end, r.text, r.char_start, r.char_end,
+                        r.bbox_json, r.created_at,
+                    )
+                    for r in rows
+                ],
+            )
+        return rows
 
     def get(self, chunk_id: int) -> ChunkRow:
         row = self._conn.execute("SELECT * FROM chunks WHERE id = ?", (chunk_id,)).fetchone()
@@ -110,6 +182,12 @@ class ChunkRepo:
             for r in rows
         ]
 
+    def count_for_version(self, document_version_id: int) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS n FROM chunks WHERE document_version_id = ?", (document_version_id,)
+        ).fetchone()
+        return int(row["n"])
+
     def delete_for_version(self, document_version_id: int) -> None:
         self._conn.execute("DELETE FROM chunks WHERE document_version_id = ?", (document_version_id,))
         self._conn.commit()
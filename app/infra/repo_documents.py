@@ -1,3 +1,4 @@
+# EXCEPTION: >150 LOC because documents and their versions are one aggregate (shared mappers).
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -52,28 +53,13 @@ class DocumentRepo:
         row = self._conn.execute("SELECT * FROM documents WHERE id = ?", (document_id,)).fetchone()
         if row is None:
             raise KeyError(f"Document not found: {document_id}")
-        return Document(
-            id=int(row["id"]),
-            bill_id=int(row["bill_id"]),
-            doc_type=str(row["doc_type"]),
-            source_url=row["source_url"],
-            created_at=str(row["created_at"]),
-        )
+        return _document_from_row(row)
 
     def list_for_bill(self, bill_id: int) -> list[Document]:
         rows = self._conn.execute(
             "SELECT * FROM documents WHERE bill_id = ? ORDER BY id ASC", (bill_id,)
         ).fetchall()
-        return [
-            Document(
-                id=int(r["id"]),
-                bill_id=int(r["bill_id"]),
-                doc_type=str(r["doc_type"]),
-                source_url=r["source_url"],
-                created_at=str(r["created_at"]),
-            )
-            for r in rows
-        ]
+        return [_document_from_row(r) for r in rows]
 
 
 class DocumentVersionRepo:
@@ -123,36 +109,77 @@ class DocumentVersionRepo:
         ).fetchone()
         if row is None:
             raise KeyError(f"Document version not found: {version_id}")
-        return DocumentVersion(
-            id=int(row["id"]),
-            document_id=int(row["document_id"]),
-            version_hash=str(row["version_hash"]),
-            fetched_at=str(row["fetched_at"]),
-            mime_type=str(row["mime_type"]),
-            file_path=str(row["file_path"]),
-            page_count=row["page_count"],
-            quality_level=row["quality_level"],
-            ocr_applied=bool(row["ocr_applied"]),
-            notes=row["notes"],
+        return _version_from_row(row)
+
+    def set_page_count(self, version_id: int, page_count: int) -> None:
+        self._conn.execute(
+            "UPDATE document_versions SET page_count = ? WHERE id = ?", (page_count, version_id)
+        )
+        self._conn.commit()
+
+    def refresh_quality_level(self, version_id: int) -> None:
+        """Document quality is its worst page ("Q1" < ... < "Q4" also sorts as text)."""
+
+        self._conn.execute(
+            """
+            UPDATE document_versions
+            SET quality_level = (SELECT MAX(quality_level) FROM pages WHERE document_version_id = ?)
+            WHERE id = ?
+            """,
+            (version_id, version_id),
+        )
+        self._conn.commit()
+
+    def mark_ocr_applied(self, version_id: int) -> None:
+        self._conn.execute(
+            "UPDATE document_versions SET ocr_applied = 1 WHERE id = ?", (version_id,)
         )
+        self._conn.commit()
+
+    def find_rendered_by_hash(self, version_hash: str) -> DocumentVersion | None:
+        """Latest version with these bytes whose pages are fully persisted (OCR'd preferred)."""
+
+        row = self._conn.execute(
+            """
+            SELECT dv.* FROM document_versions dv
+            WHERE dv.version_hash = ?
+              AND dv.page_count IS NOT NULL
+              AND dv.page_count = (SELECT COUNT(*) FROM pages p WHERE p.document_version_id = dv.id)
+            ORDER BY dv.ocr_applied DESC, dv.id DESC
+            LIMIT 1
+            """,
+            (version_hash,),
+        ).fetchone()
+        return _version_from_row(row) if row is not None else None
 
     def list_for_document(self, document_id: int) -> list[DocumentVersion]:
         rows = self._conn.execute(
             "SELECT * FROM document_versions WHERE document_id = ? ORDER BY id DESC",
             (document_id,),
         ).fetchall()
-        return [
-            DocumentVersion(
-                id=int(r["id"]),
-                document_id=int(r["document_id"]),
-                version_hash=str(r["version_hash"]),
-                fetched_at=str(r["fetched_at"]),
-                mime_type=str(r["mime_type"]),
-                file_path=str(r["file_path"]),
-                page_count=r["page_count"],
-                quality_level=r["quality_level"],
-                ocr_applied=bool(r["ocr_applied"]),
-                notes=r["notes"],
-            )
-            for r in rows
-        ]
+        return [_version_from_row(r) for r in rows]
+
+
+def _document_from_row(row: sqlite3.Row) -> Document:
+    return Document(
+        id=int(row["id"]),
+        bill_id=int(row["bill_id"]),
+        doc_type=str(row["doc_type"]),
+        source_url=row["source_url"],
+        created_at=str(row["created_at"]),
+    )
+
+
+def _version_from_row(row: sqlite3.Row) -> DocumentVersion:
+    return DocumentVersion(
+        id=int(row["id"]),
+        document_id=int(row["document_id"]),
+        version_hash=str(row["version_hash"]),
+        fetched_at=str(row["fetched_at"]),
+        mime_type=str(row["mime_type"]),
+        file_path=str(row["file_path"]),
+        page_count=row["page_count"],
+        quality_level=row["quality_level"],
+        ocr_applied=bool(row["ocr_applied"]),
+        notes=row["notes"],
+    )
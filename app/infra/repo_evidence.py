@@ -1,6 +1,9 @@
 import sqlite3
+from collections.abc import Sequence
 from dataclasses import dataclass
 
+from app.infra.batch_writes import id_block
+
 
 @dataclass(frozen=True)
 class EvidenceRow:
@@ -13,6 +16,14 @@ class EvidenceRow:
     article_label: str | None
 
 
+@dataclass(frozen=True)
+class NewEvidence:
+    claim_id: str
+    page_number: int
+    excerpt_text: str
+    article_label: str | None
+
+
 class EvidenceRepo:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self._conn = conn
@@ -26,20 +37,64 @@ class EvidenceRepo:
         excerpt_text: str,
         article_label: str | None,
     ) -> EvidenceRow:
-        cur = self._conn.execute(
-            """
-            INSERT INTO evidence(
-              analysis_run_id, claim_id, document_version_id, page_number,
-              chunk_id, article_label, alin_label, char_start, char_end, bbox_json, excerpt_text
+        with id_block(self._conn, "evidence", 1) as evidence_id:
+            self._conn.execute(
+                """
+                INSERT INTO evidence(
+                  id, analysis_run_id, claim_id, document_version_id, page_number, chunk_id,
+                  article_label, alin_label, char_start, char_end, bbox_json, excerpt_text
+                )
+                VALUES(?, ?, ?, ?, ?, NULL, ?, NULL, NULL, NULL, NULL, ?)
+                """,
+                (
+                    evidence_id, analysis_run_id, claim_id, document_version_id, page_number,
+                    article_label, excerpt_text,
+                ),
             )
-            VALUES(?, ?, ?, ?, NULL, ?, NULL, NULL, NULL, NULL, ?)
-            """,
-            (analysis_run_id, claim_id, document_version_id, page_number, article_label, excerpt_text),
-        )
+        return self.get(evidence_id)
+
+    def create_many(
+        self, analysis_run_id: int, document_version_id: int, items: Sequence[NewEvidence]
+    ) -> list[EvidenceRow]:
+        """Insert a run's evidence in one transaction; rows are returned without a re-read."""
+
+        if not items:
+            return []
+        with id_block(self._conn, "evidence", len(items)) as first_id:
+            rows = [
+                EvidenceRow(
+                    id=first_id + i,
+                    analysis_run_id=analysis_run_id,
+                    claim_id=e.claim_id,
+                    document_version_id=document_version_id,
+                    page_number=e.page_number,
+                    excerpt_text=e.excerpt_text,
+                    article_label=e.article_label,
+                )
+                for i, e in enumerate(items)
+            ]
+            self._conn.executemany(
+                """
+                INSERT INTO evidence(
+                  id, analysis_run_id, claim_id, document_version_id, page_number,
+                  chunk_id, article_label, alin_label, char_start, char_end, bbox_json,
+                  excerpt_text
+                )
+                VALUES(?, ?, ?, ?, ?, NULL, ?, NULL, NULL, NULL, NULL, ?)
+                """,
+                [
+                    (
+                        r.id, r.analysis_run_id, r.claim_id, r.document_version_id,
+                        r.page_number, r.article_label, r.excerpt_text,
+                    )
+                    for r in rows
+                ],
+            )
+        return rows
+
+    def delete_for_run(self, analysis_run_id: int) -> None:
+        self._conn.execute("DELETE FROM evidence WHERE analysis_run_id = ?", (analysis_run_id,))
         self._conn.commit()
-        if cur.lastrowid is None:
-            raise RuntimeError("Failed to create evidence: missing lastrowid")
-        return self.get(int(cur.lastrowid))
 
     def get(self, evidence_id: int) -> EvidenceRow:
         row = self._conn.execute("SELECT * FROM evidence WHERE id = ?", (evidence_id,)).fetchone()
@@ -1,89 +1,188 @@
+# EXCEPTION: >150 LOC because claim, lease and outcome updates form one job state machine.
 import json
 import sqlite3
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from app.domain.enums import JobStatus
+from app.domain.enums import JobStatus, JobType
+
+DEFAULT_MAX_ATTEMPTS = 5
 
 
 @dataclass(frozen=True)
 class Job:
     id: int
-    type: str
+    type: JobType
     payload: dict[str, Any]
     status: JobStatus
     attempts: int
     scheduled_at: str
     locked_at: str | None
     last_error: str | None
+    locked_by: str | None
+    lease_expires_at: str | None
+    max_attempts: int
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def utc_in_iso(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
 class JobRepo:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self._conn = conn
 
-    def enqueue(self, job_type: str, payload: dict[str, Any]) -> int:
+    def enqueue(
+        self, job_type: JobType, payload: dict[str, Any], max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> int:
         cur = self._conn.execute(
             """
-            INSERT INTO jobs(type, payload_json, status, attempts, scheduled_at, locked_at, last_error)
-            VALUES(?, ?, ?, 0, ?, NULL, NULL)
+            INSERT INTO jobs(
+              type, payload_json, status, attempts, scheduled_at, locked_at, last_error,
+              max_attempts
+            )
+            VALUES(?, ?, ?, 0, ?, NULL, NULL, ?)
             """,
-            (job_type, json.dumps(payload), JobStatus.queued.value, utc_now_iso()),
+            (
+                job_type.value,
+                json.dumps(payload),
+                JobStatus.queued.value,
+                utc_now_iso(),
+                max_attempts,
+            ),
         )
         self._conn.commit()
         if cur.lastrowid is None:
             raise RuntimeError("Failed to enqueue job: missing lastrowid")
         return int(cur.lastrowid)
 
-    def fetch_next(self) -> Job | None:
+    def claim(self, worker_id: str, lease_seconds: float) -> Job | None:
+        """Atomically take the next due job: select + lock in one UPDATE ... RETURNING.
+
+        The attempt is counted at claim time, so a worker that dies mid-job still uses
+        one of the job's attempts once its lease expires.
+        """
+
+        now = utc_now_iso()
+        queued = JobStatus.queued.value
         row = self._conn.execute(
             """
-            SELECT * FROM jobs
-            WHERE status = ? AND (locked_at IS NULL)
-            ORDER BY scheduled_at ASC, id ASC
-            LIMIT 1
+            UPDATE jobs
+            SET status = ?, locked_at = ?, locked_by = ?, lease_expires_at = ?,
+                attempts = attempts + 1
+            WHERE id = (
+              SELECT id FROM jobs
+              WHERE status = ? AND scheduled_at <= ?
+              ORDER BY scheduled_at ASC, id ASC
+              LIMIT 1
+            )
+            RETURNING *
             """,
-            (JobStatus.queued.value,),
+            (JobStatus.running.value, now, worker_id, utc_in_iso(lease_seconds), queued, now),
         ).fetchone()
-        if row is None:
-            return None
-        return Job(
-            id=int(row["id"]),
-            type=str(row["type"]),
-            payload=json.loads(row["payload_json"]),
-            status=JobStatus(str(row["status"])),
-            attempts=int(row["attempts"]),
-            scheduled_at=str(row["scheduled_at"]),
-            locked_at=row["locked_at"],
-            last_error=row["last_error"],
+        self._conn.commit()
+        return _job_from_row(row) if row is not None else None
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease. False means the lease was lost (expired and requeued)."""
+
+        cur = self._conn.execute(
+            """
+            UPDATE jobs SET lease_expires_at = ?
+            WHERE id = ? AND status = ? AND locked_by = ?
+            """,
+            (utc_in_iso(lease_seconds), job_id, JobStatus.running.value, worker_id),
         )
+        self._conn.commit()
+        return cur.rowcount == 1
+
+    def requeue_expired(self) -> int:
+        """Return `running` jobs whose lease expired to the queue (or fail them if spent)."""
 
-    def lock(self, job_id: int) -> None:
-        self._conn.execute(
-            "UPDATE jobs SET status = ?, locked_at = ? WHERE id = ?",
-            (JobStatus.running.value, utc_now_iso(), job_id),
+        cur = self._conn.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,
+                last_error = 'lease_expired', locked_at = NULL, locked_by = NULL,
+                lease_expires_at = NULL
+            WHERE status = ? AND lease_expires_at < ?
+            """,
+            (
+                JobStatus.queued.value,
+                JobStatus.failed.value,
+                JobStatus.running.value,
+                utc_now_iso(),
+            ),
         )
         self._conn.commit()
+        return int(cur.rowcount)
 
-    def mark_succeeded(self, job_id: int) -> None:
-        self._conn.execute(
-            "UPDATE jobs SET status = ? WHERE id = ?",
-            (JobStatus.succeeded.value, job_id),
+    def get(self, job_id: int) -> Job:
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Job not found: {job_id}")
+        return _job_from_row(row)
+
+    def mark_succeeded(self, job_id: int, worker_id: str) -> bool:
+        """False means the lease was lost: the job belongs to another worker now."""
+
+        cur = self._conn.execute(
+            """
+            UPDATE jobs SET status = ?, locked_by = NULL, lease_expires_at = NULL
+            WHERE id = ? AND status = ? AND locked_by = ?
+            """,
+            (JobStatus.succeeded.value, job_id, JobStatus.running.value, worker_id),
         )
         self._conn.commit()
+        return cur.rowcount == 1
+
+    def mark_failed(self, job_id: int, worker_id: str, error: str, retry_at: str | None) -> bool:
+        """Requeue for `retry_at` while attempts remain, else fail (`None`: fail now).
+
+        Like `mark_succeeded`, only the worker holding the lease can record the outcome.
+        """
 
-    def mark_failed(self, job_id: int, error: str) -> None:
-        self._conn.execute(
+        retry = retry_at is not None
+        cur = self._conn.execute(
             """
             UPDATE jobs
-            SET status = ?, attempts = attempts + 1, last_error = ?
-            WHERE id = ?
+            SET status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END,
+                scheduled_at = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE scheduled_at END,
+                last_error = ?, locked_at = NULL, locked_by = NULL, lease_expires_at = NULL
+            WHERE id = ? AND status = ? AND locked_by = ?
             """,
-            (JobStatus.failed.value, error, job_id),
+            (
+                retry,
+                JobStatus.queued.value,
+                JobStatus.failed.value,
+                retry,
+                retry_at,
+                error,
+                job_id,
+                JobStatus.running.value,
+                worker_id,
+            ),
         )
         self._conn.commit()
+        return cur.rowcount == 1
+
+
+def _job_from_row(row: sqlite3.Row) -> Job:
+    return Job(
+        id=int(row["id"]),
+        type=JobType(str(row["type"])),
+        payload=json.loads(row["payload_json"]),
+        status=JobStatus(str(row["status"])),
+        attempts=int(row["attempts"]),
+        scheduled_at=str(row["scheduled_at"]),
+        locked_at=row["locked_at"],
+        last_error=row["last_error"],
+        locked_by=row["locked_by"],
+        lease_expires_at=row["lease_expires_at"],
+        max_attempts=int(row["max_attempts"]),
+    )
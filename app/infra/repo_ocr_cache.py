@@ -0,0 +1,61 @@
+import json
+import sqlite3
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from app.infra.ocr import OcrResult, OcrWord
+
+
+@dataclass(frozen=True)
+class OcrCacheKey:
+    image_sha256: str
+    lang: str
+    engine_version: str
+    settings_key: str
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class OcrCacheRepo:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def get(self, key: OcrCacheKey) -> OcrResult | None:
+        row = self._conn.execute(
+            """
+            SELECT text, confidence, words_json FROM ocr_cache
+            WHERE image_sha256 = ? AND lang = ? AND engine_version = ? AND settings_key = ?
+            """,
+            (key.image_sha256, key.lang, key.engine_version, key.settings_key),
+        ).fetchone()
+        if row is None:
+            return None
+        return OcrResult(
+            text=str(row["text"]),
+            confidence=row["confidence"],
+            words=[OcrWord(**w) for w in json.loads(row["words_json"])],
+        )
+
+    def put(self, key: OcrCacheKey, result: OcrResult) -> None:
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO ocr_cache(
+              image_sha256, lang, engine_version, settings_key,
+              text, confidence, words_json, created_at
+            )
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key.image_sha256,
+                key.lang,
+                key.engine_version,
+                key.settings_key,
+                result.text,
+                result.confidence,
+                json.dumps([asdict(w) for w in result.words], ensure_ascii=False),
+                utc_now_iso(),
+            ),
+        )
+        self._conn.commit()
@@ -0,0 +1,60 @@
+import sqlite3
+
+from app.infra.ocr import OcrWord
+from app.infra.ocr_words import pack_words, unpack_words
+
+
+class PageWordsRepo:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def put_with_text(
+        self, page_id: int, words: list[OcrWord], ocr_text: str, quality_level: str | None
+    ) -> None:
+        """Page OCR text and its words in one transaction.
+
+        A page with OCR text counts as done, so it must never be left without words.
+        """
+
+        text, boxes, confs = pack_words(words)
+        with self._conn:
+            self._conn.execute(
+                "UPDATE pages SET ocr_text = ?, quality_level = ? WHERE id = ?",
+                (ocr_text, quality_level, page_id),
+            )
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO page_ocr_words(
+                  page_id, word_count, words_text, boxes, confidences
+                )
+                VALUES(?, ?, ?, ?, ?)
+                """,
+                (page_id, len(words), text, boxes, confs),
+            )
+
+    def get(self, page_id: int) -> list[OcrWord] | None:
+        row = self._conn.execute(
+            "SELECT words_text, boxes, confidences FROM page_ocr_words WHERE page_id = ?",
+            (page_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return unpack_words(str(row["words_text"]), bytes(row["boxes"]), bytes(row["confidences"]))
+
+    def list_for_version(self, document_version_id: int) -> dict[int, list[OcrWord]]:
+        """Words keyed by page number (only pages that were OCR'd)."""
+
+        rows = self._conn.execute(
+            """
+            SELECT p.page_number, w.words_text, w.boxes, w.confidences
+            FROM page_ocr_words w JOIN pages p ON p.id = w.page_id
+            WHERE p.document_version_id = ?
+            """,
+            (document_version_id,),
+        ).fetchall()
+        return {
+            int(r["page_number"]): unpack_words(
+                str(r["words_text"]), bytes(r["boxes"]), bytes(r["confidences"])
+            )
+            for r in rows
+        }
@@ -12,6 +12,7 @@ class Page:
     quality_level: str | None
     has_handwriting: bool
     image_path: str | None
+    ocr_regions_json: str | None
 
 
 class PageRepo:
@@ -27,19 +28,26 @@ class PageRepo:
         quality_level: str | None,
         has_handwriting: bool,
         image_path: str | None,
+        ocr_regions_json: str | None = None,
     ) -> None:
+        """Insert or update a page; `ocr_text=None` keeps stored OCR text (and its level)."""
+
         self._conn.execute(
             """
             INSERT INTO pages(
-              document_version_id, page_number, text, ocr_text, quality_level, has_handwriting, image_path
+              document_version_id, page_number, text, ocr_text, quality_level, has_handwriting,
+              image_path, ocr_regions_json
             )
-            VALUES(?, ?, ?, ?, ?, ?, ?)
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(document_version_id, page_number) DO UPDATE SET
               text=excluded.text,
-              ocr_text=excluded.ocr_text,
-              quality_level=excluded.quality_level,
+              ocr_text=COALESCE(excluded.ocr_text, pages.ocr_text),
+              quality_level=CASE
+                WHEN excluded.ocr_text IS NULL AND pages.ocr_text IS NOT NULL
+                THEN pages.quality_level ELSE excluded.quality_level END,
               has_handwriting=excluded.has_handwriting,
-              image_path=excluded.image_path
+              image_path=excluded.image_path,
+              ocr_regions_json=excluded.ocr_regions_json
             """,
             (
                 document_version_id,
@@ -49,25 +57,108 @@ class PageRepo:
                 quality_level,
                 1 if has_handwriting else 0,
                 image_path,
+                ocr_regions_json,
             ),
         )
         self._conn.commit()
 
+    def copy_for_version(self, source_version_id: int, target_version_id: int) -> int:
+        """Duplicate page rows (text, OCR, image paths, OCR words) to another version in SQL.
+
+        Rows the target already has are replaced in the same transaction, so a retried
+        job whose earlier attempt copied them before failing can copy again.
+        """
+
+        with self._conn:
+            self._conn.execute(
+                """
+                DELETE FROM page_ocr_words
+                WHERE page_id IN (SELECT id FROM pages WHERE document_version_id = ?)
+                """,
+                (target_version_id,),
+            )
+            self._conn.execute(
+                "DELETE FROM pages WHERE document_version_id = ?", (target_version_id,)
+            )
+            cur = self._conn.execute(
+                """
+                INSERT INTO pages(
+                  document_version_id, page_number, text, ocr_text, quality_level,
+                  has_handwriting, image_path, ocr_regions_json
+                )
+                SELECT ?, page_number, text, ocr_text, quality_level, has_handwriting,
+                  image_path, ocr_regions_json
+                FROM pages WHERE document_version_id = ?
+                """,
+                (target_version_id, source_version_id),
+            )
+            copied = int(cur.rowcount)
+            self._conn.execute(
+                """
+                INSERT INTO page_ocr_words(page_id, word_count, words_text, boxes, confidences)
+                SELECT dst.id, w.word_count, w.words_text, w.boxes, w.confidences
+                FROM page_ocr_words w
+                JOIN pages src ON src.id = w.page_id AND src.document_version_id = ?
+                JOIN pages dst
+                  ON dst.page_number = src.page_number AND dst.document_version_id = ?
+                """,
+                (source_version_id, target_version_id),
+            )
+        return copied
+
+    def get(self, document_version_id: int, page_number: int) -> Page:
+        row = self._conn.execute(
+            "SELECT * FROM pages WHERE document_version_id = ? AND page_number = ?",
+            (document_version_id, page_number),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Page not found: {document_version_id}/{page_number}")
+        return _page_from_row(row)
+
+    def set_ocr_text(self, page_id: int, ocr_text: str, quality_level: str | None) -> None:
+        self._conn.execute(
+            "UPDATE pages SET ocr_text = ?, quality_level = ? WHERE id = ?",
+            (ocr_text, quality_level, page_id),
+        )
+        self._conn.commit()
+
+    def set_image_path(self, page_id: int, image_path: str) -> None:
+        self._conn.execute("UPDATE pages SET image_path = ? WHERE id = ?", (image_path, page_id))
+        self._conn.commit()
+
+    def count_for_version(self, document_version_id: int) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS n FROM pages WHERE document_version_id = ?", (document_version_id,)
+        ).fetchone()
+        return int(row["n"])
+
+    def count_ocr_for_version(self, document_version_id: int) -> int:
+        row = self._conn.execute(
+            """
+            SELECT COUNT(*) AS n FROM pages
+            WHERE document_version_id = ? AND TRIM(COALESCE(ocr_text, '')) != ''
+            """,
+            (document_version_id,),
+        ).fetchone()
+        return int(row["n"])
+
     def list_for_version(self, document_version_id: int) -> list[Page]:
         rows = self._conn.execute(
             "SELECT * FROM pages WHERE document_version_id = ? ORDER BY page_number ASC",
             (document_version_id,),
         ).fetchall()
-        return [
-            Page(
-                id=int(r["id"]),
-                document_version_id=int(r["document_version_id"]),
-                page_number=int(r["page_number"]),
-                text=r["text"],
-                ocr_text=r["ocr_text"],
-                quality_level=r["quality_level"],
-                has_handwriting=bool(r["has_handwriting"]),
-                image_path=r["image_path"],
-            )
-            for r in rows
-        ]
+        return [_page_from_row(r) for r in rows]
+
+
+def _page_from_row(row: sqlite3.Row) -> Page:
+    return Page(
+        id=int(row["id"]),
+        document_version_id=int(row["document_version_id"]),
+        page_number=int(row["page_number"]),
+        text=row["text"],
+        ocr_text=row["ocr_text"],
+        quality_level=row["quality_level"],
+        has_handwriting=bool(row["has_handwriting"]),
+        image_path=row["image_path"],
+        ocr_regions_json=row["ocr_regions_json"],
+    )
@@ -1,8 +1,13 @@
+# EXCEPTION: >150 LOC because runs and their outputs are one aggregate (single and batched writes).
+import json
 import sqlite3
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from app.domain.enums import OutputType, RunStatus
+from app.domain.enums import JobStatus, JobType, OutputType, RunStatus
+from app.infra.batch_writes import id_block
+from app.infra.repo_jobs import DEFAULT_MAX_ATTEMPTS
 
 
 @dataclass(frozen=True)
@@ -15,6 +20,8 @@ class AnalysisRun:
     started_at: str | None
     finished_at: str | None
     quality_summary_json: str | None
+    document_version_id: int | None = None
+    job_id: int | None = None
 
 
 @dataclass(frozen=True)
@@ -27,6 +34,13 @@ class Output:
     created_at: str
 
 
+@dataclass(frozen=True)
+class NewOutput:
+    output_type: OutputType
+    content_json: str | None
+    content_text: str | None = None
+
+
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -35,41 +49,108 @@ class RunRepo:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self._conn = conn
 
-    def create(self, bill_id: int, input_fingerprint: str, pipeline_version: str) -> AnalysisRun:
-        cur = self._conn.execute(
-            """
-            INSERT INTO analysis_runs(
-              bill_id, input_fingerprint, pipeline_version, status,
-              started_at, finished_at, quality_summary_json
+    def create_in_flight(
+        self,
+        bill_id: int,
+        document_version_id: int,
+        input_fingerprint: str,
+        pipeline_version: str,
+        job_type: JobType,
+    ) -> AnalysisRun | None:
+        """Create a queued run and its job, or return None if a run is already in flight.
+
+        `idx_analysis_runs_in_flight` makes this a cross-process single-flight claim. The
+        run, its job and `job_id` are committed together, so an in-flight run that other
+        requests attach to always has its job.
+        """
+
+        now = utc_now_iso()
+        with self._conn:
+            row = self._conn.execute(
+                """
+                INSERT INTO analysis_runs(
+                  bill_id, input_fingerprint, pipeline_version, status,
+                  started_at, finished_at, quality_summary_json, document_version_id
+                )
+                VALUES(?, ?, ?, ?, NULL, NULL, NULL, ?)
+                ON CONFLICT DO NOTHING
+                RETURNING id
+                """,
+                (
+                    bill_id,
+                    input_fingerprint,
+                    pipeline_version,
+                    RunStatus.queued.value,
+                    document_version_id,
+                ),
+            ).fetchone()
+            if row is None:
+                return None
+            run_id = int(row["id"])
+            payload = {"analysis_run_id": run_id, "document_version_id": document_version_id}
+            job = self._conn.execute(
+                """
+                INSERT INTO jobs(type, payload_json, status, attempts, scheduled_at,
+                                 max_attempts)
+                VALUES(?, ?, ?, 0, ?, ?) RETURNING id
+                """,
+                (
+                    job_type.value,
+                    json.dumps(payload),
+                    JobStatus.queued.value,
+                    now,
+                    DEFAULT_MAX_ATTEMPTS,
+                ),
+            ).fetchone()
+            self._conn.execute(
+                "UPDATE analysis_runs SET job_id = ? WHERE id = ?", (int(job["id"]), run_id)
             )
-            VALUES(?, ?, ?, ?, NULL, NULL, NULL)
+        return self.get(run_id)
+
+    def find_in_flight(self, document_version_id: int) -> AnalysisRun | None:
+        row = self._conn.execute(
+            """
+            SELECT * FROM analysis_runs
+            WHERE document_version_id = ? AND status IN (?, ?)
             """,
-            (bill_id, input_fingerprint, pipeline_version, RunStatus.queued.value),
-        )
-        self._conn.commit()
-        if cur.lastrowid is None:
-            raise RuntimeError("Failed to create analysis run: missing lastrowid")
-        return self.get(int(cur.lastrowid))
+            (document_version_id, RunStatus.queued.value, RunStatus.running.value),
+        ).fetchone()
+        return _run_from_row(row) if row is not None else None
 
     def get(self, run_id: int) -> AnalysisRun:
         row = self._conn.execute("SELECT * FROM analysis_runs WHERE id = ?", (run_id,)).fetchone()
         if row is None:
             raise KeyError(f"Analysis run not found: {run_id}")
-        return AnalysisRun(
-            id=int(row["id"]),
-            bill_id=int(row["bill_id"]),
-            input_fingerprint=str(row["input_fingerprint"]),
-            pipeline_version=str(row["pipeline_version"]),
-            status=RunStatus(str(row["status"])),
-            started_at=row["started_at"],
-            finished_at=row["finished_at"],
-            quality_summary_json=row["quality_summary_json"],
+        return _run_from_row(row)
+
+    def find_latest(
+        self, input_fingerprint: str, pipeline_version: str, status: RunStatus
+    ) -> AnalysisRun | None:
+        row = self._conn.execute(
+            """
+            SELECT * FROM analysis_runs
+            WHERE input_fingerprint = ? AND pipeline_version = ? AND status = ?
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (input_fingerprint, pipeline_version, status.value),
+        ).fetchone()
+        return _run_from_row(row) if row is not None else None
+
+    def mark_running(self, run_id: int) -> bool:
+        """False if another run for the same document version went in flight meanwhile."""
+
+        cur = self._conn.execute(
+            "UPDATE OR IGNORE analysis_runs SET status = ?, started_at = ? WHERE id = ?",
+            (RunStatus.running.value, utc_now_iso(), run_id),
         )
+        self._conn.commit()
+        return cur.rowcount == 1
 
-    def mark_running(self, run_id: int) -> None:
+    def set_input_fingerprint(self, run_id: int, input_fingerprint: str) -> None:
         self._conn.execute(
-            "UPDATE analysis_runs SET status = ?, started_at = ? WHERE id = ?",
-            (RunStatus.running.value, utc_now_iso(), run_id),
+            "UPDATE analysis_runs SET input_fingerprint = ? WHERE id = ?",
+            (input_fingerprint, run_id),
         )
         self._conn.commit()
 
@@ -85,6 +166,21 @@ class RunRepo:
         self._conn.commit()
 
 
+def _run_from_row(row: sqlite3.Row) -> AnalysisRun:
+    return AnalysisRun(
+        id=int(row["id"]),
+        bill_id=int(row["bill_id"]),
+        input_fingerprint=str(row["input_fingerprint"]),
+        pipeline_version=str(row["pipeline_version"]),
+        status=RunStatus(str(row["status"])),
+        started_at=row["started_at"],
+        finished_at=row["finished_at"],
+        quality_summary_json=row["quality_summary_json"],
+        document_version_id=row["document_version_id"],
+        job_id=row["job_id"],
+    )
+
+
 class OutputRepo:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self._conn = conn
@@ -97,17 +193,52 @@ class OutputRepo:
         content_text: str | None,
     ) -> Output:
         now = utc_now_iso()
-        cur = self._conn.execute(
-            """
-            INSERT INTO outputs(analysis_run_id, output_type, content_json, content_text, created_at)
-            VALUES(?, ?, ?, ?, ?)
-            """,
-            (run_id, output_type.value, content_json, content_text, now),
-        )
-        self._conn.commit()
-        if cur.lastrowid is None:
-            raise RuntimeError("Failed to create output: missing lastrowid")
-        return self.get(int(cur.lastrowid))
+        with id_block(self._conn, "outputs", 1) as output_id:
+            self._conn.execute(
+                """
+                INSERT INTO outputs(
+                  id, analysis_run_id, output_type, content_json, content_text, created_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?)
+                """,
+                (output_id, run_id, output_type.value, content_json, content_text, now),
+            )
+        return self.get(output_id)
+
+    def create_many(self, run_id: int, items: Sequence[NewOutput]) -> list[Output]:
+        """Insert a run's artifacts in one transaction; rows are returned without a re-read."""
+
+        if not items:
+            return []
+        now = utc_now_iso()
+        with id_block(self._conn, "outputs", len(items)) as first_id:
+            rows = [
+                Output(
+                    id=first_id + i,
+                    analysis_run_id=run_id,
+                    output_type=o.output_type,
+                    content_json=o.content_json,
+                    content_text=o.content_text,
+                    created_at=now,
+                )
+                for i, o in enumerate(items)
+            ]
+            self._conn.executemany(
+                """
+                INSERT INTO outputs(
+                  id, analysis_run_id, output_type, content_json, content_text, created_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        r.id, r.analysis_run_id, r.output_type.value, r.content_json,
+                        r.content_text, r.created_at,
+                    )
+                    for r in rows
+                ],
+            )
+        return rows
 
     def get(self, output_id: int) -> Output:
         row = self._conn.execute("SELECT * FROM outputs WHERE id = ?", (output_id,)).fetchone()
@@ -122,6 +253,10 @@ class OutputRepo:
             created_at=str(row["created_at"]),
         )
 
+    def delete_for_run(self, run_id: int) -> None:
+        self._conn.execute("DELETE FROM outputs WHERE analysis_run_id = ?", (run_id,))
+        self._conn.commit()
+
     def list_for_run(self, run_id: int) -> list[Output]:
         rows = self._conn.execute(
             "SELECT * FROM outputs WHERE analysis_run_id = ? ORDER BY id ASC", (run_id,)
@@ -0,0 +1,32 @@
+import sqlite3
+from datetime import datetime, timezone
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class StageArtifactRepo:
+    """Content-addressed cache of analysis stage outputs (see `analysis/stage_dag.py`)."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def get(self, stage: str, input_hash: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT content_json FROM stage_artifacts WHERE stage = ? AND input_hash = ?",
+            (stage, input_hash),
+        ).fetchone()
+        return str(row["content_json"]) if row is not None else None
+
+    def put(self, stage: str, input_hash: str, stage_version: str, content_json: str) -> None:
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO stage_artifacts(
+              stage, input_hash, stage_version, content_json, created_at
+            )
+            VALUES(?, ?, ?, ?, ?)
+            """,
+            (stage, input_hash, stage_version, content_json, utc_now_iso()),
+        )
+        self._conn.commit()
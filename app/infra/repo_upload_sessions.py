@@ -0,0 +1,159 @@
+import sqlite3
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from app.domain.enums import JobType, UploadStatus
+from app.infra.repo_bulk_ingest import BulkIngestRepo, BulkItem
+
+
+@dataclass(frozen=True)
+class UploadSession:
+    id: str
+    title: str
+    filename: str
+    total_size: int
+    received_size: int
+    status: UploadStatus
+    sha256: str | None
+    document_version_id: int | None
+    job_id: int | None
+    created_at: str
+    updated_at: str
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def utc_in_iso(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+class UploadSessionRepo:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def create(self, title: str, filename: str, total_size: int) -> UploadSession:
+        now = utc_now_iso()
+        upload_id = uuid.uuid4().hex
+        self._conn.execute(
+            """
+            INSERT INTO upload_sessions(
+              id, title, filename, total_size, received_size, status, sha256, created_at, updated_at
+            )
+            VALUES(?, ?, ?, ?, 0, ?, NULL, ?, ?)
+            """,
+            (upload_id, title, filename, total_size, UploadStatus.open.value, now, now),
+        )
+        self._conn.commit()
+        return self.get(upload_id)
+
+    def get(self, upload_id: str) -> UploadSession:
+        row = self._conn.execute(
+            "SELECT * FROM upload_sessions WHERE id = ?", (upload_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Upload session not found: {upload_id}")
+        return UploadSession(
+            id=str(row["id"]),
+            title=str(row["title"]),
+            filename=str(row["filename"]),
+            total_size=int(row["total_size"]),
+            received_size=int(row["received_size"]),
+            status=UploadStatus(str(row["status"])),
+            sha256=row["sha256"],
+            document_version_id=row["document_version_id"],
+            job_id=row["job_id"],
+            created_at=str(row["created_at"]),
+            updated_at=str(row["updated_at"]),
+        )
+
+    def claim_put(self, upload_id: str, offset: int, claim: str, lease_seconds: float) -> bool:
+        """Take the session's single PUT slot at `offset`.
+
+        False while another PUT holds an unexpired claim or the offset has moved.
+        """
+
+        now = utc_now_iso()
+        cur = self._conn.execute(
+            """
+            UPDATE upload_sessions SET put_claim = ?, put_claim_expires_at = ?, updated_at = ?
+            WHERE id = ? AND received_size = ? AND status = ?
+              AND (put_claim IS NULL OR put_claim_expires_at < ?)
+            """,
+            (
+                claim,
+                utc_in_iso(lease_seconds),
+                now,
+                upload_id,
+                offset,
+                UploadStatus.open.value,
+                now,
+            ),
+        )
+        self._conn.commit()
+        return cur.rowcount == 1
+
+    def advance(self, upload_id: str, claim: str, to_offset: int) -> bool:
+        """Move the received offset and release the claim; False if the claim was lost."""
+
+        cur = self._conn.execute(
+            """
+            UPDATE upload_sessions
+            SET received_size = ?, put_claim = NULL, put_claim_expires_at = NULL, updated_at = ?
+            WHERE id = ? AND put_claim = ? AND status = ?
+            """,
+            (to_offset, utc_now_iso(), upload_id, claim, UploadStatus.open.value),
+        )
+        self._conn.commit()
+        return cur.rowcount == 1
+
+    def release_put(self, upload_id: str, claim: str) -> None:
+        self._conn.execute(
+            """
+            UPDATE upload_sessions SET put_claim = NULL, put_claim_expires_at = NULL
+            WHERE id = ? AND put_claim = ?
+            """,
+            (upload_id, claim),
+        )
+        self._conn.commit()
+
+    def set_sha256(self, upload_id: str, sha256: str) -> None:
+        """Record the digest before the part file is moved into the blob store."""
+
+        self._conn.execute(
+            "UPDATE upload_sessions SET sha256 = ?, updated_at = ? WHERE id = ?",
+            (sha256, utc_now_iso(), upload_id),
+        )
+        self._conn.commit()
+
+    def finalize(
+        self, upload_id: str, claim: str, item: BulkItem, job_type: JobType
+    ) -> UploadSession | None:
+        """Register the uploaded file and mark the session finalized, in one transaction.
+
+        None (nothing written) unless `claim` still holds the open session; a finalize
+        retried after a crash therefore finds either nothing or the finished session.
+        """
+
+        now = utc_now_iso()
+        with self._conn:
+            cur = self._conn.execute(
+                """
+                UPDATE upload_sessions
+                SET status = ?, put_claim = NULL, put_claim_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND put_claim = ? AND status = ?
+                """,
+                (UploadStatus.finalized.value, now, upload_id, claim, UploadStatus.open.value),
+            )
+            if cur.rowcount != 1:
+                return None
+            reg = BulkIngestRepo(self._conn).insert_registration(
+                item, "manual", job_type, "resumable_upload", now
+            )
+            self._conn.execute(
+                "UPDATE upload_sessions SET document_version_id = ?, job_id = ? WHERE id = ?",
+                (reg.document_version_id, reg.job_id, upload_id),
+            )
+        return self.get(upload_id)
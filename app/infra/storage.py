@@ -1,6 +1,33 @@
+# EXCEPTION: >150 LOC because layout, shared-backend mirroring and GC listing share one root.
 import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
+
+from app.infra.blob_backends import BlobBackend, BlobObject, FsBackend
+
+_CHUNK_SIZE = 1024 * 1024
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_sha256(value: str) -> bool:
+    """Lower-case hex sha256; anything else must never reach a blob path."""
+
+    return _SHA256_RE.match(value) is not None
+
+
+def sha256_file(path: Path, chunk_size: int = _CHUNK_SIZE) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
 
 
 @dataclass(frozen=True)
@@ -11,16 +38,170 @@ class BlobRef:
 
 
 class BlobStore:
-    def __init__(self, root: Path) -> None:
+    """Content-addressed originals and page renders under `root`.
+
+    With a shared `remote` backend (S3 or a network mount), `root` is this node's working
+    copy: new files are published to the backend and missing ones are fetched on first
+    use (`materialize`), so API and worker nodes need no shared local disk.
+    """
+
+    def __init__(self, root: Path, remote: BlobBackend | None = None) -> None:
         self._root = root
+        self._remote = remote
 
     def put_bytes(self, data: bytes, ext: str) -> BlobRef:
-        sha = hashlib.sha256(data).hexdigest()
-        base = self._root / "blobs" / sha
-        base.mkdir(parents=True, exist_ok=True)
+        return self.put_stream(io.BytesIO(data), ext=ext)
+
+    def put_stream(self, stream: BinaryIO, ext: str, chunk_size: int = _CHUNK_SIZE) -> BlobRef:
+        """Copy `stream` into the store, hashing as it goes.
+
+        Peak memory is bounded by `chunk_size`. Bytes land in a temp file under the
+        blob root and are renamed into place atomically, so readers never observe a
+        partially written original.
+        """
+
+        blobs = self._root / "blobs"
+        blobs.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=blobs, suffix=".part")
+        tmp = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := stream.read(chunk_size):
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            if size == 0:
+                raise ValueError("empty_stream")
+            return self.adopt_file(tmp, hasher.hexdigest(), ext)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def adopt_file(self, path: Path, sha: str, ext: str) -> BlobRef:
+        """Move a fully written file (same filesystem) into place as blob `sha`.
+
+        Content-addressed: if the blob already exists, `path` is simply discarded and the
+        original's mtime refreshed, so GC's grace period covers the new reference.
+        """
+
+        ref = self.ref(sha, ext)
+        if ref.original_path.exists():
+            path.unlink()
+            os.utime(ref.original_path)
+        else:
+            os.replace(path, ref.original_path)
+        key = self.key_for(ref.original_path)
+        if self._remote is not None and self._remote.stat(key) is None:
+            self._remote.upload_file(key, ref.original_path)
+        return ref
+
+    def publish(self, paths: Iterable[Path]) -> None:
+        """Copy freshly written renders to the shared backend (no-op without one)."""
+
+        if self._remote is not None:
+            for p in paths:
+                self._remote.upload_file(self.key_for(p), p)
+
+    def materialize(self, path: Path) -> bool:
+        """Read-through cache: fetch `path` from the shared backend unless already local."""
+
+        if path.is_file():
+            return True
+        if self._remote is None:
+            return False
+        key = self.key_for(path)
+        if self._remote.stat(key) is None:
+            return False
+        self._remote.download_file(key, path)
+        return True
+
+    def upload_part_path(self, upload_id: str) -> Path:
+        """Scratch file for a resumable upload session, under the blob root."""
+
+        uploads = self._root / "uploads"
+        uploads.mkdir(parents=True, exist_ok=True)
+        return uploads / f"{upload_id}.part"
+
+    def find(self, sha: str, ext: str) -> BlobRef | None:
+        """The blob for `sha` if its original exists; read-only (creates no directories)."""
+
+        if self.original_size(sha, ext) is None:
+            return None
+        base = self.blob_dir(sha)
         original = base / f"original{ext}"
-        if not original.exists():
-            original.write_bytes(data)
+        return BlobRef(sha256=sha, original_path=original, pages_dir=base / "pages")
+
+    def original_size(self, sha: str, ext: str) -> int | None:
+        original = self.blob_dir(sha) / f"original{ext}"
+        if original.is_file():
+            return original.stat().st_size
+        if self._remote is None:
+            return None
+        obj = self._remote.stat(self.key_for(original))
+        return obj.size if obj is not None else None
+
+    def ref(self, sha: str, ext: str) -> BlobRef:
+        """Locate the blob for `sha` (does not check that the original exists)."""
+
+        base = self.blob_dir(sha)
         pages_dir = base / "pages"
         pages_dir.mkdir(parents=True, exist_ok=True)
-        return BlobRef(sha256=sha, original_path=original, pages_dir=pages_dir)
+        return BlobRef(sha256=sha, original_path=base / f"original{ext}", pages_dir=pages_dir)
+
+    def blob_dir(self, sha: str) -> Path:
+        """`blobs/ab/cd/<sha>`: two shard levels keep every directory listing small."""
+
+        return self._root / "blobs" / sha[:2] / sha[2:4] / sha
+
+    def legacy_blob_dir(self, sha: str) -> Path:
+        """Pre-sharding location `blobs/<sha>` (see `app.blob_admin migrate`)."""
+
+        return self._root / "blobs" / sha
+
+    def key_for(self, path: Path) -> str:
+        """Backend key (root-relative, `/`-separated) of a path under the blob root."""
+
+        try:
+            rel = path.relative_to(self._root)
+        except ValueError:
+            rel = path.resolve().relative_to(self._root.resolve())
+        return rel.as_posix()
+
+    def iter_objects(self, prefix: str) -> Iterator[BlobObject]:
+        """Stored objects, from the shared backend when there is one (it is authoritative)."""
+
+        backend = self._remote if self._remote is not None else FsBackend(self._root)
+        return backend.iter_objects(prefix)
+
+    def key_mtime(self, key: str) -> float | None:
+        """Newest mtime of `key` here or on the shared backend; None if in neither."""
+
+        local = self._root / key
+        mtimes = [local.stat().st_mtime] if local.is_file() else []
+        if self._remote is not None and (obj := self._remote.stat(key)) is not None:
+            mtimes.append(obj.mtime)
+        return max(mtimes, default=None)
+
+    def delete_key(self, key: str) -> None:
+        (self._root / key).unlink(missing_ok=True)
+        if self._remote is not None:
+            self._remote.delete(key)
+
+    def drop_local_blob_dir(self, sha: str) -> None:
+        shutil.rmtree(self.blob_dir(sha), ignore_errors=True)
+
+    def iter_legacy_blob_dirs(self) -> Iterator[tuple[str, Path]]:
+        blobs = self._root / "blobs"
+        if blobs.is_dir():
+            for d in sorted(blobs.iterdir()):
+                if d.is_dir() and is_sha256(d.name):
+                    yield d.name, d
+
+    def iter_scratch_files(self) -> Iterator[tuple[str | None, Path]]:
+        """Temp files from `put_stream` (upload id None) and resumable-upload parts."""
+
+        for p in (self._root / "blobs").glob("*.part"):
+            yield None, p
+        for p in (self._root / "uploads").glob("*.part"):
+            yield p.stem, p
@@ -1,28 +1,57 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.config import load_config
 from app.features.analysis.api import router as analysis_router
+from app.features.blobs.api import router as blobs_router
 from app.features.documents.api import router as documents_router
 from app.features.ingest.api import router as ingest_router
+from app.features.jobs.api import router as jobs_router
 from app.features.knowledge.api import router as knowledge_router
 from app.features.knowledge.web import router as knowledge_web_router
 from app.features.ocr.api import router as ocr_router
+from app.features.pages.api import router as pages_router
+from app.features.pipeline.api import router as pipeline_router
 from app.features.runs.api import router as runs_router
+from app.features.uploads.api import router as uploads_router
+from app.features.uploads.hashing import UploadHashes
 from app.infra.db import DbConfig, connect, migrate
+from app.infra.ocr import probe_ocr_languages
+from app.infra.process_pool import SharedPool
 from app.web.health import router as health_router
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    app.state.ocr_pool.shutdown()
+
+
 def create_app() -> FastAPI:
     cfg = load_config()
     conn = connect(DbConfig(path=cfg.db_path))
     migrate(conn)
 
-    app = FastAPI(title="Civic Sustainability PoC", version="0.1.0")
+    app = FastAPI(title="Civic Sustainability PoC", version="0.1.0", lifespan=_lifespan)
     app.state.cfg = cfg
     app.state.db = conn
+    # Probe installed Tesseract languages once instead of failing per page at OCR time.
+    app.state.ocr_languages = probe_ocr_languages()
+    # Sync OCR requests queue for these `ocr_workers` processes instead of each starting
+    # a pool; the job worker process has its own (JobRuntime).
+    app.state.ocr_pool = SharedPool(cfg.ocr_workers)
+    # Running sha256 of resumable uploads, so finalize need not re-read the bytes.
+    app.state.upload_hashes = UploadHashes()
     app.include_router(health_router)
     app.include_router(ingest_router)
+    app.include_router(uploads_router)
+    app.include_router(blobs_router)
+    app.include_router(jobs_router)
     app.include_router(ocr_router)
+    app.include_router(pages_router)
+    app.include_router(pipeline_router)
     app.include_router(analysis_router)
     app.include_router(runs_router)
     app.include_router(documents_router)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 router = APIRouter()
 
 
 @router.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health(request: Request) -> dict[str, object]:
+    langs = request.app.state.ocr_languages
+    return {
+        "status": "ok",
+        "ocr": {"installed_languages": list(langs.installed), "selected_lang": langs.selected},
+    }
@@ -0,0 +1,30 @@
+"""Job worker entrypoint: `python -m app.worker` (run alongside the API, one or more hosts)."""
+
+import logging
+import signal
+
+from app.config import load_config
+from app.features.jobs.worker import JobRuntime
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.ocr import probe_ocr_languages
+
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    cfg = load_config()
+    conn = connect(DbConfig(path=cfg.db_path))
+    migrate(conn)
+    conn.close()
+    log.info("ocr languages selected=%s", probe_ocr_languages().selected)
+
+    runtime = JobRuntime(cfg)
+    # Finish in-flight jobs on SIGTERM/SIGINT; unfinished leases expire and are requeued.
+    signal.signal(signal.SIGTERM, lambda *_: runtime.stop())
+    signal.signal(signal.SIGINT, lambda *_: runtime.stop())
+    runtime.run()
+
+
+if __name__ == "__main__":
+    main()
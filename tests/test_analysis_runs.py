@@ -0,0 +1,225 @@
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import AppConfig
+from app.domain.enums import JobType
+from app.features.analysis.run_service import AnalysisRunService
+from app.features.analysis.stage_dag import run_dag
+from app.features.analysis.stages_v1 import STAGES_V1, AnalysisContext
+from app.features.jobs.worker import run_once
+from app.infra import db as db_mod
+from app.infra.db import DbConfig
+from app.infra.repo_chunks import ChunkRepo
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_jobs import JobRepo
+from app.infra.repo_pages import PageRepo
+from app.infra.repo_runs import RunRepo
+from app.infra.repo_stage_artifacts import StageArtifactRepo
+from app.main import create_app
+
+
+def _client(tmp_path: Path) -> TestClient:
+    app = create_app()
+    app.state.cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret")
+    app.state.db = db_mod.connect(DbConfig(path=app.state.cfg.db_path))
+    db_mod.migrate(app.state.db)
+    return TestClient(app)
+
+
+def _ingest(client: TestClient) -> int:
+    with Path("sample.pdf").open("rb") as f:
+        body = client.post(
+            "/bills/upload",
+            params={"title": "Analysed bill"},
+            files={"file": ("sample.pdf", f, "application/pdf")},
+        ).json()
+    app = client.app
+    assert run_once(app.state.db, app.state.cfg)
+    return int(body["bill_id"])
+
+
+def test_analysis_is_queued_and_runs_on_a_worker(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+
+    resp = client.post(f"/bills/{bill_id}/analysis")
+    assert resp.status_code == 202
+    body = resp.json()
+    run_id = body["analysis_run_id"]
+    assert body["status"] == "queued"
+    assert client.get(f"/bills/runs/{run_id}").json()["status"] == "queued"
+    assert client.get(f"/jobs/{body['job_id']}").json()["progress"]["run_status"] == "queued"
+
+    app = client.app
+    assert run_once(app.state.db, app.state.cfg)
+
+    run = client.get(f"/bills/runs/{run_id}").json()
+    assert run["status"] == "succeeded"
+    assert run["finished_at"] is not None
+    outputs = client.get(f"/bills/runs/{run_id}/outputs").json()["outputs"]
+    assert {"structure_tree_v1", "mechanisms_v1", "explainer_summary"} <= {
+        o["output_type"] for o in outputs
+    }
+    assert client.get(f"/jobs/{body['job_id']}").json()["status"] == "succeeded"
+
+
+def test_analysis_of_unknown_bill_is_404(tmp_path: Path) -> None:
+    assert _client(tmp_path).post("/bills/999/analysis").status_code == 404
+
+
+def test_rerun_reuses_cached_stage_outputs(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    app = client.app
+    service = AnalysisRunService(conn=app.state.db)
+
+    first = service.queue_run(bill_id=bill_id)
+    done = service.execute(
+        run_id=first["analysis_run_id"], document_version_id=first["document_version_id"]
+    )
+    assert done["stages_reused"] == []
+
+    second = service.queue_run(bill_id=bill_id, force=True)
+    again = service.execute(
+        run_id=second["analysis_run_id"], document_version_id=second["document_version_id"]
+    )
+    assert again["stages_executed"] == []
+    assert again["stages_reused"] == [s.name for s in STAGES_V1]
+
+    def outputs(run_id: int) -> dict[str, str]:
+        body = client.get(f"/bills/runs/{run_id}/outputs").json()["outputs"]
+        return {o["output_type"]: o["content_json"] for o in body}
+
+    assert outputs(first["analysis_run_id"]) == outputs(second["analysis_run_id"])
+
+
+def test_identical_request_returns_succeeded_run_unless_forced(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    app = client.app
+    first = client.post(f"/bills/{bill_id}/analysis").json()
+    assert first["reused"] is False
+    assert run_once(app.state.db, app.state.cfg)
+
+    again = client.post(f"/bills/{bill_id}/analysis")
+    assert again.status_code == 200
+    assert again.json()["analysis_run_id"] == first["analysis_run_id"]
+    assert again.json()["reused"] is True
+    assert again.json()["job_id"] is None
+
+    forced = client.post(f"/bills/{bill_id}/analysis", params={"force": "true"})
+    assert forced.status_code == 202
+    assert forced.json()["analysis_run_id"] != first["analysis_run_id"]
+    assert forced.json()["status"] == "queued"
+
+
+def test_changed_root_fingerprint_reruns_every_stage(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    conn = client.app.state.db
+    dv_id = AnalysisRunService(conn=conn).queue_run(bill_id=bill_id)["document_version_id"]
+    pages = PageRepo(conn).list_for_version(dv_id)
+    cache = StageArtifactRepo(conn)
+
+    run_dag(STAGES_V1, AnalysisContext(conn, dv_id, pages), "sha256:a", cache)
+    result = run_dag(STAGES_V1, AnalysisContext(conn, dv_id, pages), "sha256:b", cache)
+    assert result.reused == []
+
+
+def test_only_stages_downstream_of_a_change_rerun(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    conn = client.app.state.db
+    dv_id = AnalysisRunService(conn=conn).queue_run(bill_id=bill_id)["document_version_id"]
+    pages = PageRepo(conn).list_for_version(dv_id)
+    cache = StageArtifactRepo(conn)
+    run_dag(STAGES_V1, AnalysisContext(conn, dv_id, pages), "sha256:a", cache)
+
+    bumped = tuple(replace(s, version="v2") if s.name == "mechanisms" else s for s in STAGES_V1)
+    result = run_dag(bumped, AnalysisContext(conn, dv_id, pages), "sha256:a", cache)
+    # Its content did not change, so the stages reading it are reused as well.
+    assert result.executed == ["mechanisms"]
+    assert "segmentation" in result.reused and "explainer" in result.reused
+
+    # Chunk rows edited in place (same ids): the cached segmentation no longer matches.
+    conn.execute("UPDATE chunks SET text = 'edited' WHERE document_version_id = ?", (dv_id,))
+    conn.commit()
+    result = run_dag(bumped, AnalysisContext(conn, dv_id, pages), "sha256:a", cache)
+    assert result.executed[0] == "segmentation"
+    assert "edited" not in {c.text for c in ChunkRepo(conn).list_for_version(dv_id)}
+
+
+def test_concurrent_requests_attach_to_the_in_flight_run(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    app = client.app
+
+    first = client.post(f"/bills/{bill_id}/analysis").json()
+    second = client.post(f"/bills/{bill_id}/analysis", params={"force": "true"}).json()
+    assert second["analysis_run_id"] == first["analysis_run_id"]
+    assert second["job_id"] == first["job_id"]
+    assert (first["coalesced"], second["coalesced"]) == (False, True)
+
+    # A second process (own connection) cannot start a duplicate either.
+    other = db_mod.connect(DbConfig(path=app.state.cfg.db_path))
+    assert AnalysisRunService(conn=other).queue_run(bill_id=bill_id)["coalesced"] is True
+    other.close()
+
+    assert run_once(app.state.db, app.state.cfg)
+    assert not run_once(app.state.db, app.state.cfg)  # only one job was queued
+    assert client.get(f"/bills/runs/{first['analysis_run_id']}").json()["status"] == "succeeded"
+
+
+def test_analysis_waits_for_every_page(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    conn = client.app.state.db
+    dv_id = int(conn.execute("SELECT MAX(id) FROM document_versions").fetchone()[0])
+    page_count = len(PageRepo(conn).list_for_version(dv_id))
+    DocumentVersionRepo(conn).set_page_count(dv_id, page_count + 1)
+
+    resp = client.post(f"/bills/{bill_id}/analysis")
+
+    assert resp.status_code == 409
+    assert resp.json()["detail"] == f"pages_incomplete:{page_count}/{page_count + 1}"
+
+
+def test_run_fails_with_an_error_code_if_pages_vanish_before_it_executes(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    run_id = client.post(f"/bills/{bill_id}/analysis").json()["analysis_run_id"]
+    conn = client.app.state.db
+    conn.execute("DELETE FROM page_ocr_words")
+    conn.execute("DELETE FROM pages")
+    conn.commit()
+
+    assert run_once(conn, client.app.state.cfg)
+
+    run = client.get(f"/bills/runs/{run_id}").json()
+    assert run["status"] == "failed"
+    assert [(e["stage"], e["error_code"]) for e in run["errors"]] == [
+        ("ingest", "pages_incomplete")
+    ]
+
+
+def test_in_flight_run_is_never_left_without_its_job(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    bill_id = _ingest(client)
+    conn = client.app.state.db
+    dv_id = int(conn.execute("SELECT MAX(id) FROM document_versions").fetchone()[0])
+    runs = RunRepo(conn)
+
+    # The job insert fails: the run claim is rolled back with it.
+    conn.execute("ALTER TABLE jobs RENAME TO jobs_gone")
+    with pytest.raises(sqlite3.OperationalError):
+        runs.create_in_flight(bill_id, dv_id, "f", "v", JobType.analysis_run)
+    assert runs.find_in_flight(dv_id) is None
+    conn.execute("ALTER TABLE jobs_gone RENAME TO jobs")
+
+    run = runs.create_in_flight(bill_id, dv_id, "f", "v", JobType.analysis_run)
+    assert run is not None and run.job_id is not None
+    assert JobRepo(conn).get(run.job_id).payload["analysis_run_id"] == run.id
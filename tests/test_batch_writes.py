@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from app.domain.enums import JobType, OutputType
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.repo_bills import BillRepo
+from app.infra.repo_chunks import ChunkRepo, NewChunk
+from app.infra.repo_documents import DocumentRepo, DocumentVersionRepo
+from app.infra.repo_runs import NewOutput, OutputRepo, RunRepo
+
+
+def _version(conn) -> int:
+    bill = BillRepo(conn).create(source="manual", title="t")
+    doc = DocumentRepo(conn).create(bill_id=bill.id, doc_type="proiect", source_url=None)
+    return DocumentVersionRepo(conn).create(
+        document_id=doc.id,
+        version_hash="ab" * 32,
+        mime_type="application/pdf",
+        file_path="x.pdf",
+        page_count=1,
+        quality_level=None,
+        ocr_applied=False,
+        notes=None,
+    ).id
+
+
+def test_create_many_links_parents_without_rereading(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    dv_id = _version(conn)
+    repo = ChunkRepo(conn)
+
+    (earlier,) = repo.create_many(dv_id, [NewChunk("ARTICLE", "1", 1, 1, "Art. 1")])
+    rows = repo.create_many(
+        dv_id,
+        [
+            NewChunk("ALIN", "(2)", 1, 1, "(2) b", parent_chunk_id=earlier.id),
+            NewChunk("ARTICLE", "2", 1, 2, "Art. 2"),
+            NewChunk("ALIN", "(1)", 2, 2, "(1) c", parent_index=1),
+        ],
+    )
+
+    assert [r.parent_chunk_id for r in rows] == [earlier.id, None, rows[1].id]
+    assert repo.list_for_version(dv_id) == [earlier, *rows]
+
+    with pytest.raises(ValueError):
+        repo.create_many(dv_id, [NewChunk("ALIN", "(1)", 1, 1, "x", parent_index=0)])
+    assert repo.count_for_version(dv_id) == 4
+    assert not conn.in_transaction
+
+
+def test_output_create_many_matches_stored_rows(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    bill = BillRepo(conn).create(source="manual", title="t")
+    run = RunRepo(conn).create_in_flight(bill.id, 1, "f", "v", JobType.analysis_run)
+    assert run is not None
+    repo = OutputRepo(conn)
+
+    rows = repo.create_many(
+        run.id,
+        [NewOutput(OutputType.mechanisms_v1, "[]"), NewOutput(OutputType.change_list_v1, "[]")],
+    )
+
+    assert repo.list_for_run(run.id) == rows
+
+
+def test_ids_of_deleted_rows_are_not_reused(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    dv_id = _version(conn)
+    repo = ChunkRepo(conn)
+    old = repo.create_many(dv_id, [NewChunk("ARTICLE", str(n), 1, 1, f"Art. {n}") for n in (1, 2)])
+
+    repo.delete_for_version(dv_id)
+    (batched,) = repo.create_many(dv_id, [NewChunk("ARTICLE", "1", 1, 1, "Art. 1 (nou)")])
+    repo.delete_for_version(dv_id)
+    single = repo.create(dv_id, "ARTICLE", "1", None, 1, 1, "Art. 1 (v3)", None, None, None)
+
+    assert old[-1].id < batched.id < single.id
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from app.domain.enums import BlobBackendKind
+from app.features.blobs.gc import collect_garbage
+from app.infra.blob_backends import BlobBackendConfig, FsBackend, S3Backend
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.storage import BlobStore
+
+
+def test_shared_backend_publishes_and_reads_through(tmp_path: Path) -> None:
+    # Two stateless nodes with their own local roots over one shared backend.
+    shared = FsBackend(tmp_path / "shared")
+    node_a = BlobStore(tmp_path / "a", remote=shared)
+    node_b = BlobStore(tmp_path / "b", remote=shared)
+
+    ref = node_a.put_bytes(b"%PDF-1.7 shared", ".pdf")
+    page = ref.pages_dir / "1.png"
+    page.write_bytes(b"render")
+    node_a.publish([page])
+
+    found = node_b.find(ref.sha256, ".pdf")
+    assert found is not None
+    assert not found.original_path.exists()
+    assert node_b.original_size(ref.sha256, ".pdf") == len(b"%PDF-1.7 shared")
+    assert node_b.materialize(found.original_path)
+    assert found.original_path.read_bytes() == b"%PDF-1.7 shared"
+    b_page = tmp_path / "b" / node_a.key_for(page)
+    assert node_b.materialize(b_page) and b_page.read_bytes() == b"render"
+    assert not node_b.materialize(found.pages_dir / "2.png")
+
+    # The shared listing is authoritative for GC; local copies are dropped with it.
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    report = collect_garbage(conn, tmp_path / "b", grace_seconds=-60, remote=shared)
+    assert report.blobs_removed == 1
+    assert report.bytes_freed == len(b"%PDF-1.7 shared") + len(b"render")
+    assert list(shared.iter_objects("blobs/")) == []
+    assert not found.original_path.exists()
+
+
+def test_s3_backend_round_trip(tmp_path: Path) -> None:
+    pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+    with moto.mock_aws():
+        import boto3
+
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="bills")
+        s3 = S3Backend(
+            BlobBackendConfig(
+                kind=BlobBackendKind.s3, location="bills", prefix="poc", region="us-east-1"
+            )
+        )
+        src = tmp_path / "original.pdf"
+        src.write_bytes(b"%PDF-1.7 s3")
+
+        s3.upload_file("blobs/ab/original.pdf", src)
+        obj = s3.stat("blobs/ab/original.pdf")
+        assert obj is not None and obj.size == len(b"%PDF-1.7 s3")
+        assert s3.stat("blobs/ab/missing.pdf") is None
+        assert [o.key for o in s3.iter_objects("blobs/")] == ["blobs/ab/original.pdf"]
+
+        s3.download_file("blobs/ab/original.pdf", tmp_path / "copy" / "original.pdf")
+        assert (tmp_path / "copy" / "original.pdf").read_bytes() == b"%PDF-1.7 s3"
+
+        s3.delete("blobs/ab/original.pdf")
+        assert list(s3.iter_objects("blobs/")) == []
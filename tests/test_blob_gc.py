@@ -0,0 +1,102 @@
+import hashlib
+import os
+from pathlib import Path
+
+from app.features.blobs.gc import collect_garbage
+from app.features.blobs.layout import migrate_to_sharded
+from app.infra.blob_backends import FsBackend
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.repo_bills import BillRepo
+from app.infra.repo_documents import DocumentRepo, DocumentVersionRepo
+from app.infra.repo_pages import PageRepo
+from app.infra.storage import BlobStore
+
+
+def _register(conn, sha: str, original: Path, image: Path) -> int:
+    bill = BillRepo(conn).create(source="manual", title=sha[:8])
+    doc = DocumentRepo(conn).create(bill_id=bill.id, doc_type="proiect", source_url=None)
+    ver = DocumentVersionRepo(conn).create(
+        document_id=doc.id,
+        version_hash=sha,
+        mime_type="application/pdf",
+        file_path=str(original),
+        page_count=1,
+        quality_level=None,
+        ocr_applied=False,
+        notes=None,
+    )
+    PageRepo(conn).upsert(
+        document_version_id=ver.id,
+        page_number=1,
+        text="x",
+        ocr_text=None,
+        quality_level=None,
+        has_handwriting=False,
+        image_path=str(image),
+    )
+    return ver.id
+
+
+def _age(root: Path, seconds: float = 86400) -> None:
+    old = os.stat(root).st_mtime - seconds
+    for p in [root, *root.rglob("*")]:
+        os.utime(p, (old, old))
+
+
+def test_migrate_then_gc_keeps_only_referenced_files(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    store = BlobStore(tmp_path)
+
+    live_sha = hashlib.sha256(b"live").hexdigest()
+    legacy = store.legacy_blob_dir(live_sha)
+    (legacy / "pages").mkdir(parents=True)
+    (legacy / "original.pdf").write_bytes(b"live")
+    (legacy / "pages" / "1.png").write_bytes(b"page")
+    (legacy / "pages" / "2.jpg").write_bytes(b"stale render")
+    ver_id = _register(conn, live_sha, legacy / "original.pdf", legacy / "pages" / "1.png")
+
+    assert migrate_to_sharded(conn, tmp_path)["blobs_moved"] == 1
+    assert migrate_to_sharded(conn, tmp_path)["blobs_moved"] == 0
+    ver = DocumentVersionRepo(conn).get(ver_id)
+    assert ver.file_path == str(store.blob_dir(live_sha) / "original.pdf")
+    assert Path(ver.file_path).read_bytes() == b"live"
+    page = PageRepo(conn).list_for_version(ver_id)[0]
+    assert page.image_path == str(store.blob_dir(live_sha) / "pages" / "1.png")
+
+    orphan = store.put_bytes(b"orphan", ".pdf")
+    fresh = store.put_bytes(b"just uploaded", ".pdf")
+    _age(store.blob_dir(live_sha))
+    _age(store.blob_dir(orphan.sha256))
+
+    dry = collect_garbage(conn, tmp_path, grace_seconds=3600, dry_run=True)
+    assert (dry.blobs_removed, dry.page_files_removed) == (1, 1)
+    assert orphan.original_path.exists()
+
+    report = collect_garbage(conn, tmp_path, grace_seconds=3600)
+    assert (report.blobs_removed, report.page_files_removed) == (1, 1)
+    assert report.bytes_freed == len(b"orphan") + len(b"stale render")
+    assert not store.blob_dir(orphan.sha256).exists()
+    assert fresh.original_path.exists()
+    assert Path(page.image_path).exists()
+    assert not (store.blob_dir(live_sha) / "pages" / "2.jpg").exists()
+
+
+def test_gc_keeps_a_blob_refreshed_after_the_remote_listing(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    remote_root = tmp_path / "remote"
+    remote = FsBackend(remote_root)
+    store = BlobStore(tmp_path / "local", remote=remote)
+    blob = store.put_bytes(b"re-uploaded", ".pdf")
+    _age(remote_root)
+    _age(store.blob_dir(blob.sha256))
+    # Same bytes uploaded again on this node: adopt_file refreshed the local original,
+    # but its row is not committed yet and the remote listing still shows the old mtime.
+    os.utime(blob.original_path)
+
+    report = collect_garbage(conn, tmp_path / "local", grace_seconds=3600, remote=remote)
+
+    assert report.blobs_removed == 0
+    assert blob.original_path.exists()
+    assert remote.stat(store.key_for(blob.original_path)) is not None
@@ -0,0 +1,113 @@
+import io
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+import fitz
+
+from app.domain.enums import JobType
+from app.features.ingest.archive import PdfSource, iter_archive_sources, iter_pdf_sources
+from app.features.ingest.bulk import BulkIngestService, BulkManifest
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.repo_jobs import JobRepo
+
+
+def _pdf_bytes(text: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def test_directory_ingest_dedupes_batches_and_resumes(tmp_path: Path) -> None:
+    src = tmp_path / "dump"
+    (src / "2019").mkdir(parents=True)
+    pl1 = _pdf_bytes("Art. 1")
+    (src / "2019" / "pl-1.pdf").write_bytes(pl1)
+    (src / "2019" / "pl-1-copy.pdf").write_bytes(pl1)
+    (src / "pl-2.pdf").write_bytes(_pdf_bytes("Art. 2"))
+    (src / "notes.txt").write_text("ignored")
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    service = BulkIngestService(conn=conn, blobs_dir=tmp_path / "data", batch_size=2)
+    manifest = BulkManifest(tmp_path / "dump.manifest.jsonl")
+
+    first = service.ingest(iter_pdf_sources(src), manifest=manifest)
+
+    assert (first["ingested"], first["duplicate"], first["failed"]) == (2, 1, 0)
+    entries = {e["name"]: e for e in first["entries"]}
+    copy, original = entries["2019/pl-1-copy.pdf"], entries["2019/pl-1.pdf"]
+    assert {copy["status"], original["status"]} == {"ingested", "duplicate"}
+    assert copy["document_version_id"] == original["document_version_id"]
+    job = JobRepo(conn).get(int(entries["pl-2.pdf"]["job_id"]))
+    assert job.type == JobType.pipeline_document_version
+
+    (src / "pl-3.pdf").write_bytes(_pdf_bytes("Art. 3"))
+    manifest = BulkManifest(tmp_path / "dump.manifest.jsonl")
+    again = service.ingest(iter_pdf_sources(src), manifest=manifest)
+
+    assert (again["ingested"], again["skipped"]) == (1, 3)
+
+
+def test_failed_manifest_entries_are_retried(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    service = BulkIngestService(conn=conn, blobs_dir=tmp_path / "data")
+    manifest_path = tmp_path / "dump.manifest.jsonl"
+    pdf = _pdf_bytes("Art. 1")
+
+    def unreadable() -> BinaryIO:
+        raise OSError("disk hiccup")
+
+    first = service.ingest(
+        [
+            PdfSource("ok.pdf", lambda: io.BytesIO(pdf)),
+            PdfSource("flaky.pdf", unreadable),
+        ],
+        manifest=BulkManifest(manifest_path),
+    )
+    assert (first["ingested"], first["failed"]) == (1, 1)
+
+    sources = [
+        PdfSource("ok.pdf", lambda: io.BytesIO(pdf)),
+        PdfSource("flaky.pdf", lambda: io.BytesIO(_pdf_bytes("Art. 2"))),
+    ]
+    again = service.ingest(sources, manifest=BulkManifest(manifest_path))
+
+    assert (again["ingested"], again["failed"], again["skipped"]) == (1, 0, 1)
+    assert [e["name"] for e in again["entries"]] == ["flaky.pdf"]
+    assert BulkManifest(manifest_path).done == {"ok.pdf", "flaky.pdf"}
+
+
+def test_zip_members_are_listed_in_name_order() -> None:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("b.pdf", _pdf_bytes("B"))
+        zf.writestr("a.PDF", _pdf_bytes("A"))
+        zf.writestr("readme.md", "x")
+
+    assert [s.name for s in iter_archive_sources(buf, "dump.zip")] == ["a.PDF", "b.pdf"]
+
+
+def test_corrupt_archive_member_is_recorded_and_skipped(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "app.sqlite3"))
+    migrate(conn)
+    service = BulkIngestService(conn=conn, blobs_dir=tmp_path / "data")
+    bad, good = _pdf_bytes("Art. 1"), _pdf_bytes("Art. 2")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("a.pdf", bad)
+        zf.writestr("b.pdf", good)
+    raw = bytearray(buf.getvalue())
+    at = raw.index(bad) + 10
+    raw[at] ^= 0xFF  # a flipped byte: reading a.pdf fails its CRC check
+
+    manifest_path = tmp_path / "dump.manifest.jsonl"
+    result = service.ingest(
+        iter_archive_sources(io.BytesIO(bytes(raw)), "dump.zip"),
+        manifest=BulkManifest(manifest_path),
+    )
+
+    assert (result["ingested"], result["failed"]) == (1, 1)
+    entries = {e["name"]: e for e in result["entries"]}
+    assert entries["a.pdf"]["error"].startswith("BadZipFile")
+    assert BulkManifest(manifest_path).done == {"b.pdf"}
@@ -0,0 +1,114 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.config import AppConfig
+from app.domain.enums import JobStatus, JobType
+from app.features.jobs.handlers import HANDLERS
+from app.features.jobs.worker import backoff_seconds, run_once
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.repo_jobs import JobRepo, utc_in_iso
+
+
+def _repo(tmp_path: Path) -> JobRepo:
+    conn = connect(DbConfig(path=tmp_path / "jobs.sqlite3"))
+    migrate(conn)
+    return JobRepo(conn)
+
+
+def test_claim_hands_each_job_to_one_worker(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    first = repo.enqueue(JobType.ingest_render, {"document_version_id": 1})
+    second = repo.enqueue(JobType.ingest_render, {"document_version_id": 2})
+
+    a = repo.claim("worker-a", lease_seconds=60)
+    b = repo.claim("worker-b", lease_seconds=60)
+
+    assert a is not None and b is not None
+    assert (a.id, b.id) == (first, second)
+    assert a.status == JobStatus.running and a.attempts == 1 and a.locked_by == "worker-a"
+    assert repo.claim("worker-c", lease_seconds=60) is None
+
+
+def test_failed_job_is_retried_after_backoff_until_attempts_run_out(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    job_id = repo.enqueue(JobType.ingest_render, {}, max_attempts=2)
+
+    repo.claim("w", lease_seconds=60)
+    repo.mark_failed(job_id, "w", error="boom", retry_at=utc_in_iso(-1))
+    assert repo.get(job_id).status == JobStatus.queued
+    assert repo.claim("w", lease_seconds=60) is not None
+    repo.mark_failed(job_id, "w", error="boom again", retry_at=utc_in_iso(-1))
+
+    later = repo.enqueue(JobType.ingest_render, {})
+    repo.claim("w", lease_seconds=60)
+    repo.mark_failed(later, "w", error="boom", retry_at=utc_in_iso(3600))
+    assert repo.get(later).status == JobStatus.queued
+    assert repo.claim("w", lease_seconds=60) is None  # not due yet
+
+    job = repo.get(job_id)
+    assert job.status == JobStatus.failed
+    assert job.attempts == 2 and job.last_error == "boom again"
+
+
+def test_expired_lease_is_requeued_and_heartbeat_is_rejected(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    job_id = repo.enqueue(JobType.ingest_render, {})
+    repo.claim("crashed", lease_seconds=-1)
+
+    assert repo.requeue_expired() == 1
+    assert not repo.heartbeat(job_id, "crashed", lease_seconds=60)
+    reclaimed = repo.claim("healthy", lease_seconds=60)
+    assert reclaimed is not None and reclaimed.attempts == 2
+
+
+def test_backoff_grows_exponentially_and_is_capped() -> None:
+    assert backoff_seconds(1) < backoff_seconds(2) < backoff_seconds(3)
+    assert backoff_seconds(50) == backoff_seconds(60)
+
+
+def test_outcome_of_a_lost_lease_is_not_recorded(tmp_path: Path) -> None:
+    repo = _repo(tmp_path)
+    job_id = repo.enqueue(JobType.ingest_render, {})
+    repo.claim("slow", lease_seconds=-1)
+    repo.requeue_expired()
+    repo.claim("healthy", lease_seconds=60)
+
+    assert not repo.mark_succeeded(job_id, "slow")
+    assert not repo.mark_failed(job_id, "slow", error="late", retry_at=None)
+    job = repo.get(job_id)
+    assert job.status == JobStatus.running and job.locked_by == "healthy"
+    assert repo.mark_succeeded(job_id, "healthy")
+
+
+def test_handler_is_stopped_once_its_lease_is_lost(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret", job_lease_seconds=1)
+    conn = connect(DbConfig(path=cfg.db_path))
+    migrate(conn)
+    repo = JobRepo(conn)
+    job_id = repo.enqueue(JobType.ingest_render, {})
+    other = JobRepo(connect(DbConfig(path=cfg.db_path)))
+    reached: list[str] = []
+
+    def slow_handler(c: sqlite3.Connection, *_: Any) -> None:
+        # Another worker takes the job over; the next heartbeat notices the lost lease.
+        c.execute("UPDATE jobs SET lease_expires_at = '' WHERE id = ?", (job_id,))
+        c.commit()
+        assert other.requeue_expired() == 1
+        assert other.claim("healthy", lease_seconds=60) is not None
+        time.sleep(0.6)
+        c.execute("UPDATE jobs SET last_error = 'stale' WHERE id = ?", (job_id,))
+        reached.append("write after lease loss")
+
+    monkeypatch.setitem(HANDLERS, JobType.ingest_render, slow_handler)
+    assert run_once(conn, cfg, "slow")
+
+    assert reached == []
+    job = repo.get(job_id)
+    assert job.status == JobStatus.running and job.locked_by == "healthy"
+    assert job.last_error == "lease_expired"
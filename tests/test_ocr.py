@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytesseract
+import pytest
+
+from app.infra import ocr
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.ocr import OcrResult, OcrWord
+from app.infra.ocr_words import pack_words, quote_bbox, unpack_words
+from app.infra.repo_ocr_cache import OcrCacheKey, OcrCacheRepo
+
+
+def test_cache_round_trips_text_confidence_and_word_boxes(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "ocr.sqlite3"))
+    migrate(conn)
+    repo = OcrCacheRepo(conn)
+    key = OcrCacheKey(
+        image_sha256="ab" * 32, lang="ron", engine_version="5.3.0", settings_key="raw:v1"
+    )
+    result = OcrResult(
+        text="Art. 1",
+        confidence=91.5,
+        words=[OcrWord("Art.", 10, 20, 30, 12, 95.0), OcrWord("1", 44, 20, 8, 12, 88.0)],
+    )
+
+    assert repo.get(key) is None
+    repo.put(key, result)
+
+    assert repo.get(key) == result
+    # Any component of the key changing (e.g. a tesseract upgrade) is a miss.
+    assert repo.get(OcrCacheKey(key.image_sha256, "ron", "5.4.0", "raw:v1")) is None
+
+
+def test_word_boxes_pack_compactly_and_locate_quotes() -> None:
+    words = [
+        OcrWord("Art.", 10, 20, 30, 12, 95.0),
+        OcrWord("1", 44, 20, 8, 12, 88.0),
+        OcrWord("Se", 10, 40, 20, 12, 70.0),
+        OcrWord("abrogă.", 34, 40, 50, 12, -1.0),
+    ]
+    text, boxes, confs = pack_words(words)
+
+    assert len(boxes) == 4 * 4 * len(words) and len(confs) == len(words)
+    assert unpack_words(text, boxes, confs) == words
+    # Whitespace in the quote (line breaks from segmentation) does not matter.
+    assert quote_bbox(words, "1\nSe  abrogă.") == (10, 20, 84, 52)
+    assert quote_bbox(words, "Art. 2") is None
+
+
+@pytest.mark.parametrize(
+    ("installed", "selected"),
+    [
+        (["eng", "osd", "ron"], "ron+eng"),
+        (["eng", "osd"], "eng"),
+        (["deu"], None),
+    ],
+)
+def test_language_probe_combines_installed_packs(
+    monkeypatch: pytest.MonkeyPatch, installed: list[str], selected: str | None
+) -> None:
+    monkeypatch.setattr(pytesseract, "get_languages", lambda config="": installed)
+    ocr.probe_ocr_languages.cache_clear()
+    try:
+        assert ocr.probe_ocr_languages().selected == selected
+    finally:
+        ocr.probe_ocr_languages.cache_clear()
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.infra import ocr
+from app.infra.ocr import OcrResult
+from app.infra.ocr_preprocess import estimate_skew, otsu_threshold, preprocess_for_ocr
+
+
+def _text_rows(size: tuple[int, int] = (800, 600)) -> Image.Image:
+    img = Image.new("L", size, 235)
+    draw = ImageDraw.Draw(img)
+    for y in range(60, size[1] - 60, 40):
+        draw.rectangle((80, y, size[0] - 80, y + 12), fill=30)
+    return img
+
+
+def test_skew_is_estimated_and_image_is_binarized_and_upscaled() -> None:
+    skewed = _text_rows().rotate(3, fillcolor=235)
+
+    assert estimate_skew(skewed) == pytest.approx(-3.0, abs=0.5)
+    assert 30 <= otsu_threshold(_text_rows()) < 235
+
+    cleaned, scale = preprocess_for_ocr(skewed)
+    assert scale == 2.0 and cleaned.size == (1600, 1200)
+    assert set(cleaned.tobytes()) <= {0, 255}
+
+
+@pytest.mark.parametrize(
+    ("first_conf", "second_conf", "expected", "retried"),
+    [(85.0, 90.0, "raw", False), (35.0, 70.0, "clean", True), (35.0, 20.0, "raw", True)],
+)
+def test_only_poor_pages_are_retried_and_the_better_pass_wins(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    first_conf: float,
+    second_conf: float,
+    expected: str,
+    retried: bool,
+) -> None:
+    path = tmp_path / "page.png"
+    _text_rows().save(path)
+    calls: list[float] = []
+
+    def fake_ocr(img: Image.Image, lang: str, scale: float = 1.0) -> OcrResult:
+        calls.append(scale)
+        if len(calls) == 1:
+            return OcrResult(text="raw", confidence=first_conf)
+        return OcrResult(text="clean", confidence=second_conf)
+
+    monkeypatch.setattr(ocr, "_ocr_pil", fake_ocr)
+
+    assert ocr.ocr_image_adaptive(path, "ron").text == expected
+    assert len(calls) == (2 if retried else 1)
@@ -0,0 +1,133 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.features.ocr import service as ocr_service
+from app.features.ocr import tasks as ocr_tasks
+from app.features.ocr.service import OcrService
+from app.infra.db import DbConfig, connect, migrate
+from app.infra.ocr import OcrLanguages, OcrResult, OcrWord
+from app.infra.process_pool import SharedPool
+from app.infra.repo_bills import BillRepo
+from app.infra.repo_documents import DocumentRepo, DocumentVersionRepo
+from app.infra.repo_ocr_words import PageWordsRepo
+from app.infra.repo_pages import PageRepo
+
+
+def _scanned_version(tmp_path: Path, conn: sqlite3.Connection, pages: int) -> int:
+    """A version of `pages` Q3 (scan) pages, each with its own page image."""
+
+    bill = BillRepo(conn).create(source="test", title="Scan")
+    doc = DocumentRepo(conn).create(bill_id=bill.id, doc_type="bill", source_url=None)
+    ver = DocumentVersionRepo(conn).create(
+        document_id=doc.id,
+        version_hash="cd" * 32,
+        mime_type="application/pdf",
+        file_path=str(tmp_path / "scan.pdf"),
+        page_count=pages,
+        quality_level="Q3",
+        ocr_applied=False,
+        notes=None,
+    )
+    for n in range(1, pages + 1):
+        image = tmp_path / f"{n}.png"
+        Image.new("L", (8, 8), color=n).save(image)
+        PageRepo(conn).upsert(
+            document_version_id=ver.id,
+            page_number=n,
+            text="",
+            ocr_text=None,
+            quality_level="Q3",
+            has_handwriting=False,
+            image_path=str(image),
+            ocr_regions_json=None,
+        )
+    return ver.id
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Recognize `<n>.png` as "Pagina <n>"; image names listed here fail instead."""
+
+    failing: list[str] = []
+
+    def recognize(path: Path, lang: str) -> OcrResult:
+        if path.name in failing:
+            raise ValueError(f"unreadable image {path.name}")
+        word = OcrWord(f"Pagina {path.stem}", 0, 0, 8, 8, 90.0)
+        return OcrResult(text=word.text, confidence=90.0, words=[word])
+
+    monkeypatch.setattr(ocr_service, "ocr_image_adaptive", recognize)
+    monkeypatch.setattr(ocr_service, "select_ocr_lang", lambda: "ron")
+    monkeypatch.setattr(
+        ocr_service, "probe_ocr_languages", lambda: OcrLanguages(("ron",), "ron")
+    )
+    monkeypatch.setattr(ocr_tasks, "tesseract_version", lambda: "5.3.0")
+    return failing
+
+
+def test_fan_out_persists_every_page_and_reports_a_failed_one(
+    tmp_path: Path, fake_tesseract: list[str]
+) -> None:
+    conn = connect(DbConfig(path=tmp_path / "ocr.sqlite3"))
+    migrate(conn)
+    dv_id = _scanned_version(tmp_path, conn, pages=5)
+    fake_tesseract.append("3.png")
+    pool = SharedPool(3, factory=lambda n: ThreadPoolExecutor(max_workers=n))
+    progress: list[tuple[int, int]] = []
+
+    try:
+        result = OcrService(conn=conn, pool=pool).ocr_document_version(
+            document_version_id=dv_id, on_progress=lambda *p: progress.append(p)
+        )
+    finally:
+        pool.shutdown()
+
+    assert result["pages_ocr_updated"] == 4
+    assert result["pages_ocr_failed"] == [3]
+    # Progress is reported once per persisted page, in order.
+    assert progress == [(1, 5), (2, 5), (3, 5), (4, 5)]
+    texts = {p.page_number: p.ocr_text for p in PageRepo(conn).list_for_version(dv_id)}
+    assert texts == {1: "Pagina 1", 2: "Pagina 2", 3: None, 4: "Pagina 4", 5: "Pagina 5"}
+
+
+def test_cache_hit_skips_tesseract(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fake_tesseract: list[str]
+) -> None:
+    conn = connect(DbConfig(path=tmp_path / "ocr.sqlite3"))
+    migrate(conn)
+    first = _scanned_version(tmp_path, conn, pages=2)
+    OcrService(conn=conn).ocr_document_version(document_version_id=first)
+
+    # Same page images under another version: every image is served from the cache.
+    second = _scanned_version(tmp_path, conn, pages=2)
+
+    def no_tesseract(path: Path, lang: str) -> OcrResult:
+        raise AssertionError(f"tesseract called for cached image {path.name}")
+
+    monkeypatch.setattr(ocr_service, "ocr_image_adaptive", no_tesseract)
+    result = OcrService(conn=conn).ocr_document_version(document_version_id=second)
+
+    assert result["pages_ocr_cache_hits"] == 2
+    assert result["pages_ocr_updated"] == 2 and result["pages_ocr_failed"] == []
+    assert [p.ocr_text for p in PageRepo(conn).list_for_version(second)] == [
+        "Pagina 1",
+        "Pagina 2",
+    ]
+
+
+def test_page_text_is_not_stored_without_its_words(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "ocr.sqlite3"))
+    migrate(conn)
+    dv_id = _scanned_version(tmp_path, conn, pages=1)
+    page = PageRepo(conn).get(dv_id, 1)
+    words = [OcrWord("Art.", 10, 20, 30, 12, 95.0)]
+    conn.execute("ALTER TABLE page_ocr_words RENAME TO page_ocr_words_gone")
+
+    with pytest.raises(sqlite3.OperationalError):
+        PageWordsRepo(conn).put_with_text(page.id, words, "Art.", "Q3")
+
+    assert PageRepo(conn).get(dv_id, 1).ocr_text is None
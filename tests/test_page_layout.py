@@ -0,0 +1,35 @@
+from app.domain.page_layout import (
+    OcrRegion,
+    find_ocr_regions,
+    layout_text,
+    merge_region_text,
+    regions_from_json,
+    regions_to_json,
+)
+
+PAGE = (0.0, 0.0, 595.0, 842.0)
+
+
+def test_only_textless_image_regions_are_selected_and_merged() -> None:
+    stamp = (400.0, 700.0, 550.0, 800.0)
+    overlapping = (380.0, 690.0, 460.0, 770.0)
+    captioned = (72.0, 300.0, 300.0, 400.0)  # has native text on top of it
+    bullet = (72.0, 100.0, 80.0, 108.0)  # too small to OCR
+
+    regions = find_ocr_regions(
+        PAGE, [stamp, overlapping, captioned, bullet], text_rects=[(80.0, 340.0, 290.0, 360.0)]
+    )
+
+    assert regions == [(380.0, 690.0, 550.0, 800.0)]
+
+
+def test_region_text_is_spliced_in_reading_order() -> None:
+    blocks = [((72.0, 500.0, 500.0, 520.0), "Art. 2\n"), ((72.0, 72.0, 500.0, 90.0), "Art. 1\n")]
+    table = (72.0, 200.0, 500.0, 400.0)
+
+    text, offsets = layout_text(blocks, [table])
+    region = OcrRegion(bbox=table, text_offset=offsets[0], image_path="1.r1.png")
+
+    assert text == "Art. 1\nArt. 2\n"
+    assert merge_region_text(text, [region], ["Tabel 1 "]) == "Art. 1\nTabel 1\nArt. 2\n"
+    assert regions_from_json(regions_to_json([region])) == [region]
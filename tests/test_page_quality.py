@@ -0,0 +1,25 @@
+from app.domain.enums import QualityLevel
+from app.domain.page_quality import after_ocr, classify_page, needs_ocr, page_signals
+
+_RO = "Art. 3 (1) Autoritatea publică centrală stabilește obligațiile operatorilor. " * 6
+
+
+def test_clean_romanian_text_layer_is_q1() -> None:
+    assert classify_page(page_signals(_RO)) == QualityLevel.q1
+
+
+def test_long_text_without_diacritics_is_q2() -> None:
+    stripped = _RO.replace("ă", "a").replace("ș", "s").replace("ț", "t")
+    assert classify_page(page_signals(stripped)) == QualityLevel.q2
+
+
+def test_missing_or_garbage_text_layer_needs_ocr() -> None:
+    assert classify_page(page_signals("")) == QualityLevel.q3
+    assert classify_page(page_signals("��#@~ " * 40)) == QualityLevel.q3
+    assert classify_page(page_signals("Anexa 2", image_area_ratio=0.9)) == QualityLevel.q3
+
+
+def test_low_ocr_confidence_demotes_to_q4() -> None:
+    assert after_ocr(QualityLevel.q3, ocr_confidence=22.0) == QualityLevel.q4
+    assert after_ocr(QualityLevel.q3, ocr_confidence=85.0) == QualityLevel.q3
+    assert needs_ocr("Q4") and not needs_ocr("Q2")
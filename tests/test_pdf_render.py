@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import fitz
+from PIL import Image
+
+from app.domain.enums import ImageFormat, QualityLevel
+from app.domain.render_policy import RenderPolicy
+from app.infra.pdf_render import render_page_image, render_pdf_to_pages, split_page_ranges
+
+
+def _make_pdf(path: Path, pages: int) -> Path:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Art. {i + 1} Pagina {i + 1}")
+    doc.save(path)
+    return path
+
+
+def test_split_page_ranges_covers_all_pages_in_order() -> None:
+    assert split_page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert split_page_ranges(2, 8) == [(0, 1), (1, 2)]
+    assert split_page_ranges(0, 4) == []
+
+
+def test_parallel_render_matches_serial(tmp_path: Path) -> None:
+    pdf = _make_pdf(tmp_path / "doc.pdf", pages=12)
+
+    serial = render_pdf_to_pages(pdf, tmp_path / "serial", workers=1)
+    parallel = render_pdf_to_pages(pdf, tmp_path / "parallel", workers=3)
+
+    assert [p.page_number for p in parallel] == list(range(1, 13))
+    assert [p.text for p in parallel] == [p.text for p in serial]
+    assert all(p.image_path.exists() for p in parallel)
+
+
+def test_lazy_render_rasterizes_only_pages_without_text_layer(tmp_path: Path) -> None:
+    doc = fitz.open()
+    doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), "Art. 1 Obligatii. " * 30)
+    doc.new_page()  # image-only stand-in: no text layer at all
+    pdf = tmp_path / "mixed.pdf"
+    doc.save(pdf)
+
+    pages = render_pdf_to_pages(pdf, tmp_path / "pages", lazy=True)
+
+    assert pages[0].image_path is None
+    assert pages[0].quality_level == QualityLevel.q2  # no diacritics on a long page
+    assert pages[1].image_path is not None and pages[1].image_path.exists()
+    assert pages[1].quality_level == QualityLevel.q3
+    assert render_page_image(pdf, tmp_path / "pages", 1).exists()
+
+
+def test_render_policy_uses_high_dpi_greyscale_only_for_ocr_pages(tmp_path: Path) -> None:
+    doc = fitz.open()
+    doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), "Art. 1 Obligații. " * 30)
+    doc.new_page()  # needs OCR; default page size is A4 (595pt wide)
+    pdf = tmp_path / "mixed.pdf"
+    doc.save(pdf)
+    policy = RenderPolicy(ocr_dpi=200, display_dpi=72, display_format=ImageFormat.jpeg)
+
+    display, scan = render_pdf_to_pages(pdf, tmp_path / "pages", policy=policy)
+
+    assert display.image_path.suffix == ".jpg" and scan.image_path.suffix == ".png"
+    with Image.open(scan.image_path) as img:
+        assert img.mode == "L" and abs(img.width - 595 * 200 / 72) <= 1
+    with Image.open(display.image_path) as img:
+        assert abs(img.width - 595) <= 1
+
+    bilevel = render_page_image(pdf, tmp_path / "bw", 1, RenderPolicy(display_bilevel=True))
+    with Image.open(bilevel) as img:
+        assert img.mode == "1"
+
+
+def test_textless_image_on_digital_page_is_rasterized_as_ocr_region(tmp_path: Path) -> None:
+    stamp = tmp_path / "stamp.png"
+    Image.new("L", (300, 200), 200).save(stamp)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(72, 72, 540, 400), "Art. 1 Obligații și răspunderi. " * 20)
+    page.insert_image(fitz.Rect(300, 600, 500, 740), filename=str(stamp))
+    pdf = tmp_path / "stamped.pdf"
+    doc.save(pdf)
+
+    (rendered,) = render_pdf_to_pages(pdf, tmp_path / "pages", lazy=True)
+
+    assert rendered.image_path is None  # digital page: no full-page OCR image
+    (region,) = rendered.ocr_regions
+    assert Path(region.image_path).exists()
+    assert region.text_offset == len(rendered.text)  # stamp sits below all the text
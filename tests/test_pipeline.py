@@ -0,0 +1,214 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.config import AppConfig
+from app.domain.enums import JobType
+from app.features.analysis.segmentation_v1 import StreamingSegmenter, segment_pages_to_structure
+from app.features.jobs.handlers import HANDLERS
+from app.features.jobs.worker import run_once
+from app.features.ocr import tasks as ocr_tasks
+from app.features.ocr.tasks import OcrTask
+from app.features.pipeline import service as pipeline_service
+from app.features.pipeline.service import PipelineService
+from app.infra import db as db_mod
+from app.infra.db import DbConfig
+from app.infra.ocr import OcrLanguages, OcrResult, OcrWord
+from app.infra.process_pool import SharedPool
+from app.infra.repo_chunks import ChunkRepo
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_jobs import JobRepo
+from app.infra.repo_ocr_words import PageWordsRepo
+from app.infra.repo_pages import Page, PageRepo
+from app.main import create_app
+
+PAGES = [
+    (1, "Preambul\nArt. 1\n(1) Obligații generale.\n(2) Excepții."),
+    (2, "continuare art. 1\nArt. 2\nSe abrogă."),
+    (3, "Art. 3\n(1) Intră în vigoare.\nArt. 4\nFinal."),
+]
+
+
+def test_streaming_segmenter_matches_batch_segmentation() -> None:
+    seg = StreamingSegmenter()
+    emitted_per_page = [seg.add_page(n, text) for n, text in PAGES]
+    streamed = [s for batch in emitted_per_page for s in batch] + seg.finish()
+
+    assert streamed == segment_pages_to_structure(PAGES)
+    # Art. 1 is complete (and emitted) as soon as page 2 shows Art. 2.
+    assert [s.label for s in emitted_per_page[1] if s.chunk_type == "ARTICLE"] == ["Art. 1"]
+
+
+def test_streaming_segmenter_buffers_heading_less_pages() -> None:
+    pages = [(1, "Expunere de motive"), (2, "fără articole"), *[(n + 2, t) for n, t in PAGES]]
+    seg = StreamingSegmenter()
+    emitted = [seg.add_page(n, text) for n, text in pages]
+
+    assert emitted[0] == emitted[1] == []
+    assert [s for batch in emitted for s in batch] + seg.finish() == (
+        segment_pages_to_structure(pages)
+    )
+
+
+def _client(tmp_path: Path) -> TestClient:
+    app = create_app()
+    app.state.cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret")
+    app.state.db = db_mod.connect(DbConfig(path=app.state.cfg.db_path))
+    db_mod.migrate(app.state.db)
+    return TestClient(app)
+
+
+def _bill_pdf(tmp_path: Path) -> Path:
+    pdf = tmp_path / "bill.pdf"
+    if not pdf.exists():
+        doc = fitz.open()
+        for _, text in PAGES:
+            filler = "Dispoziții comune privind aplicarea legii. " * 3
+            body = text.replace("\n", "\n" + filler + "\n")
+            doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 770), body)
+        doc.save(pdf)
+    return pdf
+
+
+def _upload_bill(client: TestClient, pdf: Path) -> dict[str, int]:
+    with pdf.open("rb") as f:
+        resp = client.post(
+            "/bills/upload",
+            params={"title": "Bill", "pipeline": "true"},
+            files={"file": ("bill.pdf", f, "application/pdf")},
+        )
+    assert resp.status_code == 202
+    return dict(resp.json())
+
+
+def test_pipeline_upload_persists_pages_and_chunks(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    app = client.app
+    body = _upload_bill(client, _bill_pdf(tmp_path))
+
+    assert run_once(app.state.db, app.state.cfg)
+
+    progress = client.get(f"/jobs/{body['job_id']}").json()["progress"]
+    assert progress["pages_done"] == progress["page_count"] == 3
+    chunks = client.get(f"/documents/{body['document_version_id']}/chunks").json()["chunks"]
+    assert [c["label"] for c in chunks if c["chunk_type"] == "ARTICLE"] == [
+        "Art. 1", "Art. 2", "Art. 3", "Art. 4"
+    ]
+    assert progress["chunks_ready"] == len(chunks)
+
+
+def test_pipeline_retry_after_dedup_copy(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(tmp_path)
+    app = client.app
+    # Both uploads are queued before either runs; the first then finishes (and is the
+    # preferred, OCR'd, source for the second).
+    source = _upload_bill(client, _bill_pdf(tmp_path))
+    target = _upload_bill(client, _bill_pdf(tmp_path))["document_version_id"]
+    assert run_once(app.state.db, app.state.cfg)
+    DocumentVersionRepo(app.state.db).mark_ocr_applied(source["document_version_id"])
+
+    persist = pipeline_service.persist_segments
+    failures = [RuntimeError("boom")]
+
+    def flaky_persist(*args: Any, **kwargs: Any) -> Any:
+        if failures:
+            raise failures.pop()
+        return persist(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline_service, "persist_segments", flaky_persist)
+    service = PipelineService(conn=app.state.db, blobs_dir=app.state.cfg.blobs_dir)
+    with pytest.raises(RuntimeError):
+        service.run(document_version_id=target)
+    result = service.run(document_version_id=target)
+
+    assert result["page_count"] == 3
+    articles = [
+        c.label
+        for c in ChunkRepo(app.state.db).list_for_version(target)
+        if c.chunk_type == "ARTICLE"
+    ]
+    assert articles == ["Art. 1", "Art. 2", "Art. 3", "Art. 4"]
+
+
+def test_pipeline_rerun_keeps_stored_ocr_text(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    app = client.app
+    dv_id = _upload_bill(client, _bill_pdf(tmp_path))["document_version_id"]
+    assert run_once(app.state.db, app.state.cfg)
+    page = PageRepo(app.state.db).get(dv_id, 1)
+    words = [OcrWord("Art.", 10, 20, 30, 12, 95.0)]
+    PageWordsRepo(app.state.db).put_with_text(page.id, words, PAGES[0][1], "Q3")
+
+    PipelineService(conn=app.state.db, blobs_dir=app.state.cfg.blobs_dir).run(
+        document_version_id=dv_id
+    )
+
+    again = PageRepo(app.state.db).get(dv_id, 1)
+    assert (again.ocr_text, again.quality_level) == (PAGES[0][1], "Q3")
+    assert PageWordsRepo(app.state.db).get(page.id) == words
+
+
+def test_pipeline_segments_past_a_failed_ocr_page(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = _client(tmp_path)
+    app = client.app
+    dv_id = _upload_bill(client, _bill_pdf(tmp_path))["document_version_id"]
+    texts: dict[str, str] = {}
+
+    def plan_every_page(page: Page, _: Any) -> tuple[list[OcrTask], None]:
+        image = tmp_path / f"{page.page_number}.png"
+        Image.new("L", (8, 8), color=page.page_number).save(image)
+        texts[image.name] = page.text or ""
+        return [OcrTask(page, image)], None
+
+    def recognize(path: Path, lang: str) -> OcrResult:
+        if path.name == "2.png":
+            raise ValueError("unreadable image")
+        return OcrResult(text=texts[path.name], confidence=90.0, words=[])
+
+    monkeypatch.setattr(pipeline_service, "plan_page", plan_every_page)
+    monkeypatch.setattr(pipeline_service, "ocr_image_adaptive", recognize)
+    monkeypatch.setattr(
+        pipeline_service, "probe_ocr_languages", lambda: OcrLanguages(("ron",), "ron")
+    )
+    monkeypatch.setattr(ocr_tasks, "tesseract_version", lambda: "5.3.0")
+
+    jobs = JobRepo(app.state.db)
+    job = jobs.claim("test", lease_seconds=60)
+    assert job is not None
+    pool = SharedPool(2, factory=lambda n: ThreadPoolExecutor(max_workers=n))
+    try:
+        HANDLERS[job.type](app.state.db, app.state.cfg, job.payload, pool)
+    finally:
+        pool.shutdown()
+
+    pages = PageRepo(app.state.db).list_for_version(dv_id)
+    assert [p.ocr_text is not None for p in pages] == [True, False, True]
+    articles = [
+        c.label for c in ChunkRepo(app.state.db).list_for_version(dv_id)
+        if c.chunk_type == "ARTICLE"
+    ]
+    assert articles == ["Art. 1", "Art. 2", "Art. 3", "Art. 4"]
+    # Only the failed page is left to a follow-up OCR job.
+    follow_up = jobs.claim("test", lease_seconds=60)
+    assert follow_up is not None and follow_up.type == JobType.ocr_document_version
+
+
+def test_analysis_reuses_the_chunks_the_pipeline_streamed(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    app = client.app
+    body = _upload_bill(client, _bill_pdf(tmp_path))
+    assert run_once(app.state.db, app.state.cfg)
+    streamed = ChunkRepo(app.state.db).list_for_version(body["document_version_id"])
+
+    run = client.post(f"/bills/{body['bill_id']}/analysis").json()
+    assert run_once(app.state.db, app.state.cfg)
+
+    assert client.get(f"/bills/runs/{run['analysis_run_id']}").json()["status"] == "succeeded"
+    assert ChunkRepo(app.state.db).list_for_version(body["document_version_id"]) == streamed
@@ -1,5 +1,8 @@
+import io
 from pathlib import Path
 
+import pytest
+
 from app.infra.storage import BlobStore
 
 
@@ -17,3 +20,23 @@ def test_put_bytes_is_idempotent(tmp_path: Path) -> None:
 
     assert ref1.pages_dir.exists()
     assert ref1.pages_dir.is_dir()
+
+
+def test_put_stream_hashes_incrementally_and_matches_put_bytes(tmp_path: Path) -> None:
+    store = BlobStore(root=tmp_path)
+    payload = b"%PDF-1.7 " + b"x" * 10_000
+
+    streamed = store.put_stream(io.BytesIO(payload), ext=".pdf", chunk_size=1024)
+
+    assert streamed == store.put_bytes(data=payload, ext=".pdf")
+    assert streamed.original_path.read_bytes() == payload
+    assert not list((tmp_path / "blobs").glob("*.part"))
+
+
+def test_put_stream_rejects_empty_input(tmp_path: Path) -> None:
+    store = BlobStore(root=tmp_path)
+
+    with pytest.raises(ValueError):
+        store.put_stream(io.BytesIO(b""), ext=".pdf")
+
+    assert not list((tmp_path / "blobs").glob("*.part"))
@@ -1,9 +1,15 @@
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.config import AppConfig
+from app.features.ingest.service import IngestService
+from app.features.jobs.worker import run_once
 from app.infra.db import DbConfig
+from app.infra.repo_documents import DocumentVersionRepo
+from app.infra.repo_pages import PageRepo
+from app.infra.storage import sha256_file
 from app.main import create_app
 
 
@@ -11,7 +17,7 @@ def test_upload_creates_bill_and_pages(tmp_path: Path) -> None:
     app = create_app()
 
     # Override config for test isolation.
-    app.state.cfg = AppConfig(data_dir=tmp_path)
+    app.state.cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret")
 
     # Re-init DB in the new location.
     from app.infra import db as db_mod
@@ -31,8 +37,95 @@ def test_upload_creates_bill_and_pages(tmp_path: Path) -> None:
             files={"file": ("sample.pdf", f, "application/pdf")},
         )
 
-    assert resp.status_code == 200
+    # Upload only stores the blob and queues rendering.
+    assert resp.status_code == 202
     body = resp.json()
     assert body["bill_id"] > 0
     assert body["document_version_id"] > 0
+    assert body["job_id"] > 0
+
+    assert run_once(app.state.db, app.state.cfg)
+
+    job = client.get(f"/jobs/{body['job_id']}").json()
+    assert job["status"] == "succeeded"
+    assert job["progress"]["page_count"] > 0
+    assert job["progress"]["pages_done"] == job["progress"]["page_count"]
+
+
+def test_probe_and_attach_known_blob(tmp_path: Path) -> None:
+    app = create_app()
+    app.state.cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret")
+
+    from app.infra import db as db_mod
+
+    app.state.db = db_mod.connect(DbConfig(path=app.state.cfg.db_path))
+    db_mod.migrate(app.state.db)
+    client = TestClient(app)
+
+    sha = sha256_file(Path("sample.pdf"))
+    assert client.head(f"/blobs/{sha}").status_code == 404
+    assert client.post("/bills/attach", params={"title": "t", "sha256": sha}).status_code == 404
+    assert client.get("/blobs/not-a-sha").status_code == 400
+
+    with Path("sample.pdf").open("rb") as f:
+        first = client.post(
+            "/bills/upload",
+            params={"title": "First"},
+            files={"file": ("sample.pdf", f, "application/pdf")},
+        ).json()
+    assert run_once(app.state.db, app.state.cfg)
+
+    probe = client.head(f"/blobs/{sha}")
+    assert probe.status_code == 200
+    assert int(probe.headers["X-Blob-Size"]) == Path("sample.pdf").stat().st_size
+    assert client.get(f"/blobs/{sha.upper()}").json()["rendered"] is True
+
+    resp = client.post("/bills/attach", params={"title": "Second", "sha256": sha})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["deduplicated"] is True
+    assert body["bill_id"] != first["bill_id"]
     assert body["page_count"] > 0
+
+
+def test_render_retry_after_dedup_copy(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    app = create_app()
+    app.state.cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret")
+
+    from app.infra import db as db_mod
+
+    app.state.db = db_mod.connect(DbConfig(path=app.state.cfg.db_path))
+    db_mod.migrate(app.state.db)
+    client = TestClient(app)
+
+    # Both uploads are queued before either is rendered; the second render copies pages.
+    uploads = []
+    for title in ("First", "Second"):
+        with Path("sample.pdf").open("rb") as f:
+            uploads.append(
+                client.post(
+                    "/bills/upload",
+                    params={"title": title},
+                    files={"file": ("sample.pdf", f, "application/pdf")},
+                ).json()
+            )
+    assert run_once(app.state.db, app.state.cfg)
+    target = int(uploads[1]["document_version_id"])
+
+    # Attempt 1 fails after the pages were copied; attempt 2 must copy them again.
+    set_page_count = DocumentVersionRepo.set_page_count
+    failures = [RuntimeError("boom")]
+
+    def flaky_set_page_count(self: DocumentVersionRepo, version_id: int, page_count: int) -> None:
+        if failures:
+            raise failures.pop()
+        set_page_count(self, version_id, page_count)
+
+    monkeypatch.setattr(DocumentVersionRepo, "set_page_count", flaky_set_page_count)
+    service = IngestService(conn=app.state.db, blobs_dir=str(app.state.cfg.blobs_dir))
+    with pytest.raises(RuntimeError):
+        service.render_version(document_version_id=target)
+    page_count = service.render_version(document_version_id=target)
+
+    assert page_count > 0
+    assert PageRepo(app.state.db).count_for_version(target) == page_count
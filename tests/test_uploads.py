@@ -0,0 +1,186 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.config import AppConfig
+from app.features.uploads import hashing as upload_hashing
+from app.features.uploads.service import UploadsService
+from app.infra.db import DbConfig
+from app.infra.repo_bulk_ingest import BulkIngestRepo
+from app.infra.repo_upload_sessions import UploadSessionRepo
+from app.infra.storage import sha256_file
+from app.main import create_app
+
+
+def _client(tmp_path: Path) -> TestClient:
+    app = create_app()
+    app.state.cfg = AppConfig(data_dir=tmp_path, admin_secret="test-secret")
+
+    from app.infra import db as db_mod
+
+    app.state.db = db_mod.connect(DbConfig(path=app.state.cfg.db_path))
+    db_mod.migrate(app.state.db)
+    return TestClient(app)
+
+
+def _put(client: TestClient, upload_id: str, data: bytes, start: int, total: int):
+    end = start + len(data) - 1
+    return client.put(
+        f"/uploads/{upload_id}",
+        content=data,
+        headers={"Content-Range": f"bytes {start}-{end}/{total}"},
+    )
+
+
+def test_resumable_upload_in_ranges(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    data = Path("sample.pdf").read_bytes()
+    half = len(data) // 2
+
+    resp = client.post(
+        "/uploads", params={"title": "Chunked", "filename": "sample.pdf", "size": len(data)}
+    )
+    assert resp.status_code == 201
+    upload_id = resp.json()["upload_id"]
+
+    assert _put(client, upload_id, data[:half], 0, len(data)).json()["offset"] == half
+    # Skipping ahead is refused with the offset to resume from.
+    skipped = _put(client, upload_id, data[half + 1 :], half + 1, len(data))
+    assert skipped.status_code == 409
+    assert skipped.json()["detail"] == f"offset_mismatch:{half}"
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 409
+
+    assert _put(client, upload_id, data[half:], half, len(data)).json()["offset"] == len(data)
+    resp = client.post(f"/uploads/{upload_id}/finalize")
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["job_id"] > 0
+
+    blobs_dir = Path(client.app.state.cfg.blobs_dir)
+    assert not list((blobs_dir / "uploads").glob("*.part"))
+    blob = next(blobs_dir.rglob("original.pdf"))
+    assert sha256_file(blob) == sha256_file(Path("sample.pdf"))
+    assert client.get(f"/uploads/{upload_id}").json()["status"] == "finalized"
+
+
+def test_put_is_refused_while_another_put_holds_the_session(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    data = Path("sample.pdf").read_bytes()
+    upload_id = client.post(
+        "/uploads", params={"title": "Busy", "filename": "sample.pdf", "size": len(data)}
+    ).json()["upload_id"]
+    repo = UploadSessionRepo(client.app.state.db)
+    assert repo.claim_put(upload_id, 0, "other-request", lease_seconds=60)
+
+    busy = _put(client, upload_id, data, 0, len(data))
+    assert (busy.status_code, busy.json()["detail"]) == (409, "upload_busy")
+
+    repo.release_put(upload_id, "other-request")
+    assert _put(client, upload_id, data, 0, len(data)).json()["offset"] == len(data)
+
+
+def test_finalize_checks_the_bytes_on_disk(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    data = Path("sample.pdf").read_bytes()
+    upload_id = client.post(
+        "/uploads", params={"title": "Short", "filename": "sample.pdf", "size": len(data)}
+    ).json()["upload_id"]
+    assert _put(client, upload_id, data, 0, len(data)).json()["offset"] == len(data)
+    part = next(Path(client.app.state.cfg.blobs_dir).glob("uploads/*.part"))
+    with part.open("r+b") as f:
+        f.truncate(len(data) - 1)
+
+    resp = client.post(f"/uploads/{upload_id}/finalize")
+
+    assert resp.status_code == 409
+    assert resp.json()["detail"] == f"upload_bytes_mismatch:{len(data) - 1}/{len(data)}"
+
+
+def _uploaded(client: TestClient, title: str) -> str:
+    data = Path("sample.pdf").read_bytes()
+    upload_id = str(
+        client.post(
+            "/uploads", params={"title": title, "filename": "sample.pdf", "size": len(data)}
+        ).json()["upload_id"]
+    )
+    half = len(data) // 2
+    _put(client, upload_id, data[:half], 0, len(data))
+    assert _put(client, upload_id, data[half:], half, len(data)).json()["offset"] == len(data)
+    return upload_id
+
+
+def _service(client: TestClient) -> UploadsService:
+    app = client.app
+    return UploadsService(
+        conn=app.state.db, blobs_dir=app.state.cfg.blobs_dir, hashes=app.state.upload_hashes
+    )
+
+
+def _bill_count(client: TestClient) -> int:
+    return int(client.app.state.db.execute("SELECT COUNT(*) FROM bills").fetchone()[0])
+
+
+def test_finalize_uses_the_running_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(tmp_path)
+    upload_id = _uploaded(client, "Hashed")
+
+    def no_reread(part: Path, size: int) -> None:
+        raise AssertionError("finalize re-read the upload")
+
+    monkeypatch.setattr(upload_hashing, "_hash_prefix", no_reread)
+    body = client.post(f"/uploads/{upload_id}/finalize").json()
+
+    assert body["sha256"] == sha256_file(Path("sample.pdf"))
+
+
+def test_concurrent_finalize_registers_once(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    upload_id = _uploaded(client, "Twice")
+    service = _service(client)
+
+    async def both() -> list[object]:
+        return list(
+            await asyncio.gather(
+                service.finalize(upload_id=upload_id),
+                service.finalize(upload_id=upload_id),
+                return_exceptions=True,
+            )
+        )
+
+    first, second = asyncio.run(both())
+
+    assert isinstance(first, dict)
+    assert isinstance(second, HTTPException) and second.detail == "upload_busy"
+    retried = client.post(f"/uploads/{upload_id}/finalize").json()
+    assert retried["document_version_id"] == first["document_version_id"]
+    assert _bill_count(client) == 1
+
+
+def test_finalize_retry_after_a_failed_registration(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = _client(tmp_path)
+    upload_id = _uploaded(client, "Retried")
+    register = BulkIngestRepo.insert_registration
+    failures = [sqlite3.OperationalError("disk I/O error")]
+
+    def flaky(self: BulkIngestRepo, *args: Any) -> Any:
+        if failures:
+            raise failures.pop()
+        return register(self, *args)
+
+    monkeypatch.setattr(BulkIngestRepo, "insert_registration", flaky)
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(_service(client).finalize(upload_id=upload_id))
+    assert client.get(f"/uploads/{upload_id}").json()["status"] == "open"
+    assert _bill_count(client) == 0
+
+    # The part file was already adopted into the blob store; the retry registers it once.
+    body = client.post(f"/uploads/{upload_id}/finalize").json()
+    assert body["job_id"] > 0
+    assert _bill_count(client) == 1